@@ -13,13 +13,33 @@
 # See the License for the specific language governing permissions and limitations under the License.
 from __future__ import print_function
 
+import errno
+import gzip
+import heapq
+import json
+import os
+import re
 import sys
 import time
+from collections import OrderedDict
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, config_logger
-from awsbatch.utils import convert_to_date, fail, get_job_type
+from awsbatch.utils import convert_to_date, describe_jobs, fail, is_job_array, is_mnp_job
+from pcluster.cache import write_atomically
+from pcluster.utils import get_request_workers
+
+LOG_GROUP_NAME = "/aws/batch/job"
+# The maximum number of log events returned by the get_log_events function is as many log events
+# as can fit in a response size of 1 MB, up to 10,000 log events
+MAX_LOG_EVENTS_LIMIT = 10000
+# The streaming period starts from the min one while output is produced, and doubles up to the max one when idle
+MIN_STREAM_PERIOD = 1
+DEFAULT_STREAM_PERIOD = 5
+# Exported logs are written with a buffer holding several pages of events
+EXPORT_BUFFER_SIZE = 4 * 1024 * 1024
 
 
 def _get_parser():
@@ -37,7 +57,7 @@ def _get_parser():
 
     :return: the ArgumentParser object
     """
-    parser = argparse.ArgumentParser(description="Shows the output of the given Job.")
+    parser = argparse.ArgumentParser(description="Shows the output of the given Jobs.")
     parser.add_argument("-c", "--cluster", help="Cluster to use")
     parser.add_argument("-hd", "--head", help="Gets the first <head> lines of the job output", type=int)
     parser.add_argument("-t", "--tail", help="Gets the last <tail> lines of the job output", type=int)
@@ -49,9 +69,32 @@ def _get_parser():
         "latest <tail> lines of the job output",
         action="store_true",
     )
-    parser.add_argument("-sp", "--stream-period", help="Sets the streaming period. Default is 5", type=int)
+    parser.add_argument(
+        "-sp",
+        "--stream-period",
+        help="Sets the max streaming period. The output is polled every %s second while it is produced, "
+        "then less and less frequently up to the max period. Default is %s"
+        % (MIN_STREAM_PERIOD, DEFAULT_STREAM_PERIOD),
+        type=int,
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        help="Exports the output of the jobs to files in the given directory, one <job_id>.log file for each job "
+        "with the messages of its events. The export progress is saved to a <job_id>.log.token file, the export of "
+        "a job that was interrupted, or that has produced new output, is resumed from the last saved event",
+    )
+    parser.add_argument(
+        "-z", "--gzip", help="Compresses the files exported with --output-dir with gzip", action="store_true"
+    )
     parser.add_argument("-ll", "--log-level", help=argparse.SUPPRESS, default="ERROR")
-    parser.add_argument("job_id", help="The job ID")
+    parser.add_argument(
+        "job_ids",
+        help="The job ID, or a space separated list of job IDs. Array and MNP jobs are expanded to their children, "
+        "the output of several jobs is merged by timestamp and prefixed by the job ID",
+        nargs="+",
+        metavar="job_id",
+    )
     return parser
 
 
@@ -70,6 +113,12 @@ def _validate_parameters(args):
     if args.stream_period and not args.stream:
         fail("Parameters validation error: --stream-period can be used only with --stream option")
 
+    if args.output_dir and (args.head or args.tail or args.stream):
+        fail("Parameters validation error: --output-dir cannot be used with --head, --tail or --stream options")
+
+    if args.gzip and not args.output_dir:
+        fail("Parameters validation error: --gzip can be used only with --output-dir option")
+
 
 class AWSBoutCommand(object):
     """awsbout command."""
@@ -84,48 +133,59 @@ class AWSBoutCommand(object):
         self.log = log
         self.boto3_factory = boto3_factory
 
-    def run(self, job_id, head=None, tail=None, stream=None, stream_period=None):
-        """Print job output."""
-        log_stream = self.__get_log_stream(job_id)
-        if log_stream:
-            self.log.info("Log stream is (%s)" % log_stream)
-            self.__print_log_stream(log_stream, head, tail, stream, stream_period)
-
-    def __get_log_stream(self, job_id):
+    def run(self, job_ids, head=None, tail=None, stream=None, stream_period=None, output_dir=None, compress=False):
+        """Print jobs output, or export it to the given directory."""
+        log_streams = self.__get_log_streams(job_ids)
+        self.log.info("Log streams are (%s)" % log_streams)
+        if output_dir:
+            self.__export_log_streams(log_streams, output_dir, compress)
+        elif len(job_ids) == 1 and len(log_streams) == 1:
+            self.__print_log_stream(list(log_streams.values())[0], head, tail, stream, stream_period)
+        elif log_streams:
+            self.__print_merged_log_streams(log_streams, head, tail, stream, stream_period)
+
+    def __get_log_streams(self, job_ids):
         """
-        Get log stream for the given job.
+        Get the log streams of the given jobs, expanding array and MNP jobs to their children.
 
-        :param job_id: job id (ARN)
-        :return: the log_stream if there, or None
+        :param job_ids: job ids (ARNs)
+        :return: an OrderedDict with the log stream of each job that has one
         """
-        log_stream = None
+        log_streams = OrderedDict()
         try:
             batch_client = self.boto3_factory.get_client("batch")
-            jobs = batch_client.describe_jobs(jobs=[job_id])["jobs"]
-            if len(jobs) == 1:
-                job = jobs[0]
+            job_ids = list(OrderedDict.fromkeys(job_ids))
+            jobs = describe_jobs(batch_client, job_ids)
+            described_job_ids = [job["jobId"] for job in jobs] + [job.get("jobArn") for job in jobs]
+            for job_id in job_ids:
+                if job_id not in described_job_ids:
+                    fail("Error asking job output for job (%s). Job not found." % job_id)
+
+            children_ids = []
+            simple_jobs = []
+            for job in jobs:
                 self.log.debug(job)
-
-                if "nodeProperties" in job:
-                    # MNP job
-                    container = job["nodeProperties"]["nodeRangeProperties"][0]["container"]
-                elif "container" in job:
-                    container = job["container"]
+                if is_job_array(job):
+                    children_ids.extend(
+                        "%s:%s" % (job["jobId"], index) for index in range(job["arrayProperties"]["size"])
+                    )
+                elif is_mnp_job(job):
+                    children_ids.extend(
+                        "%s#%s" % (job["jobId"], index) for index in range(job["nodeProperties"]["numNodes"])
+                    )
                 else:
-                    container = {}
+                    simple_jobs.append(job)
+            simple_jobs.extend(describe_jobs(batch_client, children_ids))
 
-                if get_job_type(job) != "SIMPLE":
-                    fail("No output available for the Job (%s). Please ask for its children." % job["jobId"])
+            for job in simple_jobs:
+                log_stream = job.get("container", {}).get("logStreamName")
+                if log_stream:
+                    log_streams[job["jobId"]] = log_stream
                 else:
-                    if "logStreamName" in container:
-                        log_stream = container.get("logStreamName")
-                    else:
-                        print("No log stream found for job (%s) in the status (%s)" % (job_id, job["status"]))
-            else:
-                fail("Error asking job output for job (%s). Job not found." % job_id)
+                    print("No log stream found for job (%s) in the status (%s)" % (job["jobId"], job["status"]))
         except Exception as e:
             fail("Error listing jobs from AWS Batch. Failed with exception: %s" % e)
-        return log_stream
+        return log_streams
 
     def __print_log_stream(self, log_stream, head=None, tail=None, stream=None, stream_period=None):  # noqa: C901 FIXME
         """
@@ -135,9 +195,7 @@ class AWSBoutCommand(object):
         """
         logs_client = self.boto3_factory.get_client("logs")
         try:
-            # The maximum number of log events returned by the get_log_events function is as many log events
-            # as can fit in a response size of 1 MB, up to 10,000 log events
-            max_limit = 10000
+            max_limit = MAX_LOG_EVENTS_LIMIT
             if head:
                 limit = head
                 start_from_head = True
@@ -149,7 +207,7 @@ class AWSBoutCommand(object):
                 start_from_head = False
 
             response = logs_client.get_log_events(
-                logGroupName="/aws/batch/job", logStreamName=log_stream, limit=limit, startFromHead=start_from_head
+                logGroupName=LOG_GROUP_NAME, logStreamName=log_stream, limit=limit, startFromHead=start_from_head
             )
             events = response["events"]
             self.log.debug(response)
@@ -160,14 +218,15 @@ class AWSBoutCommand(object):
             if limit == max_limit or stream:
                 # get paginated items
                 next_token = response["nextForwardToken"]
+                period = None
                 while next_token is not None or stream:
                     self.log.info("Next Forward Token is (%s)" % next_token)
                     if stream:
-                        period = stream_period if stream_period else 5
+                        period = self.__get_stream_period(period, response["events"], stream_period)
                         self.log.info("Waiting other %s seconds..." % period)
                         time.sleep(period)
                     response = logs_client.get_log_events(
-                        logGroupName="/aws/batch/job", logStreamName=log_stream, nextToken=next_token
+                        logGroupName=LOG_GROUP_NAME, logStreamName=log_stream, nextToken=next_token
                     )
                     self.__print_events(response["events"])
                     # if nextForwardToken is the same we passed in, we reached the end of the stream
@@ -183,6 +242,200 @@ class AWSBoutCommand(object):
         except Exception as e:
             fail("Error listing jobs from AWS Batch. Failed with exception: %s" % e)
 
+    def __print_merged_log_streams(self, log_streams, head=None, tail=None, stream=None, stream_period=None):
+        """
+        Ask for the log streams of several jobs concurrently and print their events merged by timestamp.
+
+        The streams are read with the same rules of a single stream. When following them, the events retrieved
+        from all the streams at each poll are merged.
+
+        :param log_streams: OrderedDict with the log stream of each job
+        """
+        logs_client = self.boto3_factory.get_client("logs")
+        executor = ThreadPoolExecutor(max_workers=min(get_request_workers(), len(log_streams)))
+        try:
+            # (job_id, log_stream, next_token) of the streams still to read
+            streams = [(job_id, log_stream, None) for job_id, log_stream in log_streams.items()]
+            period = None
+            while streams:
+                responses = list(
+                    executor.map(lambda job_stream: self.__get_log_events(logs_client, job_stream, head, tail), streams)
+                )
+                events_by_job = [(job_id, response["events"]) for (job_id, _, _), response in zip(streams, responses)]
+                self.__print_merged_events(events_by_job)
+                if period is None and not any(events for _, events in events_by_job):
+                    print("No events found.")
+
+                streams = [
+                    (job_id, log_stream, response["nextForwardToken"])
+                    for (job_id, log_stream, next_token), response in zip(streams, responses)
+                    if stream or not self.__is_read(next_token, response, head, tail)
+                ]
+                period = self.__get_stream_period(period, any(events for _, events in events_by_job), stream_period)
+                if stream:
+                    self.log.info("Waiting other %s seconds..." % period)
+                    time.sleep(period)
+        except KeyboardInterrupt:
+            self.log.info("Interrupted by the user")
+            exit(0)
+        except Exception as e:
+            fail("Error listing jobs from AWS Batch. Failed with exception: %s" % e)
+        finally:
+            executor.shutdown(wait=True)
+
+    def __export_log_streams(self, log_streams, output_dir, compress=False):
+        """
+        Export the log streams of the given jobs to files, concurrently.
+
+        :param log_streams: OrderedDict with the log stream of each job
+        :param output_dir: directory of the exported files
+        :param compress: compress the exported files with gzip
+        """
+        try:
+            os.makedirs(output_dir)
+        except OSError as e:
+            if not (e.errno == errno.EEXIST and os.path.isdir(output_dir)):
+                fail("Cannot create output directory (%s). Failed with exception: %s" % (output_dir, e))
+
+        logs_client = self.boto3_factory.get_client("logs")
+        workers = min(get_request_workers(), len(log_streams))
+        # the streams are exported by the first executor, the next page of each stream is fetched by the second one
+        export_executor = ThreadPoolExecutor(max_workers=workers)
+        fetch_executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [
+                export_executor.submit(
+                    self.__export_log_stream,
+                    logs_client,
+                    fetch_executor,
+                    log_stream,
+                    os.path.join(output_dir, re.sub(r"[^\w.-]", "_", job_id) + (".log.gz" if compress else ".log")),
+                )
+                for job_id, log_stream in log_streams.items()
+            ]
+            for job_id, future in zip(log_streams.keys(), futures):
+                path, events_count = future.result()
+                print("Exported %s events of job (%s) to %s" % (events_count, job_id, path))
+        except KeyboardInterrupt:
+            self.log.info("Interrupted by the user")
+            exit(0)
+        except Exception as e:
+            fail("Error exporting jobs output. Failed with exception: %s" % e)
+        finally:
+            export_executor.shutdown(wait=True)
+            fetch_executor.shutdown(wait=True)
+
+    def __export_log_stream(self, logs_client, fetch_executor, log_stream, path):
+        """
+        Export the given log stream to a file, writing each page of events while the next one is fetched.
+
+        Every EXPORT_BUFFER_SIZE bytes, and at the end, the file is flushed and its size is saved to <path>.token
+        with the nextForwardToken of the last written page, so that a following export resumes from there.
+
+        :return: the path of the file and the number of exported events
+        """
+        token_path = path + ".token"
+        next_token, size = self.__read_checkpoint(path, token_path)
+        self.log.info("Exporting log stream (%s) to (%s) from token (%s)" % (log_stream, path, next_token))
+
+        events_count = 0
+        output_file = _LogExportFile(path, compress=path.endswith(".gz"), size=size)
+        try:
+            future = fetch_executor.submit(self.__get_export_events, logs_client, log_stream, next_token)
+            while future:
+                response = future.result()
+                # if nextForwardToken is the same we passed in, we reached the end of the stream
+                completed = next_token is not None and response["nextForwardToken"] == next_token
+                next_token = response["nextForwardToken"]
+                future = (
+                    None
+                    if completed
+                    else fetch_executor.submit(self.__get_export_events, logs_client, log_stream, next_token)
+                )
+                output_file.write("".join(event["message"] + "\n" for event in response["events"]).encode("utf-8"))
+                events_count += len(response["events"])
+                if completed or output_file.pending_bytes >= EXPORT_BUFFER_SIZE:
+                    size = output_file.checkpoint()
+                    checkpoint = {"nextForwardToken": next_token, "size": size}
+                    # the token is replaced atomically, so that an interrupted export never leaves it truncated
+                    write_atomically(token_path, "w", lambda token_file: json.dump(checkpoint, token_file))
+        finally:
+            output_file.close()
+        return path, events_count
+
+    def __read_checkpoint(self, path, token_path):
+        """Return the nextForwardToken and the size of the file at the last checkpoint, (None, 0) to start over."""
+        if not (os.path.isfile(path) and os.path.isfile(token_path)):
+            return None, 0
+        try:
+            with open(token_path) as token_file:
+                checkpoint = json.load(token_file)
+            return checkpoint["nextForwardToken"], int(checkpoint["size"])
+        except (IOError, ValueError, KeyError, TypeError) as e:
+            self.log.warning("Unable to read the export progress from (%s), exporting again: %s" % (token_path, e))
+            return None, 0
+
+    @staticmethod
+    def __get_export_events(logs_client, log_stream, next_token=None):
+        """Ask for the page of events following the given token, or for the first page of the stream."""
+        if next_token is None:
+            return logs_client.get_log_events(
+                logGroupName=LOG_GROUP_NAME, logStreamName=log_stream, limit=MAX_LOG_EVENTS_LIMIT, startFromHead=True
+            )
+        return logs_client.get_log_events(logGroupName=LOG_GROUP_NAME, logStreamName=log_stream, nextToken=next_token)
+
+    @staticmethod
+    def __get_log_events(logs_client, job_stream, head=None, tail=None):
+        """Ask for the first events of the given stream, or for the following ones if the next token is known."""
+        _, log_stream, next_token = job_stream
+        if next_token is None:
+            return logs_client.get_log_events(
+                logGroupName=LOG_GROUP_NAME,
+                logStreamName=log_stream,
+                limit=head or tail or MAX_LOG_EVENTS_LIMIT,
+                startFromHead=bool(head),
+            )
+        return logs_client.get_log_events(logGroupName=LOG_GROUP_NAME, logStreamName=log_stream, nextToken=next_token)
+
+    @staticmethod
+    def __is_read(next_token, response, head=None, tail=None):
+        """Return True if the stream has been read, given the token passed to get_log_events and its response."""
+        if next_token is None:
+            return bool(head or tail)
+        # if nextForwardToken is the same we passed in, we reached the end of the stream
+        return response["nextForwardToken"] == next_token
+
+    @staticmethod
+    def __get_stream_period(period, events, max_period=None):
+        """
+        Return the period to wait before polling again for new events.
+
+        :param period: last period waited, None at the first poll
+        :param events: events found at the last poll
+        :param max_period: max period, used when no events are produced for a while
+        """
+        max_period = max(max_period or DEFAULT_STREAM_PERIOD, MIN_STREAM_PERIOD)
+        if events or period is None:
+            return MIN_STREAM_PERIOD
+        return min(period * 2, max_period)
+
+    @staticmethod
+    def __print_merged_events(events_by_job):
+        """
+        Print the events of several jobs, merged by timestamp.
+
+        :param events_by_job: list of (job_id, events) pairs, the events of each job sorted by timestamp
+        """
+        # the index of the job and the position of the event break the ties without comparing the events
+        merged_events = heapq.merge(
+            *[
+                [(event["timestamp"], job_index, position, job_id, event) for position, event in enumerate(events)]
+                for job_index, (job_id, events) in enumerate(events_by_job)
+            ]
+        )
+        for _, _, _, job_id, event in merged_events:
+            print("{0}: [{1}] {2}".format(convert_to_date(event["timestamp"]), job_id, event["message"]))
+
     @staticmethod
     def __print_events(events):
         """
@@ -194,11 +447,53 @@ class AWSBoutCommand(object):
             print("{0}: {1}".format(convert_to_date(event["timestamp"]), event["message"]))
 
 
-def main():
+class _LogExportFile(object):
+    """File the log events are exported to, which can be truncated to its last checkpoint to resume the export."""
+
+    def __init__(self, path, compress=False, size=0):
+        """
+        Open the file, truncating it to the given size.
+
+        :param path: path of the file
+        :param compress: compress the file with gzip, with a gzip member between each checkpoint
+        :param size: size of the file at the last checkpoint, 0 to overwrite it
+        """
+        self.compress = compress
+        self.raw_file = open(path, "r+b" if size else "wb", EXPORT_BUFFER_SIZE)
+        self.raw_file.truncate(size)
+        self.raw_file.seek(size)
+        # with gzip, each member is started at the first write after a checkpoint
+        self.output_file = None if compress else self.raw_file
+        self.pending_bytes = 0
+
+    def write(self, data):
+        """Write the given bytes."""
+        if not data:
+            return
+        if self.output_file is None:
+            self.output_file = gzip.GzipFile(fileobj=self.raw_file, mode="wb")
+        self.output_file.write(data)
+        self.pending_bytes += len(data)
+
+    def checkpoint(self):
+        """Flush the written data, completing the current gzip member, and return the size of the file."""
+        if self.compress and self.output_file is not None:
+            self.output_file.close()
+            self.output_file = None
+        self.raw_file.flush()
+        self.pending_bytes = 0
+        return self.raw_file.tell()
+
+    def close(self):
+        """Close the file, without completing the data written after the last checkpoint."""
+        self.raw_file.close()
+
+
+def main(argv=None):
     """Command entrypoint."""
     try:
         # parse input parameters and config file
-        args = _get_parser().parse_args()
+        args = _get_parser().parse_args(argv)
         _validate_parameters(args)
         log = config_logger(args.log_level)
         log.info("Input parameters: %s" % args)
@@ -211,7 +506,13 @@ def main():
         )
 
         AWSBoutCommand(log, boto3_factory).run(
-            job_id=args.job_id, head=args.head, tail=args.tail, stream=args.stream, stream_period=args.stream_period
+            job_ids=args.job_ids,
+            head=args.head,
+            tail=args.tail,
+            stream=args.stream,
+            stream_period=args.stream_period,
+            output_dir=args.output_dir,
+            compress=args.gzip,
         )
 
     except KeyboardInterrupt:
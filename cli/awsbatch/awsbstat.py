@@ -14,16 +14,22 @@
 from __future__ import print_function
 
 import collections
+import queue
 import re
 import sys
+import threading
 from builtins import range
 from collections import OrderedDict
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
-from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, Output, config_logger
+from awsbatch.common import AWSBatchCliConfig, Boto3ClientFactory, Output, StreamingOutput, config_logger
 from awsbatch.utils import (
+    DESCRIBE_JOBS_CHUNK_SIZE,
     convert_to_date,
+    describe_jobs,
+    external_sort,
     fail,
     get_job_definition_name_by_arn,
     get_job_type,
@@ -31,9 +37,25 @@ from awsbatch.utils import (
     is_mnp_job,
     shell_join,
 )
+from pcluster.utils import get_request_workers
 
 AWS_BATCH_JOB_STATUS = ["SUBMITTED", "PENDING", "RUNNABLE", "STARTING", "RUNNING", "SUCCEEDED", "FAILED"]
 
+# Seconds a status waits for room in the queue of the listed pages before checking if the listing has been stopped
+LIST_JOBS_PUT_TIMEOUT = 0.1
+
+# Columns of the jobs table, and their width in the fixed output
+TABLE_KEYS = ["jobId", "jobName", "status", "startedAt", "stoppedAt", "exitCode"]
+FIXED_COLUMN_WIDTHS = {
+    "jobId": 44,
+    "jobName": 24,
+    "status": 9,
+    "startedAt": 25,
+    "stoppedAt": 25,
+    "exitCode": 8,
+    "childrenStatus": 40,
+}
+
 
 def _get_parser():
     """
@@ -63,7 +85,26 @@ def _get_parser():
     parser.add_argument(
         "-e", "--expand-children", help="Expand jobs with children (array and MNP)", action="store_true"
     )
+    parser.add_argument(
+        "--summary",
+        help="Show the number of children of array jobs by status, instead of expanding them",
+        action="store_true",
+    )
     parser.add_argument("-d", "--details", help="Show jobs details", action="store_true")
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Output format. The table is printed once all the jobs are retrieved, the other formats print each job "
+        "as soon as it is retrieved: fixed as a table with fixed column widths, csv as comma separated values, "
+        "ndjson as a JSON object per line",
+        choices=["table"] + StreamingOutput.FORMATS,
+        default="table",
+    )
+    parser.add_argument(
+        "--sort",
+        help="Sort the jobs printed with the fixed, csv and ndjson output formats, the table is always sorted",
+        action="store_true",
+    )
     parser.add_argument("-ll", "--log-level", help=argparse.SUPPRESS, default="ERROR")
     parser.add_argument(
         "job_ids",
@@ -98,6 +139,7 @@ class Job(object):
         log_stream,
         log_stream_url,
         s3_folder_url,
+        children_status="-",
     ):
         """Initialize the object."""
         self.id = job_id
@@ -118,6 +160,14 @@ class Job(object):
         self.log_stream = log_stream
         self.log_stream_url = log_stream_url
         self.s3_folder_url = s3_folder_url
+        self.children_status = children_status
+
+    @classmethod
+    def from_dict(cls, job_dict):
+        """Create a Job from the dictionary of its attributes."""
+        job = cls.__new__(cls)
+        job.__dict__.update(job_dict)
+        return job
 
 
 class JobConverter(object):
@@ -151,6 +201,7 @@ class JobConverter(object):
             log_stream=log_stream,
             log_stream_url=log_stream_url,
             s3_folder_url=self._get_s3_folder_url(container),
+            children_status=self._get_children_status(job),
         )
 
     def _get_job_id(self, job):
@@ -159,6 +210,9 @@ class JobConverter(object):
     def _get_number_of_nodes(self, job):
         return 1
 
+    def _get_children_status(self, job):
+        return "-"
+
     def _get_log_stream(self, container, region):
         log_stream = "-"
         log_stream_url = "-"
@@ -243,6 +297,15 @@ class ArrayJobConverter(JobConverter):
     def _get_job_id(self, job):
         return "{0} [{1}]".format(job["jobId"], job["arrayProperties"]["size"])
 
+    def _get_children_status(self, job):
+        status_summary = job["arrayProperties"].get("statusSummary", {})
+        children_status = ", ".join(
+            "{0}: {1}".format(status, status_summary[status])
+            for status in AWS_BATCH_JOB_STATUS
+            if status_summary.get(status)
+        )
+        return children_status or "-"
+
     def _get_log_stream(self, job, region):
         return "-", "-"
 
@@ -280,33 +343,72 @@ class AWSBstatCommand(object):
                 ("logStream", "log_stream"),
                 ("log", "log_stream_url"),
                 ("s3FolderUrl", "s3_folder_url"),
+                ("childrenStatus", "children_status"),
             ]
         )
         self.output = Output(mapping=mapping)
         self.boto3_factory = boto3_factory
         self.batch_client = boto3_factory.get_client("batch")
 
-    def run(self, job_status, expand_children, job_queue=None, job_ids=None, show_details=False):
-        """Print list of jobs, by filtering by queue or by ids."""
+    def run(
+        self,
+        job_status,
+        expand_children,
+        job_queue=None,
+        job_ids=None,
+        show_details=False,
+        children_summary=False,
+        output_format="table",
+        sort=False,
+    ):
+        """
+        Print list of jobs, by filtering by queue or by ids.
+
+        With children_summary the children of the array jobs are not described, the number of children by status
+        is read from the array jobs instead.
+        The table output is printed once all the jobs are retrieved and sorted. The other output formats print each
+        job as soon as it is retrieved, and sort the jobs only if requested.
+        """
+        streaming = output_format != "table"
         if job_ids:
-            self.__populate_output_by_job_ids(job_ids, show_details or len(job_ids) == 1, include_parents=True)
-            # explicitly asking for job details,
-            # or asking for a single simple job (the output is not a list of jobs)
-            details_required = show_details or (len(job_ids) == 1 and self.output.length() == 1)
+            jobs = self.__get_jobs_by_job_ids(
+                job_ids, show_details or len(job_ids) == 1, include_parents=True, children_summary=children_summary
+            )
         elif job_queue:
-            self.__populate_output_by_queue(job_queue, job_status, expand_children, show_details)
-            details_required = show_details
+            jobs = self.__get_jobs_by_queue(job_queue, job_status, expand_children, show_details, children_summary)
         else:
             fail("Error listing jobs from AWS Batch. job_ids or job_queue must be defined")
 
         sort_keys_function = self.__sort_by_status_startedat_jobid() if not job_ids else self.__sort_by_key(job_ids)
+        items = self.__convert_jobs(jobs)
+        detail_keys = (
+            self.output.keys if children_summary else [key for key in self.output.keys if key != "childrenStatus"]
+        )
+        table_keys = TABLE_KEYS + (["childrenStatus"] if children_summary else [])
+        if streaming:
+            if sort:
+                items = external_sort(
+                    items, key=sort_keys_function, serialize=lambda job: job.__dict__, deserialize=Job.from_dict
+                )
+            StreamingOutput(
+                mapping=self.output.mapping,
+                output_format=output_format,
+                keys=table_keys if output_format == "fixed" else detail_keys,
+                column_widths=FIXED_COLUMN_WIDTHS,
+            ).add_all(items)
+            return
+
+        self.output.add(list(items))
+        if job_ids:
+            # explicitly asking for job details,
+            # or asking for a single simple job (the output is not a list of jobs)
+            details_required = show_details or (len(job_ids) == 1 and self.output.length() == 1)
+        else:
+            details_required = show_details
         if details_required:
-            self.output.show(sort_keys_function=sort_keys_function)
+            self.output.show(keys=detail_keys, sort_keys_function=sort_keys_function)
         else:
-            self.output.show_table(
-                keys=["jobId", "jobName", "status", "startedAt", "stoppedAt", "exitCode"],
-                sort_keys_function=sort_keys_function,
-            )
+            self.output.show_table(keys=table_keys, sort_keys_function=sort_keys_function)
 
     @staticmethod
     def __sort_by_key(ordered_keys):  # noqa: D202
@@ -353,12 +455,14 @@ class AWSBstatCommand(object):
             item.id,
         )
 
-    def __populate_output_by_job_ids(self, job_ids, details, include_parents=False):
+    def __get_jobs_by_job_ids(self, job_ids, details, include_parents=False, children_summary=False):
         """
-        Add Job item or jobs array children to the output.
+        Describe the given jobs and yield them, followed by their children.
 
         :param job_ids: job ids or ARNs
         :param details: ask for job details
+        :param include_parents: yield also the jobs with children, not only their children
+        :param children_summary: yield the array jobs with their children summary instead of their children
         """
         try:
             if job_ids:
@@ -368,24 +472,26 @@ class AWSBstatCommand(object):
                 jobs = self.__chunked_describe_jobs(job_ids)
                 for job in jobs:
                     # always add parent job
-                    if include_parents or get_job_type(job) == "SIMPLE":
+                    if include_parents or get_job_type(job) == "SIMPLE" or (children_summary and is_job_array(job)):
                         parent_jobs.append(job)
-                    if is_job_array(job):
+                    if is_job_array(job) and not children_summary:
                         jobs_with_children.append((job["jobId"], ":", job["arrayProperties"]["size"]))
                     elif is_mnp_job(job):
                         jobs_with_children.append((job["jobId"], "#", job["nodeProperties"]["numNodes"]))
 
-                # add parent jobs to the output
-                self.__add_jobs(parent_jobs)
+                # yield parent jobs
+                for job in parent_jobs:
+                    yield job
 
-                # create output items for jobs' children
-                self.__populate_output_by_parent_ids(jobs_with_children)
+                # yield jobs' children
+                for job in self.__get_children_jobs(jobs_with_children):
+                    yield job
         except Exception as e:
             fail("Error describing jobs from AWS Batch. Failed with exception: %s" % e)
 
-    def __populate_output_by_parent_ids(self, parent_jobs):
+    def __get_children_jobs(self, parent_jobs):
         """
-        Add jobs children to the output.
+        Describe the children of the given jobs and yield them.
 
         :param parent_jobs: list of triplets (job_id, job_id_separator, job_size)
         """
@@ -400,89 +506,159 @@ class AWSBstatCommand(object):
                 )
 
             if expanded_job_ids:
-                jobs = self.__chunked_describe_jobs(expanded_job_ids)
-
-                # forcing details to be False since already retrieved.
-                self.__add_jobs(jobs)
+                for job in self.__chunked_describe_jobs(expanded_job_ids):
+                    yield job
         except Exception as e:
             fail("Error listing job children. Failed with exception: %s" % e)
 
     def __chunked_describe_jobs(self, job_ids):
         """
-        Submit calls to describe_jobs in batches of 100 elements each.
-
-        describe_jobs API call has a hard limit on the number of job that can be
-        retrieved with a single call. In case job_ids has more than 100 items, this function
-        distributes the describe_jobs call across multiple requests.
+        Describe the given jobs, with concurrent describe_jobs calls of 100 jobs each.
 
         :param job_ids: list of ids for the jobs to describe.
         :return: list of described jobs.
         """
-        jobs = []
-        for index in range(0, len(job_ids), 100):
-            jobs_chunk = job_ids[index : index + 100]  # noqa: E203
-            jobs.extend(self.batch_client.describe_jobs(jobs=jobs_chunk)["jobs"])
-        return jobs
+        return describe_jobs(self.batch_client, job_ids)
 
-    def __add_jobs(self, jobs, details=False):
+    def __get_jobs_with_details(self, jobs, details=False):
         """
-        Get job info from AWS Batch and add to the output.
+        Yield the given jobs, described again to get their details if required.
 
         :param jobs: list of jobs items (output of the list_jobs function)
         :param details: ask for job details
         """
         try:
             if jobs:
-                self.log.debug("Adding jobs to the output (%s)" % jobs)
                 if details:
                     self.log.info("Asking for jobs details")
-                    jobs_to_show = self.__chunked_describe_jobs([job["jobId"] for job in jobs])
-                else:
-                    jobs_to_show = jobs
-
-                for job in jobs_to_show:
-                    self.log.debug("Adding job to the output (%s)", job)
+                    jobs = self.__chunked_describe_jobs([job["jobId"] for job in jobs])
+                for job in jobs:
+                    yield job
+        except Exception as e:
+            fail("Error adding jobs to the output. Failed with exception: %s" % e)
 
-                    job_converter = self.__JOB_CONVERTERS[get_job_type(job)]
+    def __convert_jobs(self, jobs):
+        """
+        Convert the given jobs from the AWS Batch representation, one at a time.
 
-                    self.output.add(job_converter.convert(job))
+        :param jobs: iterable of jobs items
+        :return: a generator of Job objects
+        """
+        try:
+            for job in jobs:
+                self.log.debug("Adding job to the output (%s)", job)
+                yield self.__JOB_CONVERTERS[get_job_type(job)].convert(job)
         except KeyError as e:
             fail("Error building Job item. Key (%s) not found." % e)
         except Exception as e:
             fail("Error adding jobs to the output. Failed with exception: %s" % e)
 
-    def __populate_output_by_queue(self, job_queue, job_status, expand_children, details):
+    def __get_jobs_by_queue(self, job_queue, job_status, expand_children, details, children_summary=False):
         """
-        Add Job items to the output asking for given queue and status.
+        Yield the jobs of the given queue and status.
+
+        The jobs of all the status are listed concurrently and processed as soon as each page is retrieved.
+        The jobs that must be described are collected until they fill a describe_jobs call, so that the describe
+        calls start while the remaining pages are still being listed.
 
         :param job_queue: job queue name or ARN
         :param job_status: list of job status to ask
-        :param expand_children: if True, the job with children will be expanded by creating a row for each child
+        :param expand_children: if True, the job with children will be expanded by yielding each child
         :param details: ask for job details
+        :param children_summary: if True, the array jobs are described to get the summary of their children
         """
         try:
             single_jobs = []
             jobs_with_children = []
-            for status in job_status:
-                next_token = ""
-                while next_token is not None:
-                    response = self.batch_client.list_jobs(jobStatus=status, jobQueue=job_queue, nextToken=next_token)
+            for page in self.__list_jobs_pages(job_queue, job_status):
+                for job in page:
+                    if (get_job_type(job) != "SIMPLE" and expand_children is True) or (
+                        children_summary and is_job_array(job)
+                    ):
+                        jobs_with_children.append(job["jobId"])
+                    elif details:
+                        single_jobs.append(job)
+                    else:
+                        # listed jobs are yielded without further calls
+                        yield job
+
+                if len(jobs_with_children) >= DESCRIBE_JOBS_CHUNK_SIZE or len(single_jobs) >= DESCRIBE_JOBS_CHUNK_SIZE:
+                    for job in self.__describe_listed_jobs(jobs_with_children, single_jobs, details, children_summary):
+                        yield job
+                    single_jobs = []
+                    jobs_with_children = []
+
+            for job in self.__describe_listed_jobs(jobs_with_children, single_jobs, details, children_summary):
+                yield job
 
-                    for job in response["jobSummaryList"]:
-                        if get_job_type(job) != "SIMPLE" and expand_children is True:
-                            jobs_with_children.append(job["jobId"])
-                        else:
-                            single_jobs.append(job)
-                    next_token = response.get("nextToken")
+        except Exception as e:
+            fail("Error listing jobs from AWS Batch. Failed with exception: %s" % e)
 
-            # create output items for job array children
-            self.__populate_output_by_job_ids(jobs_with_children, details)
+    def __describe_listed_jobs(self, jobs_with_children, single_jobs, details, children_summary):
+        """Describe the listed jobs and yield the job array children, then the single jobs."""
+        for job in self.__get_jobs_by_job_ids(jobs_with_children, details, children_summary=children_summary):
+            yield job
+        for job in self.__get_jobs_with_details(single_jobs, details):
+            yield job
 
-            # add single jobs to the output
-            self.__add_jobs(single_jobs, details)
+    def __list_jobs_pages(self, job_queue, job_status):
+        """
+        Yield the list_jobs pages of job summaries for the given queue and status.
 
-        except Exception as e:
-            fail("Error listing jobs from AWS Batch. Failed with exception: %s" % e)
+        The status are paginated concurrently, and their pages are yielded in the order they are retrieved.
+        Each status is at most one page ahead of the consumer, and stops paginating when the generator is closed.
+        """
+        workers = min(get_request_workers(), len(job_status))
+        if workers <= 1:
+            for status in job_status:
+                for page in self.__list_jobs_by_status(job_queue, status):
+                    yield page
+            return
+
+        pages = queue.Queue(maxsize=workers)
+        stopped = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [
+                executor.submit(self.__put_jobs_pages, pages, stopped, job_queue, status) for status in job_status
+            ]
+            for _ in range(len(futures)):
+                # each status puts its pages and then None when its pagination is completed
+                for page in iter(pages.get, None):
+                    yield page
+            # raise the first pagination error, if any
+            for future in futures:
+                future.result()
+        finally:
+            # on early stop (failure or Ctrl-C) the status only complete their in-flight list_jobs call
+            stopped.set()
+            executor.shutdown(wait=True)
+
+    def __put_jobs_pages(self, pages, stopped, job_queue, status):
+        try:
+            for page in self.__list_jobs_by_status(job_queue, status):
+                if not self.__put_until_stopped(pages, stopped, page):
+                    return
+        finally:
+            self.__put_until_stopped(pages, stopped, None)
+
+    @staticmethod
+    def __put_until_stopped(pages, stopped, page):
+        """Put the page in the queue, waiting for room until the listing is stopped. Return False if stopped."""
+        while not stopped.is_set():
+            try:
+                pages.put(page, timeout=LIST_JOBS_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def __list_jobs_by_status(self, job_queue, status):
+        next_token = ""
+        while next_token is not None:
+            response = self.batch_client.list_jobs(jobStatus=status, jobQueue=job_queue, nextToken=next_token)
+            yield response["jobSummaryList"]
+            next_token = response.get("nextToken")
 
 
 def main(argv=None):
@@ -512,6 +688,9 @@ def main(argv=None):
             job_ids=args.job_ids,
             job_queue=config.job_queue,
             show_details=args.details,
+            children_summary=args.summary,
+            output_format=args.output,
+            sort=args.sort,
         )
 
     except KeyboardInterrupt:
@@ -13,19 +13,22 @@
 # See the License for the specific language governing permissions and limitations under the License.
 from __future__ import print_function
 
+import csv
 import errno
+import json
 import logging
 import os
+import sys
+from collections import OrderedDict
 from logging.handlers import RotatingFileHandler
 
-import boto3
-from botocore.config import Config
 from botocore.exceptions import ClientError, ParamValidationError
 from configparser import ConfigParser, NoOptionError, NoSectionError
 from tabulate import tabulate
 
 from awsbatch.utils import fail, get_region_by_stack_id, hide_keys
 from pcluster.config.pcluster_config import default_config_file_path
+from pcluster.utils import get_boto3_client
 
 PCLUSTER_STACK_PREFIX = "parallelcluster-"
 
@@ -100,6 +103,70 @@ class Output(object):
         return self.items
 
 
+class StreamingOutput(object):
+    """
+    Output printing each item as soon as it is added, with constant memory.
+
+    Items are printed as NDJSON, CSV or as a table with fixed column widths, that must be known in advance.
+    """
+
+    FORMATS = ["fixed", "csv", "ndjson"]
+
+    def __init__(self, mapping, output_format, keys=None, column_widths=None, stream=None):
+        """
+        Create the output.
+
+        :param mapping: association between keys and item attributes
+        :param output_format: one of FORMATS
+        :param keys: show a specific list of keys (optional)
+        :param column_widths: width of the columns of the fixed output, by key, defaults to the width of the key
+        :param stream: file object the items are printed to, defaults to stdout
+        """
+        self.mapping = mapping
+        self.output_format = output_format
+        self.keys = keys or list(mapping.keys())
+        self.column_widths = [max(len(key), (column_widths or {}).get(key, 0)) for key in self.keys]
+        self.stream = stream or sys.stdout
+        self.csv_writer = csv.writer(self.stream, lineterminator="\n") if output_format == "csv" else None
+        self.__count = 0
+
+    def add(self, item):
+        """Print the given item, preceded by the header if it is the first one."""
+        if self.__count == 0:
+            self.__print_header()
+        values = [getattr(item, self.mapping[key]) for key in self.keys]
+        if self.output_format == "ndjson":
+            self.stream.write(json.dumps(OrderedDict(zip(self.keys, values))) + "\n")
+        elif self.output_format == "csv":
+            self.csv_writer.writerow(values)
+        else:
+            self.__print_fixed_row(values)
+        self.__count += 1
+
+    def add_all(self, items):
+        """Print the items of the given iterable, one at a time, and the header alone if there are no items."""
+        for item in items:
+            self.add(item)
+        if self.__count == 0:
+            self.__print_header()
+
+    def length(self):
+        """Return number of items printed."""
+        return self.__count
+
+    def __print_header(self):
+        if self.output_format == "csv":
+            self.csv_writer.writerow(self.keys)
+        elif self.output_format == "fixed":
+            self.__print_fixed_row(self.keys)
+            self.__print_fixed_row(["-" * width for width in self.column_widths])
+
+    def __print_fixed_row(self, values):
+        # values longer than their column are printed entirely, shifting the following columns of the row
+        row = "  ".join("{0!s:{1}}".format(value, width) for value, width in zip(values, self.column_widths))
+        self.stream.write(row.rstrip() + "\n")
+
+
 class Boto3ClientFactory(object):
     """Boto3 configuration object."""
 
@@ -108,24 +175,22 @@ class Boto3ClientFactory(object):
         self.region = region
         self.aws_access_key_id = aws_access_key_id
         self.aws_secret_access_key = aws_secret_access_key
-        self.proxy_config = Config()
-        if not proxy == "NONE":
-            self.proxy_config = Config(proxies={"https": proxy})
+        self.proxy = proxy if proxy != "NONE" else None
 
     def get_client(self, service):
         """
-        Initialize the boto3 client for a given service.
+        Get the boto3 client for a given service, shared with the rest of the process.
 
         :param service: boto3 service.
         :return: the boto3 client
         """
         try:
-            return boto3.client(
+            return get_boto3_client(
                 service,
                 region_name=self.region,
                 aws_access_key_id=self.aws_access_key_id,
                 aws_secret_access_key=self.aws_secret_access_key,
-                config=self.proxy_config,
+                proxy=self.proxy,
             )
         except ClientError as e:
             fail("AWS %s service failed with exception: %s" % (service, e))
@@ -13,13 +13,22 @@
 # See the License for the specific language governing permissions and limitations under the License.
 from __future__ import print_function
 
+import heapq
+import json
 import pipes
 import re
 import sys
+import tempfile
 from datetime import datetime
 
+from concurrent.futures import ThreadPoolExecutor
 from dateutil import tz
 
+from pcluster.utils import get_request_workers
+
+# Max number of jobs that can be described with a single describe_jobs call
+DESCRIBE_JOBS_CHUNK_SIZE = 100
+
 
 def fail(error_message):
     """
@@ -31,6 +40,60 @@ def fail(error_message):
     exit(1)
 
 
+def external_sort(items, key, serialize, deserialize, chunk_size=10000):
+    """
+    Sort the given items with bounded memory, yielding them in order.
+
+    The items are sorted in chunks of chunk_size items. When there is more than one chunk, each sorted chunk is
+    written to a temporary file and the files are merged, keeping in memory a single item for each file.
+
+    :param items: iterable of the items to sort
+    :param key: function returning the sort key of an item, it must be JSON serializable
+    :param serialize: function converting an item to a JSON serializable object
+    :param deserialize: function converting back a serialized item
+    :param chunk_size: max number of items kept in memory to be sorted
+    """
+    chunk_files = []
+    chunk = []
+    try:
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                chunk_files.append(_write_sorted_chunk(chunk, key, serialize, offset=len(chunk_files) * chunk_size))
+                chunk = []
+
+        if not chunk_files:
+            for item in sorted(chunk, key=key):
+                yield item
+            return
+
+        if chunk:
+            chunk_files.append(_write_sorted_chunk(chunk, key, serialize, offset=len(chunk_files) * chunk_size))
+        for _, _, serialized_item in heapq.merge(*[_read_sorted_chunk(chunk_file) for chunk_file in chunk_files]):
+            yield deserialize(serialized_item)
+    finally:
+        for chunk_file in chunk_files:
+            chunk_file.close()
+
+
+def _write_sorted_chunk(chunk, key, serialize, offset):
+    """Write the given items sorted to a temporary file, one JSON [key, position, item] list per line."""
+    chunk_file = tempfile.TemporaryFile(mode="w+")
+    # the position of the item in the input makes the merge stable and never compares the items
+    sorted_entries = sorted(
+        ((key(item), offset + index, item) for index, item in enumerate(chunk)), key=lambda e: e[:2]
+    )
+    for item_key, position, item in sorted_entries:
+        chunk_file.write(json.dumps([item_key, position, serialize(item)]) + "\n")
+    chunk_file.seek(0)
+    return chunk_file
+
+
+def _read_sorted_chunk(chunk_file):
+    for line in chunk_file:
+        yield tuple(json.loads(line))
+
+
 def get_region_by_stack_id(stack_id):
     """
     Parse Cloudformation stack arn and get region.
@@ -112,6 +175,36 @@ def is_mnp_job(job):
     return "nodeProperties" in job and "numNodes" in job["nodeProperties"]
 
 
+def describe_jobs(batch_client, job_ids):
+    """
+    Describe the given jobs, submitting calls to describe_jobs in batches of 100 elements each.
+
+    describe_jobs API call has a hard limit on the number of job that can be
+    retrieved with a single call. In case job_ids has more than 100 items, this function
+    distributes the describe_jobs call across multiple concurrent requests.
+
+    :param batch_client: AWS Batch client
+    :param job_ids: list of ids for the jobs to describe.
+    :return: list of described jobs, in the order of the given ids.
+    """
+    jobs_chunks = [
+        job_ids[index : index + DESCRIBE_JOBS_CHUNK_SIZE]  # noqa: E203
+        for index in range(0, len(job_ids), DESCRIBE_JOBS_CHUNK_SIZE)
+    ]
+    if len(jobs_chunks) <= 1:
+        return batch_client.describe_jobs(jobs=jobs_chunks[0])["jobs"] if jobs_chunks else []
+
+    # Chunks are described concurrently, through the shared client that backs off when the calls are throttled
+    executor = ThreadPoolExecutor(max_workers=min(get_request_workers(), len(jobs_chunks)))
+    try:
+        jobs = []
+        for described_jobs in executor.map(lambda chunk: batch_client.describe_jobs(jobs=chunk)["jobs"], jobs_chunks):
+            jobs.extend(described_jobs)
+        return jobs
+    finally:
+        executor.shutdown(wait=True)
+
+
 def get_job_type(job):
     """
     Get the type of the job.
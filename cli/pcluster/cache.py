@@ -0,0 +1,158 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import errno
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_DIR_ENV_VAR = "AWS_PCLUSTER_CACHE_DIR"
+DISABLE_CACHE_ENV_VAR = "AWS_PCLUSTER_DISABLE_CACHE"
+
+
+def write_atomically(path, mode, write):
+    """Write a file by calling write with the opened file, replacing atomically any previous file at path."""
+    directory = os.path.dirname(path) or os.curdir
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    # Write to a temporary file in the same directory, then rename it, so that concurrent readers
+    # never see a partially written file
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, mode) as tmp_file:
+            write(tmp_file)
+        getattr(os, "replace", os.rename)(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def get_cache_dir():
+    """Return the directory where the CLI persists cached data."""
+    return os.environ.get(CACHE_DIR_ENV_VAR) or os.path.expanduser(os.path.join("~", ".parallelcluster", "cache"))
+
+
+def is_cache_enabled():
+    """Return False if the on-disk cache has been disabled through the environment."""
+    return os.environ.get(DISABLE_CACHE_ENV_VAR, "").lower() not in ["1", "true", "yes"]
+
+
+class FileCache(object):
+    """
+    JSON cache persisted on disk, with one file per entry under <cache_dir>/<namespace>.
+
+    Entries older than the given ttl (in seconds) are considered expired. Failures when reading or writing
+    the cache are never fatal: the entry is simply treated as missing.
+    """
+
+    # Entries written before this timestamp are considered expired, see request_refresh
+    _refresh_time = None
+
+    def __init__(self, namespace, ttl):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    @classmethod
+    def request_refresh(cls):
+        """Expire all the entries written before now, so that fresh data is retrieved and cached again."""
+        cls._refresh_time = time.time()
+
+    def get(self, key, ignore_ttl=False):
+        """
+        Return the data cached for the given key or None if the entry is missing, expired or unreadable.
+
+        With ignore_ttl the data of entries expired by the TTL is returned too, e.g. to be used while fresh data is
+        retrieved. Entries written before a refresh request are never returned.
+        """
+        if not is_cache_enabled():
+            return None
+        path = self._get_path(key)
+        try:
+            with open(path, "r") as cache_file:
+                entry = json.load(cache_file)
+            timestamp = entry["timestamp"]
+            refresh_requested = self._refresh_time and timestamp < self._refresh_time
+            if refresh_requested or (not ignore_ttl and time.time() - timestamp > self.ttl):
+                LOGGER.debug("Cache entry %s is expired", path)
+                return None
+            return entry["data"]
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                LOGGER.debug("Unable to read cache entry %s: %s", path, e)
+        except (ValueError, KeyError, TypeError) as e:
+            LOGGER.debug("Ignoring corrupted cache entry %s: %s", path, e)
+        return None
+
+    def put(self, key, data):
+        """Store the given JSON serializable data, replacing atomically any previous entry for the key."""
+        if not is_cache_enabled():
+            return
+        path = self._get_path(key)
+        try:
+            write_atomically(
+                path, "w", lambda cache_file: json.dump({"timestamp": time.time(), "data": data}, cache_file)
+            )
+        except (IOError, OSError, TypeError, ValueError) as e:
+            LOGGER.debug("Unable to write cache entry %s: %s", path, e)
+
+    def invalidate(self, key):
+        """Remove the entry for the given key, if any."""
+        try:
+            os.remove(self._get_path(key))
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                LOGGER.debug("Unable to remove cache entry for key %s: %s", key, e)
+
+    def _get_path(self, key):
+        safe_key = re.sub(r"[^A-Za-z0-9_.-]", "_", str(key))
+        return os.path.join(get_cache_dir(), self.namespace, "{0}.json".format(safe_key))
+
+
+class ContentCache(object):
+    """
+    Binary cache persisted on disk, with one file per entry under <cache_dir>/<namespace>.
+
+    Entries are addressed by a digest of the content they were generated from, so they never expire.
+    As for FileCache, failures when reading or writing the cache are never fatal.
+    """
+
+    def __init__(self, namespace):
+        self.namespace = namespace
+
+    def get(self, digest):
+        """Return the bytes cached for the given digest or None if the entry is missing or unreadable."""
+        if not is_cache_enabled():
+            return None
+        path = self._get_path(digest)
+        try:
+            with open(path, "rb") as cache_file:
+                return cache_file.read()
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                LOGGER.debug("Unable to read cache entry %s: %s", path, e)
+        return None
+
+    def put(self, digest, data):
+        """Store the given bytes for the given digest."""
+        if not is_cache_enabled():
+            return
+        path = self._get_path(digest)
+        try:
+            write_atomically(path, "wb", lambda cache_file: cache_file.write(data))
+        except (IOError, OSError) as e:
+            LOGGER.debug("Unable to write cache entry %s: %s", path, e)
+
+    def _get_path(self, digest):
+        return os.path.join(get_cache_dir(), self.namespace, re.sub(r"[^A-Za-z0-9_.-]", "_", str(digest)))
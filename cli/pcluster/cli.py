@@ -29,7 +29,9 @@ import pcluster.commands as pcluster
 import pcluster.configure.easyconfig as easyconfig
 import pcluster.createami as createami
 import pcluster.utils as utils
+from pcluster.cache import FileCache
 from pcluster.dcv.connect import dcv_connect
+from pcluster.rate_limiter import AdaptiveRateLimiter
 
 LOGGER = logging.getLogger(__name__)
 
@@ -124,6 +126,15 @@ def _addarg_nowait(subparser):
     )
 
 
+def _addarg_refresh_cache(subparser):
+    subparser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        default=False,
+        help="Ignores the data cached in ~/.parallelcluster/cache and retrieves it again from AWS.",
+    )
+
+
 def _get_parser():
     """
     Initialize ArgumentParser for pcluster commands.
@@ -162,6 +173,7 @@ Examples::
     _addarg_config(pcreate)
     _addarg_region(pcreate)
     _addarg_nowait(pcreate)
+    _addarg_refresh_cache(pcreate)
     pcreate.add_argument(
         "-nr", "--norollback", action="store_true", default=False, help="Disables stack rollback on error."
     )
@@ -203,6 +215,7 @@ Examples::
     _addarg_config(pupdate)
     _addarg_region(pupdate)
     _addarg_nowait(pupdate)
+    _addarg_refresh_cache(pupdate)
     pupdate.add_argument(
         "-nr",
         "--norollback",
@@ -297,13 +310,36 @@ Examples::
         epilog="This command lists the names of any CloudFormation stacks named parallelcluster-*",
     )
     plist.add_argument("--color", action="store_true", default=False, help="Display the cluster status in color.")
+    plist.add_argument(
+        "--regions",
+        help="Lists the clusters of the comma separated list of regions provided here, instead of the current region.",
+    )
+    plist.add_argument(
+        "--json", action="store_true", default=False, help="Displays each cluster as a JSON object on its own line."
+    )
     _addarg_config(plist)
     _addarg_region(plist)
     plist.set_defaults(func=list_stacks)
 
     # instances command subparser
     pinstances = subparsers.add_parser("instances", help="Displays a list of all instances in a cluster.")
-    pinstances.add_argument("cluster_name", help="Display the instances for the cluster with the name provided here.")
+    pinstances.add_argument(
+        "cluster_name", nargs="?", help="Display the instances for the cluster with the name provided here."
+    )
+    pinstances.add_argument(
+        "--all", action="store_true", default=False, help="Displays the instances of all the clusters."
+    )
+    pinstances.add_argument(
+        "--clusters", help="Displays the instances of the comma separated list of clusters provided here."
+    )
+    pinstances.add_argument(
+        "--tags",
+        help="Displays the instances of the clusters with the tags provided here, as a comma separated list of "
+        "Key=Value items.",
+    )
+    pinstances.add_argument(
+        "--json", action="store_true", default=False, help="Displays the instances as a JSON document."
+    )
     _addarg_config(pinstances)
     _addarg_region(pinstances)
     pinstances.set_defaults(func=instances)
@@ -412,6 +448,7 @@ Variables substituted::
     # configure command subparser
     pconfigure = subparsers.add_parser("configure", help="Start the AWS ParallelCluster configuration.")
     _addarg_config(pconfigure)
+    _addarg_refresh_cache(pconfigure)
     pconfigure.set_defaults(func=configure)
 
     # version command subparser
@@ -456,6 +493,9 @@ def main():
         if "region" in args and args.region:
             os.environ["AWS_DEFAULT_REGION"] = args.region
 
+        if "refresh_cache" in args and args.refresh_cache:
+            FileCache.request_refresh()
+
         if args.func.__name__ == "ssh":
             args.func(args, extra_args)
         else:
@@ -473,6 +513,8 @@ def main():
     except Exception as e:
         LOGGER.exception("Unexpected error of type %s: %s", type(e).__name__, e)
         sys.exit(1)
+    finally:
+        LOGGER.debug("AWS API requests: %s", AdaptiveRateLimiter.get_stats())
 
 
 if __name__ == "__main__":
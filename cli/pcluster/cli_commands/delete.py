@@ -10,11 +10,9 @@
 # limitations under the License.
 import logging
 import sys
-import time
 
-import boto3
-from botocore.config import Config
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from pcluster import utils
 from pcluster.config.pcluster_config import PclusterConfig
@@ -22,6 +20,10 @@ from pcluster.utils import NodeType, paginate_boto3
 
 LOGGER = logging.getLogger(__name__)
 
+# Max number of instances described by a DescribeInstances page and terminated by a TerminateInstances request
+DESCRIBE_INSTANCES_PAGE_SIZE = 1000
+TERMINATE_INSTANCES_BATCH_SIZE = 100
+
 
 def delete(args):
     PclusterConfig.init_aws(config_file=args.config_file)
@@ -80,7 +82,7 @@ def _persist_stack_resources(stack, template, keys):
 
 def _delete_cluster(cluster_name, nowait):
     """Delete cluster described by cluster_name."""
-    cfn = boto3.client("cloudformation")
+    cfn = utils.get_boto3_client("cloudformation")
     saw_update = False
     terminate_compute_fleet = not nowait
     stack_name = utils.get_stack_name(cluster_name)
@@ -94,15 +96,9 @@ def _delete_cluster(cluster_name, nowait):
         sys.stdout.flush()
         LOGGER.debug("Status: %s", stack_status)
         if not nowait:
-            while stack_status == "DELETE_IN_PROGRESS":
-                time.sleep(5)
-                stack_status = utils.get_stack(stack_name, cfn, raise_on_error=True).get("StackStatus")
-                events = utils.get_stack_events(stack_name, raise_on_error=True)[0]
-                resource_status = (
-                    "Status: %s - %s" % (events.get("LogicalResourceId"), events.get("ResourceStatus"))
-                ).ljust(80)
-                sys.stdout.write("\r%s" % resource_status)
-                sys.stdout.flush()
+            stack_status = utils.wait_for_stack(
+                stack_name, cfn, on_event=utils.print_stack_event, raise_on_error=True
+            ).get("StackStatus")
             sys.stdout.write("\rStatus: %s\n" % stack_status)
             sys.stdout.flush()
             LOGGER.debug("Status: %s", stack_status)
@@ -111,6 +107,9 @@ def _delete_cluster(cluster_name, nowait):
             sys.stdout.flush()
         if stack_status == "DELETE_FAILED":
             LOGGER.info("Cluster did not delete successfully. Run 'pcluster delete %s' again", cluster_name)
+        elif stack_status == "DELETE_COMPLETE":
+            LOGGER.info("\nCluster deleted successfully.")
+            sys.exit(0)
     except ClientError as e:
         if e.response.get("Error").get("Message").endswith("does not exist"):
             if saw_update:
@@ -133,27 +132,56 @@ def _terminate_cluster_nodes(stack_name):
         LOGGER.debug("Compute fleet clean-up: STARTED")
         # FIXME: improve messaging when cluster does not exist
         LOGGER.info("\nChecking if there are any running compute fleet nodes that require termination")
-        ec2 = boto3.client("ec2", config=Config(retries={"max_attempts": 10}))
-
-        for instance_ids in _describe_instance_ids_iterator(stack_name):
-            LOGGER.info("Terminating following instances: %s", instance_ids)
-            if instance_ids:
-                ec2.terminate_instances(InstanceIds=instance_ids)
+        instance_ids = _describe_instance_ids(stack_name)
+        if instance_ids:
+            _terminate_instances(instance_ids)
 
         LOGGER.debug("Compute fleet clean-up: COMPLETED")
     except Exception as e:
         LOGGER.error("Failed when checking for running EC2 instances with error: %s", e)
 
 
-def _describe_instance_ids_iterator(stack_name, instance_state=("pending", "running", "stopping", "stopped")):
-    ec2 = boto3.client("ec2")
+def _terminate_instances(instance_ids):
+    """
+    Terminate the given instances with batches of requests sent concurrently, reporting the progress.
+
+    Requests go through the shared ec2 client, so their rate adapts to the throttling of the API.
+    """
+    ec2 = utils.get_boto3_client("ec2")
+    batches = []
+    remaining_instance_ids = list(instance_ids)
+    while remaining_instance_ids:
+        batches.append(remaining_instance_ids[:TERMINATE_INSTANCES_BATCH_SIZE])
+        remaining_instance_ids = remaining_instance_ids[TERMINATE_INSTANCES_BATCH_SIZE:]
+
+    LOGGER.info("Terminating %s instances", len(instance_ids))
+    executor = ThreadPoolExecutor(max_workers=min(utils.get_request_workers(), len(batches)))
+    try:
+        futures = {executor.submit(ec2.terminate_instances, InstanceIds=batch): batch for batch in batches}
+        terminating_count = 0
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                future.result()
+                terminating_count += len(batch)
+                LOGGER.info("Terminating instances: %s/%s", terminating_count, len(instance_ids))
+            except Exception as e:
+                LOGGER.error("Failed when terminating instances %s with error: %s", batch, e)
+    finally:
+        executor.shutdown(wait=True)
+
+
+def _describe_instance_ids(stack_name, instance_state=("pending", "running", "stopping", "stopped")):
+    """Return the ids of the compute instances of the cluster, retrieved with large pages."""
+    ec2 = utils.get_boto3_client("ec2")
     filters = [
         {"Name": "tag:Application", "Values": [stack_name]},
         {"Name": "instance-state-name", "Values": list(instance_state)},
         {"Name": "tag:aws-parallelcluster-node-type", "Values": [str(NodeType.compute)]},
     ]
-    for page in paginate_boto3(ec2.describe_instances, Filters=filters, PaginationConfig={"PageSize": 100}):
-        instances = []
-        for instance in page.get("Instances", []):
-            instances.append(instance.get("InstanceId"))
-        yield instances
+    instance_ids = []
+    for reservation in paginate_boto3(
+        ec2.describe_instances, Filters=filters, PaginationConfig={"PageSize": DESCRIBE_INSTANCES_PAGE_SIZE}
+    ):
+        instance_ids.extend(instance.get("InstanceId") for instance in reservation.get("Instances", []))
+    return instance_ids
@@ -13,7 +13,6 @@ import logging
 import sys
 from abc import abstractmethod
 
-import boto3
 from botocore.exceptions import ClientError
 
 from pcluster import utils
@@ -67,7 +66,7 @@ class AWSBatchStartCommand(StartCommand):
     @staticmethod
     def _start_batch_ce(ce_name, min_vcpus, desired_vcpus, max_vcpus):
         try:
-            boto3.client("batch").update_compute_environment(
+            utils.get_boto3_client("batch").update_compute_environment(
                 computeEnvironment=ce_name,
                 state="ENABLED",
                 computeResources={
@@ -12,8 +12,6 @@ import abc
 import logging
 import sys
 
-import boto3
-
 from pcluster import utils
 from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatus, ComputeFleetStatusManager
 from pcluster.config.pcluster_config import PclusterConfig
@@ -60,7 +58,7 @@ class AWSBatchStopCommand(StopCommand):
 
     @staticmethod
     def _stop_batch_ce(ce_name):
-        boto3.client("batch").update_compute_environment(computeEnvironment=ce_name, state="DISABLED")
+        utils.get_boto3_client("batch").update_compute_environment(computeEnvironment=ce_name, state="DISABLED")
 
 
 class SITStopCommand(StopCommand):
@@ -13,10 +13,8 @@ from __future__ import print_function
 
 import logging
 import sys
-import time
 from builtins import input
 
-import boto3
 from botocore.exceptions import ClientError
 from tabulate import tabulate
 
@@ -51,7 +49,7 @@ def execute(args):
         base_config.update(target_config)
 
         cfn_params = base_config.to_cfn()
-        cfn_client = boto3.client("cloudformation")
+        cfn_client = utils.get_boto3_client("cloudformation")
         _restore_cfn_only_params(cfn_client, args, cfn_params, stack_name, target_config)
 
         is_hit = utils.is_hit_enabled_cluster(base_config.cfn_stack)
@@ -95,17 +93,8 @@ def _update_cluster(args, cfn, cfn_params, stack_name, use_previous_template, te
         if template_url:
             update_stack_args["TemplateURL"] = template_url
         cfn.update_stack(**update_stack_args)
-        stack_status = utils.get_stack(stack_name, cfn).get("StackStatus")
         if not args.nowait:
-            while stack_status in ["UPDATE_IN_PROGRESS", "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS"]:
-                stack_status = utils.get_stack(stack_name, cfn).get("StackStatus")
-                events = cfn.describe_stack_events(StackName=stack_name).get("StackEvents")[0]
-                resource_status = (
-                    "Status: %s - %s" % (events.get("LogicalResourceId"), events.get("ResourceStatus"))
-                ).ljust(80)
-                sys.stdout.write("\r%s" % resource_status)
-                sys.stdout.flush()
-                time.sleep(5)
+            utils.wait_for_stack(stack_name, cfn, on_event=utils.print_stack_event)
         else:
             stack_status = utils.get_stack(stack_name, cfn).get("StackStatus")
             LOGGER.info("Status: %s", stack_status)
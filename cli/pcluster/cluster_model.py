@@ -9,15 +9,19 @@
 # OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
 # limitations under the License.
 import abc
+import json
+import logging
 import sys
 from abc import abstractmethod
 
-import boto3
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 
 from pcluster.utils import (
     error,
     get_availability_zone_of_subnet,
+    get_boto3_client,
+    get_request_workers,
     get_supported_az_for_one_instance_type,
     is_hit_enabled_cluster,
 )
@@ -27,6 +31,8 @@ if sys.version_info >= (3, 4):
 else:
     ABC = abc.ABCMeta("ABC", (), {})
 
+LOGGER = logging.getLogger(__name__)
+
 
 class ClusterModel(ABC):
     """
@@ -63,51 +69,94 @@ class ClusterModel(ABC):
     def _ec2_run_instance(self, pcluster_config, **kwargs):
         """Wrap ec2 run_instance call. Useful since a successful run_instance call signals 'DryRunOperation'."""
         try:
-            boto3.client("ec2").run_instances(**kwargs)
+            get_boto3_client("ec2").run_instances(**kwargs)
+        except ClientError as e:
+            self.__report_run_instance_error(pcluster_config, e, kwargs)
+
+    def _ec2_dry_run_instances(self, pcluster_config, run_instances_requests):
+        """
+        Execute the given run_instances requests in dry-run mode, concurrently.
+
+        Identical requests are executed only once. The requests are sent through the shared ec2 client, so they are
+        subject to its rate limiting, and their errors are reported in the given order once all of them completed.
+
+        :param run_instances_requests: list of dicts with the arguments of run_instances
+        """
+        unique_requests = []
+        request_keys = set()
+        for request in run_instances_requests:
+            request_key = json.dumps(request, sort_keys=True)
+            if request_key not in request_keys:
+                request_keys.add(request_key)
+                unique_requests.append(dict(request, DryRun=True))
+        LOGGER.debug(
+            "Testing %d unique instance configurations out of %d", len(unique_requests), len(run_instances_requests)
+        )
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(get_request_workers(), len(unique_requests))))
+        try:
+            futures = [executor.submit(self.__dry_run_instance, request) for request in unique_requests]
+            for request, future in zip(unique_requests, futures):
+                client_error = future.result()
+                if client_error:
+                    self.__report_run_instance_error(pcluster_config, client_error, request)
+        finally:
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def __dry_run_instance(request):
+        """Execute a run_instances request, returning the ClientError it raises, if any."""
+        try:
+            get_boto3_client("ec2").run_instances(**request)
         except ClientError as e:
-            code = e.response.get("Error").get("Code")
-            message = e.response.get("Error").get("Message")
-            if code == "DryRunOperation":
-                pass
-            elif code == "UnsupportedOperation":
-                if "does not support specifying CpuOptions" in message:
-                    pcluster_config.error(message.replace("CpuOptions", "disable_hyperthreading"))
-                pcluster_config.error(message)
-            elif code == "InstanceLimitExceeded":
-                pcluster_config.error(
-                    "You've reached the limit on the number of instances you can run concurrently "
-                    "for the configured instance type.\n{0}".format(message)
-                )
-            elif code == "InsufficientInstanceCapacity":
-                pcluster_config.error("There is not enough capacity to fulfill your request.\n{0}".format(message))
-            elif code == "InsufficientFreeAddressesInSubnet":
-                pcluster_config.error(
-                    "The specified subnet does not contain enough free private IP addresses "
-                    "to fulfill your request.\n{0}".format(message)
-                )
-            elif code == "Unsupported" and get_availability_zone_of_subnet(
-                kwargs["SubnetId"]
-            ) not in get_supported_az_for_one_instance_type(kwargs["InstanceType"]):
-                # If an availability zone without desired instance type is selected, error code is "Unsupported"
-                # Therefore, we need to write our own code to tell the specific problem
-                current_az = get_availability_zone_of_subnet(kwargs["SubnetId"])
-                qualified_az = get_supported_az_for_one_instance_type(kwargs["InstanceType"])
-                pcluster_config.error(
-                    "Your requested instance type ({0}) is not supported in the Availability Zone ({1}) of "
-                    "your requested subnet ({2}). Please retry your request by choosing a subnet in "
-                    "{3}. ".format(kwargs["InstanceType"], current_az, kwargs["SubnetId"], qualified_az)
-                )
-            else:
-                pcluster_config.error(
-                    "Unable to validate configuration parameters. "
-                    "Please double check your cluster configuration.\n{0}".format(message)
-                )
+            return e
+        return None
+
+    def __report_run_instance_error(self, pcluster_config, e, kwargs):
+        """Report the error of a run_instances request, ignoring the one signaling a successful dry-run."""
+        code = e.response.get("Error").get("Code")
+        message = e.response.get("Error").get("Message")
+        if code == "DryRunOperation":
+            pass
+        elif code == "UnsupportedOperation":
+            if "does not support specifying CpuOptions" in message:
+                pcluster_config.error(message.replace("CpuOptions", "disable_hyperthreading"))
+            pcluster_config.error(message)
+        elif code == "InstanceLimitExceeded":
+            pcluster_config.error(
+                "You've reached the limit on the number of instances you can run concurrently "
+                "for the configured instance type.\n{0}".format(message)
+            )
+        elif code == "InsufficientInstanceCapacity":
+            pcluster_config.error("There is not enough capacity to fulfill your request.\n{0}".format(message))
+        elif code == "InsufficientFreeAddressesInSubnet":
+            pcluster_config.error(
+                "The specified subnet does not contain enough free private IP addresses "
+                "to fulfill your request.\n{0}".format(message)
+            )
+        elif code == "Unsupported" and get_availability_zone_of_subnet(
+            kwargs["SubnetId"]
+        ) not in get_supported_az_for_one_instance_type(kwargs["InstanceType"]):
+            # If an availability zone without desired instance type is selected, error code is "Unsupported"
+            # Therefore, we need to write our own code to tell the specific problem
+            current_az = get_availability_zone_of_subnet(kwargs["SubnetId"])
+            qualified_az = get_supported_az_for_one_instance_type(kwargs["InstanceType"])
+            pcluster_config.error(
+                "Your requested instance type ({0}) is not supported in the Availability Zone ({1}) of "
+                "your requested subnet ({2}). Please retry your request by choosing a subnet in "
+                "{3}. ".format(kwargs["InstanceType"], current_az, kwargs["SubnetId"], qualified_az)
+            )
+        else:
+            pcluster_config.error(
+                "Unable to validate configuration parameters. "
+                "Please double check your cluster configuration.\n{0}".format(message)
+            )
 
     def _get_latest_alinux_ami_id(self):
         """Get latest alinux ami id."""
         try:
             alinux_ami_id = (
-                boto3.client("ssm")
+                get_boto3_client("ssm")
                 .get_parameters_by_path(Path="/aws/service/ami-amazon-linux-latest")
                 .get("Parameters")[0]
                 .get("Value")
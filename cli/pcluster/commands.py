@@ -23,10 +23,11 @@ import re
 import sys
 import time
 from builtins import str
+from collections import OrderedDict
 
-import boto3
 import pkg_resources
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from tabulate import tabulate
 
 import pcluster.utils as utils
@@ -37,6 +38,31 @@ from pcluster.constants import PCLUSTER_NAME_MAX_LENGTH, PCLUSTER_NAME_REGEX, PC
 
 LOGGER = logging.getLogger(__name__)
 
+# Statuses of the stacks returned by the list command, all but DELETE_COMPLETE
+LISTED_STACK_STATUSES = [
+    "CREATE_IN_PROGRESS",
+    "CREATE_FAILED",
+    "CREATE_COMPLETE",
+    "ROLLBACK_IN_PROGRESS",
+    "ROLLBACK_FAILED",
+    "ROLLBACK_COMPLETE",
+    "DELETE_IN_PROGRESS",
+    "DELETE_FAILED",
+    "UPDATE_IN_PROGRESS",
+    "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS",
+    "UPDATE_COMPLETE",
+    "UPDATE_ROLLBACK_IN_PROGRESS",
+    "UPDATE_ROLLBACK_FAILED",
+    "UPDATE_ROLLBACK_COMPLETE_CLEANUP_IN_PROGRESS",
+    "UPDATE_ROLLBACK_COMPLETE",
+    "REVIEW_IN_PROGRESS",
+    "IMPORT_IN_PROGRESS",
+    "IMPORT_COMPLETE",
+    "IMPORT_ROLLBACK_IN_PROGRESS",
+    "IMPORT_ROLLBACK_FAILED",
+    "IMPORT_ROLLBACK_COMPLETE",
+]
+
 
 def _create_bucket_with_resources(pcluster_config, json_params, tags):
     """Create a bucket associated to the given stack and upload specified resources."""
@@ -76,7 +102,7 @@ def _upload_hit_resources(bucket_name, pcluster_config, json_params, tags):
     ) or "{bucket_url}/templates/compute-fleet-hit-substack-{version}.cfn.yaml".format(
         bucket_url=utils.get_bucket_url(pcluster_config.region), version=utils.get_installed_version()
     )
-    s3_client = boto3.client("s3")
+    s3_client = utils.get_boto3_client("s3")
 
     try:
         result = s3_client.put_object(
@@ -145,7 +171,7 @@ def create(args):  # noqa: C901 FIXME!!!
 
     bucket_name = None
     try:
-        cfn_client = boto3.client("cloudformation")
+        cfn_client = utils.get_boto3_client("cloudformation")
         stack_name = utils.get_stack_name(args.cluster_name)
 
         # merge tags from configuration, command-line and internal ones
@@ -321,32 +347,169 @@ def _colorize(stack_status, args):
 
 
 def list_stacks(args):
+    """
+    List the clusters of the given regions, or of the current one.
+
+    Stacks are listed server-side filtered by status and only the clusters are described, to retrieve their version.
+    Regions are listed and clusters are described concurrently, and the rows of each region are printed in listing
+    order as soon as its clusters are described, without waiting for the other regions.
+    """
     # Parse configuration file to read the AWS section
     PclusterConfig.init_aws(config_file=args.config_file)
+    regions = _get_list_regions(args)
+    output_json = getattr(args, "json", False)
 
+    executor = ThreadPoolExecutor(max_workers=utils.get_request_workers())
     try:
-        result = []
-        for stack in utils.paginate_boto3(boto3.client("cloudformation").describe_stacks):
-            if stack.get("ParentId") is None and stack.get("StackName").startswith(PCLUSTER_STACK_PREFIX):
-                pcluster_version = _get_pcluster_version_from_stack(stack)
-                result.append(
-                    [
-                        stack.get("StackName")[len(PCLUSTER_STACK_PREFIX) :],  # noqa: E203
-                        _colorize(stack.get("StackStatus"), args),
-                        pcluster_version,
-                    ]
-                )
-        LOGGER.info(tabulate(result, tablefmt="plain"))
-    except ClientError as e:
-        LOGGER.critical(e.response.get("Error").get("Message"))
+        failed = False
+        for region, stacks, region_failed in _describe_listed_clusters(executor, regions):
+            failed = failed or region_failed
+            # Columns are aligned within each region, since regions are printed as soon as they are available
+            widths = {
+                "name": max([len(stack.get("StackName")) - len(PCLUSTER_STACK_PREFIX) for stack in stacks] or [0]),
+                "region": max([len(listed_region) for listed_region in regions]),
+                "status": max([len(stack.get("StackStatus")) for stack in stacks] or [0]),
+            }
+            for stack in stacks:
+                LOGGER.info(_format_cluster_row(stack, region, args, widths, output_json, len(regions) > 1))
+
+        if failed:
+            sys.exit(1)
+    except (BotoCoreError, ClientError) as e:
+        LOGGER.critical(_get_error_message(e))
         sys.exit(1)
     except KeyboardInterrupt:
         LOGGER.info("Exiting...")
         sys.exit(0)
+    finally:
+        executor.shutdown(wait=False)
+
+
+def _describe_listed_clusters(executor, regions):
+    """
+    List the clusters of the given regions and describe them, yielding each region as soon as it is completed.
+
+    The listing error is raised if there is a single region, otherwise it is logged and the region is reported as
+    failed, as well as the regions in which some of the clusters cannot be described.
+
+    :return: generator of (region, descriptions of the clusters in listing order, failure flag)
+    """
+    # future -> (region, stack name) of the requests in progress, the stack name is None for the listing requests
+    pending = OrderedDict(
+        (executor.submit(_list_cluster_stack_summaries, region), (region, None)) for region in regions
+    )
+    region_futures = {}
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        # Futures completed together are processed in submission order
+        for future in [pending_future for pending_future in pending if pending_future in done]:
+            region, stack_name = pending.pop(future)
+            if stack_name is None:
+                try:
+                    summaries = future.result()
+                except (BotoCoreError, ClientError) as e:
+                    if len(regions) == 1:
+                        raise
+                    LOGGER.error("Unable to list clusters in region %s: %s", region, _get_error_message(e))
+                    yield region, [], True
+                    continue
+                region_futures[region] = [
+                    (
+                        summary.get("StackName"),
+                        executor.submit(_describe_cluster_stack, region, summary.get("StackName")),
+                    )
+                    for summary in summaries
+                ]
+                pending.update(
+                    (describe_future, (region, described_stack_name))
+                    for described_stack_name, describe_future in region_futures[region]
+                )
+            if not any(describe_future in pending for _, describe_future in region_futures[region]):
+                yield _get_described_clusters(region, region_futures.pop(region))
+
+
+def _get_described_clusters(region, stack_futures):
+    """Return the region, the descriptions of its clusters and a flag telling if some of them cannot be described."""
+    stacks = []
+    failed = False
+    for stack_name, stack_future in stack_futures:
+        try:
+            stack = stack_future.result()
+        except (BotoCoreError, ClientError) as e:
+            LOGGER.error(
+                "Unable to describe cluster %s in region %s: %s",
+                stack_name[len(PCLUSTER_STACK_PREFIX) :],  # noqa: E203
+                region,
+                _get_error_message(e),
+            )
+            failed = True
+            continue
+        if stack:
+            stacks.append(stack)
+    return region, stacks, failed
+
+
+def _get_error_message(error):
+    """Return the message of the given boto3 error, client errors carry it in their response."""
+    if isinstance(error, ClientError):
+        return error.response.get("Error").get("Message")
+    return str(error)
+
+
+def _get_list_regions(args):
+    """Return the regions requested through the --regions argument, or the current region."""
+    regions = []
+    for region in (getattr(args, "regions", None) or "").split(","):
+        region = region.strip()
+        if region and region not in regions:
+            regions.append(region)
+    return regions or [utils.get_region()]
+
+
+def _list_cluster_stack_summaries(region):
+    """Return the summaries of the cluster stacks of the given region, deleted stacks are filtered out by CFN."""
+    return [
+        summary
+        for summary in utils.paginate_boto3(
+            utils.get_boto3_client("cloudformation", region_name=region).list_stacks,
+            StackStatusFilter=LISTED_STACK_STATUSES,
+        )
+        if summary.get("ParentId") is None and summary.get("StackName").startswith(PCLUSTER_STACK_PREFIX)
+    ]
+
+
+def _describe_cluster_stack(region, stack_name):
+    """Return the description of the given stack, or None if it has been deleted after being listed."""
+    try:
+        return utils.get_stack(
+            stack_name, cfn_client=utils.get_boto3_client("cloudformation", region_name=region), raise_on_error=True
+        )
+    except ClientError as e:
+        if "does not exist" in e.response.get("Error").get("Message"):
+            LOGGER.debug("Stack %s deleted while listing clusters", stack_name)
+            return None
+        raise
+
+
+def _format_cluster_row(stack, region, args, widths, output_json, show_region):
+    """Format the row of the list command for the given cluster stack, as a line of text or as a JSON object."""
+    cluster_name = stack.get("StackName")[len(PCLUSTER_STACK_PREFIX) :]  # noqa: E203
+    stack_status = stack.get("StackStatus")
+    pcluster_version = _get_pcluster_version_from_stack(stack)
+    if output_json:
+        return json.dumps({"name": cluster_name, "region": region, "status": stack_status, "version": pcluster_version})
+
+    columns = [cluster_name.ljust(widths.get("name"))]
+    if show_region:
+        columns.append(region.ljust(widths.get("region")))
+    # Padding is added after the color codes, which take no space on the terminal
+    columns.append(_colorize(stack_status, args) + " " * (widths.get("status") - len(stack_status)))
+    columns.append(pcluster_version)
+    return "  ".join(columns).rstrip()
 
 
 def _poll_master_server_state(stack_name):
-    ec2 = boto3.client("ec2")
+    ec2 = utils.get_boto3_client("ec2")
     try:
         instances = utils.describe_cluster_instances(stack_name, node_type=utils.NodeType.master)
         if not instances:
@@ -384,30 +547,123 @@ def _poll_master_server_state(stack_name):
     return state
 
 
-def _get_compute_instances(stack):
-    instances = utils.describe_cluster_instances(stack, node_type=utils.NodeType.compute)
-    return map(lambda i: ("ComputeFleet", i.get("InstanceId")), instances)
-
-
 def instances(args):
-    stack_name = utils.get_stack_name(args.cluster_name)
+    """
+    Display the instances of a cluster, or of the clusters selected by name, by tags or all of them.
+
+    The instances of all the selected clusters are retrieved with a single query, see utils.describe_fleet_instances.
+    """
     PclusterConfig.init_aws(config_file=args.config_file)
+    output_json = getattr(args, "json", False)
+    fleet_selected = getattr(args, "all", False) or getattr(args, "clusters", None) or getattr(args, "tags", None)
+
+    if fleet_selected:
+        if args.cluster_name:
+            LOGGER.error("The cluster name cannot be specified together with --all, --clusters or --tags")
+            sys.exit(1)
+        _print_fleet_instances(args, output_json)
+    elif args.cluster_name:
+        _print_cluster_instances(args.cluster_name, output_json)
+    else:
+        LOGGER.error("Specify the name of a cluster, or select the clusters with --all, --clusters or --tags")
+        sys.exit(1)
+
+
+def _print_cluster_instances(cluster_name, output_json):
+    stack_name = utils.get_stack_name(cluster_name)
     cfn_stack = utils.get_stack(stack_name)
     scheduler = utils.get_cfn_param(cfn_stack.get("Parameters"), "Scheduler")
+    cluster_instances = utils.describe_fleet_instances([stack_name]).get(stack_name)
+    # Compute instances of awsbatch clusters are managed by AWS Batch
+    if scheduler == "awsbatch":
+        cluster_instances[utils.NodeType.compute] = []
 
-    instances = []
-    master_server = utils.describe_cluster_instances(stack_name, node_type=utils.NodeType.master)
-    if master_server:
-        instances.append(("MasterServer", master_server[0].get("InstanceId")))
+    if output_json:
+        LOGGER.info(json.dumps({cluster_name: _instances_to_json(cluster_instances)}, indent=2))
+    else:
+        for node_label, instance in _get_instance_rows(cluster_instances):
+            LOGGER.info("%s         %s", node_label, instance.get("InstanceId"))
+        if scheduler == "awsbatch":
+            LOGGER.info("Run 'awsbhosts --cluster %s' to list the compute instances", cluster_name)
+
+
+def _print_fleet_instances(args, output_json):
+    stack_names = None
+    if getattr(args, "clusters", None) and not getattr(args, "all", False):
+        stack_names = [utils.get_stack_name(name.strip()) for name in args.clusters.split(",") if name.strip()]
+    fleet = utils.describe_fleet_instances(stack_names, tag_filters=_parse_tag_filters(getattr(args, "tags", None)))
+    prefix_length = len(PCLUSTER_STACK_PREFIX)
+
+    if output_json:
+        LOGGER.info(
+            json.dumps(
+                OrderedDict(
+                    (stack_name[prefix_length:], _instances_to_json(cluster_instances))
+                    for stack_name, cluster_instances in fleet.items()
+                ),
+                indent=2,
+            )
+        )
+    else:
+        rows = [
+            [stack_name[prefix_length:], node_label, instance.get("InstanceId")]
+            for stack_name, cluster_instances in fleet.items()
+            for node_label, instance in _get_instance_rows(cluster_instances)
+        ]
+        if rows:
+            LOGGER.info(tabulate(rows, tablefmt="plain"))
+
+
+def _get_instance_rows(cluster_instances):
+    """Return the (node label, instance) pairs of the given instances of a cluster, the master first."""
+    rows = [("MasterServer", instance) for instance in cluster_instances.get(utils.NodeType.master)[:1]]
+    rows.extend(("ComputeFleet", instance) for instance in cluster_instances.get(utils.NodeType.compute))
+    return rows
+
+
+def _instances_to_json(cluster_instances):
+    """Convert the instances of a cluster grouped by node type into a JSON serializable dict."""
+    return OrderedDict(
+        (
+            str(node_type),
+            [
+                OrderedDict(
+                    [
+                        ("InstanceId", instance.get("InstanceId")),
+                        ("InstanceType", instance.get("InstanceType")),
+                        ("State", instance.get("State", {}).get("Name")),
+                        ("PrivateIpAddress", instance.get("PrivateIpAddress")),
+                        ("PublicIpAddress", instance.get("PublicIpAddress")),
+                        (
+                            "LaunchTime",
+                            instance.get("LaunchTime").isoformat() if instance.get("LaunchTime") else None,
+                        ),
+                    ]
+                )
+                for instance in node_instances
+            ],
+        )
+        for node_type, node_instances in cluster_instances.items()
+    )
 
-    if scheduler != "awsbatch":
-        instances.extend(_get_compute_instances(stack_name))
 
-    for instance in instances:
-        LOGGER.info("%s         %s", instance[0], instance[1])
+def _parse_tag_filters(tags):
+    """
+    Parse the tags of the --tags argument into tag filters.
 
-    if scheduler == "awsbatch":
-        LOGGER.info("Run 'awsbhosts --cluster %s' to list the compute instances", args.cluster_name)
+    :param tags: comma separated list of Key=Value items, values of the same key are alternatives
+    :return: dict tag key -> list of values
+    """
+    tag_filters = OrderedDict()
+    for tag in (tags or "").split(","):
+        if not tag.strip():
+            continue
+        if "=" not in tag:
+            LOGGER.error("Invalid tag '%s', tags must be specified as Key=Value", tag.strip())
+            sys.exit(1)
+        tag_key, tag_value = tag.split("=", 1)
+        tag_filters.setdefault(tag_key.strip(), []).append(tag_value.strip())
+    return tag_filters
 
 
 def ssh(args, extra_args):  # noqa: C901 FIXME!!!
@@ -454,28 +710,13 @@ def status(args):  # noqa: C901 FIXME!!!
     # Parse configuration file to read the AWS section
     PclusterConfig.init_aws(config_file=args.config_file)
 
-    cfn = boto3.client("cloudformation")
+    cfn = utils.get_boto3_client("cloudformation")
     try:
         stack = utils.get_stack(stack_name, cfn)
         sys.stdout.write("\rStatus: %s" % stack.get("StackStatus"))
         sys.stdout.flush()
         if not args.nowait:
-            while stack.get("StackStatus") not in [
-                "CREATE_COMPLETE",
-                "UPDATE_COMPLETE",
-                "UPDATE_ROLLBACK_COMPLETE",
-                "ROLLBACK_COMPLETE",
-                "CREATE_FAILED",
-                "DELETE_FAILED",
-            ]:
-                time.sleep(5)
-                stack = utils.get_stack(stack_name, cfn)
-                events = utils.get_stack_events(stack_name)[0]
-                resource_status = (
-                    "Status: %s - %s" % (events.get("LogicalResourceId"), events.get("ResourceStatus"))
-                ).ljust(80)
-                sys.stdout.write("\r%s" % resource_status)
-                sys.stdout.flush()
+            stack = utils.wait_for_stack(stack_name, cfn, on_event=utils.print_stack_event)
             sys.stdout.write("\rStatus: %s\n" % stack.get("StackStatus"))
             sys.stdout.flush()
             if stack.get("StackStatus") in ["CREATE_COMPLETE", "UPDATE_COMPLETE", "UPDATE_ROLLBACK_COMPLETE"]:
@@ -17,6 +17,7 @@ import yaml
 from pcluster.config.iam_policy_rules import AWSBatchFullAccessInclusionRule, CloudWatchAgentServerPolicyInclusionRule
 from pcluster.config.param_types import LOGGER, Param, Section, SettingsParam, StorageData, _ensure_section_existence
 from pcluster.config.resource_map import ResourceMap
+from pcluster.config.schema import get_section_schema
 from pcluster.constants import PCLUSTER_ISSUES_LINK
 from pcluster.utils import (
     disable_ht_via_cpu_options,
@@ -36,6 +37,8 @@ from pcluster.utils import (
 class CfnParam(Param):
     """Base class for configuration parameters using CloudFormation parameters as storage mechanism."""
 
+    __slots__ = ()
+
     def from_storage(self, storage_params):
         """Load the param from the related storage data structure."""
         return self.from_cfn_params(storage_params.cfn_params)
@@ -91,6 +94,9 @@ class CfnParam(Param):
 class CommaSeparatedCfnParam(CfnParam):
     """Class to manage comma separated parameters. E.g. additional_iam_policies."""
 
+    __slots__ = ()
+    lazy = False
+
     def from_file(self, config_parser):
         """
         Initialize parameter value from config_parser.
@@ -134,6 +140,8 @@ class CommaSeparatedCfnParam(CfnParam):
 class FloatCfnParam(CfnParam):
     """Class to manage float configuration parameters."""
 
+    __slots__ = ()
+
     def from_file(self, config_parser):
         """
         Initialize parameter value from config_parser.
@@ -171,6 +179,8 @@ class FloatCfnParam(CfnParam):
 class BoolCfnParam(CfnParam):
     """Class to manage boolean configuration parameters."""
 
+    __slots__ = ()
+
     def from_file(self, config_parser):
         """
         Initialize parameter value from config_parser.
@@ -214,6 +224,8 @@ class BoolCfnParam(CfnParam):
 class IntCfnParam(CfnParam):
     """Class to manage integer configuration parameters."""
 
+    __slots__ = ()
+
     def from_file(self, config_parser):
         """
         Initialize param_value from config_parser.
@@ -250,6 +262,9 @@ class IntCfnParam(CfnParam):
 class JsonCfnParam(CfnParam):
     """Class to manage json configuration parameters."""
 
+    __slots__ = ()
+    lazy = False
+
     def from_file(self, config_parser):
         """
         Initialize parameter value from config_parser.
@@ -299,6 +314,8 @@ class JsonCfnParam(CfnParam):
 class ExtraJsonCfnParam(JsonCfnParam):
     """Class to manage extra_json configuration parameters."""
 
+    __slots__ = ()
+
     def get_cfn_value(self):
         """
         Convert parameter value into CFN value.
@@ -330,6 +347,8 @@ class SharedDirCfnParam(CfnParam):
     and the "shared" parameter of the ebs sections (e.g. SharedDir = /shared1,/shared2,NONE,NONE,NONE).
     """
 
+    __slots__ = ()
+
     def to_cfn(self):
         """Convert parameter to CFN representation."""
         cfn_params = {}
@@ -380,6 +399,8 @@ class SpotPriceCfnParam(FloatCfnParam):
     from "spot_price" when the scheduler is a traditional one.
     """
 
+    __slots__ = ()
+
     def from_cfn_params(self, cfn_params):
         """Initialize param value by parsing CFN input only if the scheduler is a traditional one."""
         cfn_converter = self.definition.get("cfn_param_mapping", None)
@@ -417,6 +438,8 @@ class SpotBidPercentageCfnParam(IntCfnParam):
     from "spot_price" when the scheduler is a traditional one.
     """
 
+    __slots__ = ()
+
     def from_cfn_params(self, cfn_params):
         """Initialize param value by parsing CFN input only if the scheduler is awsbatch."""
         cfn_converter = self.definition.get("cfn_param_mapping", None)
@@ -448,6 +471,8 @@ class QueueSizeCfnParam(IntCfnParam):
     from "*_queue_size" when the scheduler is a traditional one.
     """
 
+    __slots__ = ()
+
     def from_cfn_params(self, cfn_params):
         """Initialize param value by parsing the right CFN input according to the scheduler."""
         cfn_converter = self.definition.get("cfn_param_mapping", None)
@@ -496,6 +521,8 @@ class MaintainInitialSizeCfnParam(BoolCfnParam):
     merging info from "initial_queue_size" and "maintain_initial_size" when the scheduler is a traditional one.
     """
 
+    __slots__ = ()
+
     def from_cfn_params(self, cfn_params):
         """Initialize param value by parsing the right CFN input."""
         cfn_converter = self.definition.get("cfn_param_mapping", None)
@@ -533,6 +560,9 @@ class AdditionalIamPoliciesCfnParam(CommaSeparatedCfnParam):
       during CFN conversion.
     """
 
+    __slots__ = ()
+    lazy = False
+
     policy_inclusion_rules = [CloudWatchAgentServerPolicyInclusionRule, AWSBatchFullAccessInclusionRule]
 
     def __init__(self, section_key, section_label, param_key, param_definition, pcluster_config, owner_section=None):
@@ -570,6 +600,9 @@ class AvailabilityZoneCfnParam(CfnParam):
     and it is used for master_availability_zone and compute_availability_zone.
     """
 
+    __slots__ = ()
+    lazy = False
+
     def _init_az(self, config_parser, subnet_parameter):
         section_name = get_file_section_name(self.section_key, self.section_label)
         if config_parser.has_option(section_name, subnet_parameter):
@@ -590,6 +623,8 @@ class MasterAvailabilityZoneCfnParam(AvailabilityZoneCfnParam):
     and it is used during EFS conversion and validation.
     """
 
+    __slots__ = ()
+
     def from_file(self, config_parser):
         """Initialize the Availability zone of the cluster by checking the Master Subnet."""
         self._init_az(config_parser, "master_subnet_id")
@@ -611,6 +646,8 @@ class ComputeAvailabilityZoneCfnParam(AvailabilityZoneCfnParam):
     and it is used during EFS conversion and validation.
     """
 
+    __slots__ = ()
+
     def from_file(self, config_parser):
         """Initialize the Availability zone of the cluster by checking the Compute Subnet."""
         self._init_az(config_parser, "compute_subnet_id")
@@ -631,6 +668,8 @@ class DisableHyperThreadingCfnParam(BoolCfnParam):
     We need this class in order to convert the boolean disable_hyperthreading = [true/false] into Cores.
     """
 
+    __slots__ = ()
+
     def from_cfn_params(self, cfn_params):
         """Initialize param value by parsing the right CFN input."""
         try:
@@ -645,8 +684,7 @@ class DisableHyperThreadingCfnParam(BoolCfnParam):
 
         return self
 
-    @staticmethod
-    def _get_cfn_params_for_instance_type(instance_type):
+    def _get_cfn_params_for_instance_type(self, instance_type):
         """
         Return a pair describing whether or not to disable HT for the instance_type and how to do so.
 
@@ -654,12 +692,13 @@ class DisableHyperThreadingCfnParam(BoolCfnParam):
         HT is disabled (or "NONE" if it shouldn't be disabled). The second item is a boolean expressing
         if HT should be disabled via CPU Options for the given instance type.
         """
-        default_threads_per_core = get_default_threads_per_core(instance_type)
+        instance_info = self.pcluster_config.get_instance_type_info(instance_type)
+        default_threads_per_core = get_default_threads_per_core(instance_type, instance_info)
         if default_threads_per_core == 1:
             # no action is required to disable hyperthreading
             cores = "NONE"
         else:
-            cores = get_instance_vcpus(instance_type) // default_threads_per_core
+            cores = get_instance_vcpus(instance_type, instance_info) // default_threads_per_core
 
         return cores, disable_ht_via_cpu_options(instance_type, default_threads_per_core)
 
@@ -719,6 +758,8 @@ class ClusterConfigMetadataCfnParam(JsonCfnParam):
     labels and their corresponding CloudFormation resources.
     """
 
+    __slots__ = ("__section_resources",)
+
     def _from_definition(self):
         self.value = self.get_default_value()
         self.__section_resources = ResourceMap(self.value.get("sections"))
@@ -761,6 +802,10 @@ class ClusterConfigMetadataCfnParam(JsonCfnParam):
             self.__store_section_labels(section_key)
         self.value["sections"] = self.__section_resources.resources()
 
+    def get_refresh_inputs(self):
+        """Return the structure revision of the configuration, the only input of the labels stored in the metadata."""
+        return self.pcluster_config.get_sections_revision()
+
     def get_section_resources(self, section_key):
         """Get the resources linked to a specific section key in the configuration metadata."""
         return self.__section_resources.resources(section_key)
@@ -793,12 +838,17 @@ class BaseOSCfnParam(CfnParam):
     We need this class in order to initialize the private architecture param.
     """
 
+    __slots__ = ()
+    lazy = False
+
     @staticmethod
-    def get_instance_type_architecture(instance_type):
+    def get_instance_type_architecture(instance_type, instance_info=None):
         """Compute cluster's 'Architecture' CFN parameter based on its master server instance type."""
         if not instance_type:
             error("Cannot infer architecture without master instance type")
-        master_inst_supported_architectures = get_supported_architectures_for_instance_type(instance_type)
+        master_inst_supported_architectures = get_supported_architectures_for_instance_type(
+            instance_type, instance_info
+        )
 
         if not master_inst_supported_architectures:
             error("Unable to get architectures supported by instance type {0}.".format(instance_type))
@@ -813,9 +863,19 @@ class BaseOSCfnParam(CfnParam):
         """Initialize the private architecture param."""
         if self.value:
             master_inst_type = self.owner_section.get_param_value("master_instance_type")
-            architecture = self.get_instance_type_architecture(master_inst_type)
+            architecture = self.get_instance_type_architecture(
+                master_inst_type, self.pcluster_config.get_instance_type_info(master_inst_type)
+            )
             self.owner_section.get_param("architecture").value = architecture
 
+    def get_refresh_inputs(self):
+        """Return base_os, master_instance_type and architecture, which is recomputed if changed by other means."""
+        return (
+            self.value,
+            self.owner_section.get_param_value("master_instance_type"),
+            self.owner_section.get_param_value("architecture"),
+        )
+
 
 class TagsParam(JsonCfnParam):
     """
@@ -825,6 +885,8 @@ class TagsParam(JsonCfnParam):
     Therefore, we need to overwrite the from_storage function
     """
 
+    __slots__ = ()
+
     def from_storage(self, storage_params):
         """Load the param from the related storage data structure."""
         return self.from_cfn_tag(storage_params.cfn_tags)
@@ -845,6 +907,8 @@ class TagsParam(JsonCfnParam):
 class SettingsCfnParam(SettingsParam):
     """Class to manage *_settings parameter on which the value is a single value (e.g. vpc_settings = default)."""
 
+    __slots__ = ()
+
     def from_storage(self, storage_params):
         """Initialize section configuration parameters referred by the settings value by parsing CFN parameters."""
         self.value = self.get_default_value()
@@ -924,6 +988,8 @@ class EBSSettingsCfnParam(SettingsCfnParam):
     Furthermore, as opposed to SettingsParam, the value can be a comma separated value (e.g. ebs_settings = ebs1,ebs2).
     """
 
+    __slots__ = ()
+
     def from_storage(self, storage_params):
         """Init ebs section only if there are more than one ebs (the default one)."""
         labels = []
@@ -937,6 +1003,12 @@ class EBSSettingsCfnParam(SettingsCfnParam):
                 # specified through the shared_dir configuration parameter only
                 # If SharedDir contains comma, we need to create at least one ebs section
                 labels = self.get_metadata_labels(expected_num_labels=num_of_ebs, include_none_values=False)
+                # Each CFN parameter contains the values of all the sections, split them only once
+                schema = get_section_schema(self.referred_section_definition)
+                cfn_values = {
+                    cfn_converter: get_cfn_param(cfn_params, cfn_converter).split(",")
+                    for cfn_converter in schema.params_by_cfn_name
+                }
                 for index in range(len(labels)):
                     # create empty section
                     referred_section_type = self.referred_section_definition.get("type", CfnSection)
@@ -944,16 +1016,13 @@ class EBSSettingsCfnParam(SettingsCfnParam):
                         self.referred_section_definition, self.pcluster_config, labels[index]
                     )
 
-                    for param_key, param_definition in self.referred_section_definition.get("params").items():
-                        cfn_converter = param_definition.get("cfn_param_mapping", None)
-                        if cfn_converter:
-
-                            param_type = param_definition.get("type", CfnParam)
-                            cfn_value = get_cfn_param(cfn_params, cfn_converter).split(",")[index]
-                            param = param_type(
-                                self.section_key, self.section_label, param_key, param_definition, self.pcluster_config
-                            ).from_cfn_value(cfn_value)
-                            referred_section.add_param(param)
+                    for param_key, param_definition, cfn_converter in schema.cfn_params:
+                        param_type = param_definition.get("type", CfnParam)
+                        cfn_value = cfn_values[cfn_converter][index]
+                        param = param_type(
+                            self.section_key, self.section_label, param_key, param_definition, self.pcluster_config
+                        ).from_cfn_value(cfn_value)
+                        referred_section.add_param(param)
 
                     self.pcluster_config.add_section(referred_section)
 
@@ -1030,6 +1099,8 @@ class EBSSettingsCfnParam(SettingsCfnParam):
 class CfnSection(Section):
     """Class to manage configuration sections with storage persistence in CloudFormation."""
 
+    __slots__ = ()
+
     def from_storage(self, storage_params):
         """Initialize section configuration parameters by parsing CFN parameters."""
         cfn_converter = self.definition.get("cfn_param_mapping", None)
@@ -1038,7 +1109,7 @@ class CfnSection(Section):
             cfn_values = get_cfn_param(storage_params.cfn_params, cfn_converter).split(",")
 
             cfn_param_index = 0
-            for param_key, param_definition in self.definition.get("params").items():
+            for param_key, param_definition in get_section_schema(self.definition).params:
                 try:
                     cfn_value = cfn_values[cfn_param_index]
                 except IndexError:
@@ -1054,7 +1125,7 @@ class CfnSection(Section):
                 self.add_param(param)
                 cfn_param_index += 1
         else:
-            for param_key, param_definition in self.definition.get("params").items():
+            for param_key, param_definition in get_section_schema(self.definition).params:
                 param_type = param_definition.get("type", CfnParam)
                 param = param_type(
                     self.key, self.label, param_key, param_definition, self.pcluster_config, owner_section=self
@@ -1117,6 +1188,8 @@ class EFSCfnSection(CfnSection):
     We need to define this class because during the CFN conversion it is required to perform custom actions.
     """
 
+    __slots__ = ()
+
     def to_storage(self, storage_params=None):
         """
         Convert section to CFN representation.
@@ -1176,6 +1249,8 @@ class ClusterCfnSection(CfnSection):
     that identifies the label in the template.
     """
 
+    __slots__ = ()
+
     def from_storage(self, storage_params):
         """Initialize section configuration parameters by parsing CFN parameters."""
         if storage_params:
@@ -1199,6 +1274,9 @@ class ClusterCfnSection(CfnSection):
 class VolumeSizeParam(IntCfnParam):
     """Class to manage ebs volume_size parameter."""
 
+    __slots__ = ()
+    lazy = False
+
     def refresh(self):
         """
         We need this method to check whether the user have an input on ebs volume_size.
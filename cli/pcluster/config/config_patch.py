@@ -8,10 +8,7 @@
 # or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
 # OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
 # limitations under the License.
-import copy
 import logging
-import re
-import sys
 from collections import namedtuple
 
 # Represents a single parameter change in a ConfigPatch instance
@@ -21,12 +18,6 @@ from pcluster.utils import get_file_section_name
 
 Change = namedtuple("Change", ["section_key", "section_label", "param_key", "old_value", "new_value", "update_policy"])
 
-# Patch for deepcopy bug - Issue10076 in Pyhton < 3.7
-# see https://bugs.python.org/issue10076
-# see https://docs.python.org/3/whatsnew/3.7.html#re
-if sys.version_info <= (3, 7):
-    copy._deepcopy_dispatch[type(re.compile(""))] = lambda r, _: r
-
 LOGGER = logging.getLogger(__name__)
 
 
@@ -61,13 +52,9 @@ class ConfigPatch(object):
         # Cached condition results
         self.condition_results = {}
 
-        # Make a deep copy of the basic and target configurations to avoid changing the original ones
-        self.base_config = copy.deepcopy(base_config)
-        self.target_config = copy.deepcopy(target_config)
-
-        # Disable autorefresh to avoid breakages due to changes made to the configurations when creating the patch
-        self.base_config.auto_refresh = False
-        self.target_config.auto_refresh = False
+        # The configurations are only read when creating the patch, so no copy of them is needed
+        self.base_config = base_config
+        self.target_config = target_config
 
         self.changes = []
         self._compare()
@@ -96,36 +83,53 @@ class ConfigPatch(object):
         All detected changes are added to the internal changes list, ready to be checked  through the public check()
         method.
         """
-        # Remove ignored sections
-        self._remove_ignored_sections(self.base_config)
-        self._remove_ignored_sections(self.target_config)
-
-        # First, compare all sections from target vs base config and mark visited base sections.
-        for section_key in sorted(self.target_config.get_section_keys()):
-            for section_label in sorted(self.target_config.get_sections(section_key).keys()):
-                target_section = self.target_config.get_section(section_key, section_label)
-                base_section = self._get_config_section(self.base_config, target_section)
-                base_section.visited = True
+        base_sections = self._get_sections_snapshot(self.base_config)
+        target_sections = self._get_sections_snapshot(self.target_config)
+
+        # First, compare all sections from target vs base config, then all base sections missing in target config.
+        for section_id in sorted(target_sections):
+            target_section = target_sections[section_id]
+            base_section = base_sections.get(section_id)
+            if base_section:
                 self._compare_section(base_section, target_section)
+            else:
+                self._compare_section(
+                    self._create_default_section(self.base_config, target_section),
+                    target_section,
+                    mock_base_section=True,
+                )
+
+        for section_id in sorted(set(base_sections) - set(target_sections)):
+            base_section = base_sections[section_id]
+            self._compare_section(
+                base_section,
+                self._create_default_section(self.target_config, base_section),
+                mock_target_section=True,
+            )
 
-        # Then, compare all non visited base sections vs target config.
-        for section_key in sorted(self.base_config.get_section_keys()):
-            for section_label in sorted(self.base_config.get_sections(section_key).keys()):
-                base_section = self.base_config.get_section(section_key, section_label)
-                if not hasattr(base_section, "visited"):
-                    target_section = self._get_config_section(self.target_config, base_section)
-                    self._compare_section(base_section, target_section)
+    @staticmethod
+    def _get_sections_snapshot(config):
+        """
+        Return a dict (section key, section label) -> section with the sections of the configuration to compare.
+
+        Global file sections are ignored for patch creation.
+        """
+        return {
+            (section_key, section_label): section
+            for section_key in config.get_section_keys()
+            for section_label, section in config.get_sections(section_key).items()
+        }
 
-    def _compare_section(self, base_section, target_section):
+    def _compare_section(self, base_section, target_section, mock_base_section=False, mock_target_section=False):
         """
         Compare the provided base and target sections and append the detected changes to the internal changes list.
 
         :param base_section: The section in the base configuration
         :param target_section: The corresponding section in the target configuration
+        :param mock_base_section: True if the base section is a default one, created because missing in base config
+        :param mock_target_section: True if the target section is a default one, created because missing in target
         """
-        # If one of the two sections is marked as mock, all detected changes will also be mock
-        mock_base_section = hasattr(base_section, "mock")
-        mock_target_section = hasattr(target_section, "mock")
+        # If one of the two sections is a mock, all detected changes will also be mock
         mock_change = mock_base_section or mock_target_section
 
         for _, param in target_section.params.items():
@@ -151,11 +155,6 @@ class ConfigPatch(object):
                     )
                 )
 
-    def _remove_ignored_sections(self, config):
-        # global file sections are ignored for patch creation
-        for section_key in config.get_global_section_keys():
-            config.remove_section(section_key)
-
     @property
     def update_policy_level(self):
         """
@@ -186,27 +185,8 @@ class ConfigPatch(object):
         default_section = section_type(
             section_definition=section_definition, pcluster_config=config, section_label=section.label
         )
-
-        default_section.mock = True
         return default_section
 
-    def _get_config_section(self, config, section):
-        """
-        Get the section corresponding to the provided one in the specified configuration.
-
-        If no section is found, a default copy of the provided section is created on the fly.
-
-        :param config: The configuration where to get the section from
-        :param section: The section to be matched
-        :return: The matching section
-        """
-        config_section = config.get_section(section.key, section.label)
-
-        # If section is not present in base config, a default copy is generated
-        if not config_section:
-            config_section = self._create_default_section(config, section)
-        return config_section
-
     def check(self):
         """
         Check the patch against the existing cluster stack.
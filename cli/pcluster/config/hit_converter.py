@@ -40,10 +40,6 @@ class HitConverter:
             # Copying sections referred from cluster or global ones
             self._store_original_sections()
 
-            # Save current autorefresh settings and disable autorefresh
-            auto_refresh = self.pcluster_config.auto_refresh
-            self.pcluster_config.auto_refresh = False
-
             sit_cluster_section = self.pcluster_config.get_section("cluster")
             scheduler = sit_cluster_section.get_param_value("scheduler")
 
@@ -54,88 +50,93 @@ class HitConverter:
                 LOGGER.debug(
                     "Slurm scheduler used with Single Instance Type configuration model. Starting conversion...",
                 )
-                hit_cluster_section = ClusterCfnSection(
-                    section_definition=mappings.CLUSTER_HIT,
-                    pcluster_config=self.pcluster_config,
-                    section_label=sit_cluster_section.label,
-                )
+                # Apply all the changes with a single refresh of the configuration
+                with self.pcluster_config.deferred_refresh():
+                    hit_cluster_section = ClusterCfnSection(
+                        section_definition=mappings.CLUSTER_HIT,
+                        pcluster_config=self.pcluster_config,
+                        section_label=sit_cluster_section.label,
+                    )
 
-                # Remove SIT Cluster section and add HIT Section
-                self.pcluster_config.remove_section(sit_cluster_section.key, sit_cluster_section.label)
-                self.pcluster_config.add_section(hit_cluster_section)
+                    # Remove SIT Cluster section and add HIT Section
+                    self.pcluster_config.remove_section(sit_cluster_section.key, sit_cluster_section.label)
+                    self.pcluster_config.add_section(hit_cluster_section)
 
-                # Create default queue section
-                queue_section = QueueJsonSection(
-                    mappings.QUEUE, self.pcluster_config, section_label="compute", parent_section=hit_cluster_section
-                )
-                self.pcluster_config.add_section(queue_section)
-                hit_cluster_section.get_param("queue_settings").value = "compute"
-
-                self._copy_param_value(
-                    sit_cluster_section.get_param("cluster_type"), queue_section.get_param("compute_type")
-                )
-                self._copy_param_value(
-                    sit_cluster_section.get_param("enable_efa"),
-                    queue_section.get_param("enable_efa"),
-                    "compute" == sit_cluster_section.get_param("enable_efa").value,
-                )
-                self._copy_param_value(
-                    sit_cluster_section.get_param("placement_group"), queue_section.get_param("placement_group")
-                )
+                    # Create default queue section
+                    queue_section = QueueJsonSection(
+                        mappings.QUEUE,
+                        self.pcluster_config,
+                        section_label="compute",
+                        parent_section=hit_cluster_section,
+                    )
+                    self.pcluster_config.add_section(queue_section)
+                    hit_cluster_section.get_param("queue_settings").value = "compute"
 
-                # Print a warning for unsupported parameters
-                if sit_cluster_section.get_param_value("placement") == "cluster":
-                    LOGGER.debug(
-                        "Warning: 'placement = cluster' is not supported when using multiple instance types.",
+                    self._copy_param_value(
+                        sit_cluster_section.get_param("cluster_type"), queue_section.get_param("compute_type")
+                    )
+                    self._copy_param_value(
+                        sit_cluster_section.get_param("enable_efa"),
+                        queue_section.get_param("enable_efa"),
+                        "compute" == sit_cluster_section.get_param("enable_efa").value,
+                    )
+                    self._copy_param_value(
+                        sit_cluster_section.get_param("placement_group"), queue_section.get_param("placement_group")
                     )
 
-                # Create default single compute resource
-                compute_resource_section = JsonSection(
-                    mappings.COMPUTE_RESOURCE,
-                    self.pcluster_config,
-                    section_label="default",
-                    parent_section=queue_section,
-                )
-                self.pcluster_config.add_section(compute_resource_section)
-                queue_section.get_param("compute_resource_settings").value = "default"
+                    # Print a warning for unsupported parameters
+                    if sit_cluster_section.get_param_value("placement") == "cluster":
+                        LOGGER.debug(
+                            "Warning: 'placement = cluster' is not supported when using multiple instance types.",
+                        )
 
-                self._copy_param_value(
-                    sit_cluster_section.get_param("compute_instance_type"),
-                    compute_resource_section.get_param("instance_type"),
-                )
+                    # Create default single compute resource
+                    compute_resource_section = JsonSection(
+                        mappings.COMPUTE_RESOURCE,
+                        self.pcluster_config,
+                        section_label="default",
+                        parent_section=queue_section,
+                    )
+                    self.pcluster_config.add_section(compute_resource_section)
+                    queue_section.get_param("compute_resource_settings").value = "default"
 
-                self._copy_param_value(
-                    sit_cluster_section.get_param("max_queue_size"), compute_resource_section.get_param("max_count")
-                )
+                    self._copy_param_value(
+                        sit_cluster_section.get_param("compute_instance_type"),
+                        compute_resource_section.get_param("instance_type"),
+                    )
 
-                self._copy_param_value(
-                    sit_cluster_section.get_param("spot_price"), compute_resource_section.get_param("spot_price")
-                )
+                    self._copy_param_value(
+                        sit_cluster_section.get_param("max_queue_size"), compute_resource_section.get_param("max_count")
+                    )
 
-                # SIT initial size is copied to min_count or to initial_count based on SIT maintain_initial_size
-                sit_initial_size_param = sit_cluster_section.get_param("initial_queue_size")
-                sit_maintain_initial_size_param = sit_cluster_section.get_param_value("maintain_initial_size")
-                compute_resource_size_param_key = "min_count" if sit_maintain_initial_size_param else "initial_count"
-                self._copy_param_value(
-                    sit_initial_size_param, compute_resource_section.get_param(compute_resource_size_param_key)
-                )
+                    self._copy_param_value(
+                        sit_cluster_section.get_param("spot_price"), compute_resource_section.get_param("spot_price")
+                    )
 
-                # Copy all cluster params except enable_efa (already set at queue level)
-                hit_cluster_param_keys = [
-                    param_key for param_key in hit_cluster_section.params.keys() if param_key not in ["enable_efa"]
-                ]
-                for param_key in sit_cluster_section.params.keys():
-                    if param_key in hit_cluster_param_keys:
-                        self._copy_param_value(
-                            sit_cluster_section.get_param(param_key), hit_cluster_section.get_param(param_key)
-                        )
+                    # SIT initial size is copied to min_count or to initial_count based on SIT maintain_initial_size
+                    sit_initial_size_param = sit_cluster_section.get_param("initial_queue_size")
+                    sit_maintain_initial_size_param = sit_cluster_section.get_param_value("maintain_initial_size")
+                    compute_resource_size_param_key = (
+                        "min_count" if sit_maintain_initial_size_param else "initial_count"
+                    )
+                    self._copy_param_value(
+                        sit_initial_size_param, compute_resource_section.get_param(compute_resource_size_param_key)
+                    )
+
+                    # Copy all cluster params except enable_efa (already set at queue level)
+                    hit_cluster_param_keys = [
+                        param_key for param_key in hit_cluster_section.params.keys() if param_key not in ["enable_efa"]
+                    ]
+                    for param_key in sit_cluster_section.params.keys():
+                        if param_key in hit_cluster_param_keys:
+                            self._copy_param_value(
+                                sit_cluster_section.get_param(param_key), hit_cluster_section.get_param(param_key)
+                            )
 
-                # Restore cluster nested sections, with owner modified
-                self._restore_original_sections(hit_cluster_section)
+                    # Restore cluster nested sections, with owner modified
+                    self._restore_original_sections(hit_cluster_section)
 
-                # Refresh configuration and restore initial autorefresh settings
-                self.pcluster_config.refresh()
-                self.pcluster_config.auto_refresh = auto_refresh
+                    self.pcluster_config.refresh()
 
                 self.clean_config_parser(hit_cluster_section)
                 if prepare_to_file:
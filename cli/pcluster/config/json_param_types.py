@@ -12,6 +12,7 @@ from collections import OrderedDict
 
 from pcluster import utils
 from pcluster.config.param_types import Param, Section, SettingsParam
+from pcluster.config.schema import get_section_schema
 
 # ---------------------- Params ---------------------- #
 
@@ -19,6 +20,8 @@ from pcluster.config.param_types import Param, Section, SettingsParam
 class JsonParam(Param):
     """Base class to manage configuration parameters stored in Json format."""
 
+    __slots__ = ()
+
     def get_value_type(self):
         """Return the type of the value managed by the Param."""
         return str
@@ -41,7 +44,7 @@ class JsonParam(Param):
 
     def from_storage(self, storage_params):
         """Load the param from the provided Json storage params dict."""
-        storage_value = _get_storage_subdict(self, storage_params.json_params).get(
+        storage_value = _get_storage_subdict(self.owner_section, storage_params.json_params).get(
             self.get_storage_key(), self.get_default_value()
         )
         self.value = storage_value
@@ -49,7 +52,7 @@ class JsonParam(Param):
 
     def to_storage(self, storage_params):
         """Store the param into the provided Json storage params dict."""
-        _get_storage_subdict(self, storage_params.json_params)[self.get_storage_key()] = self.value
+        _get_storage_subdict(self.owner_section, storage_params.json_params)[self.get_storage_key()] = self.value
 
     def _parse_value(self, config_parser, section_name):
         """Parse the value from config file, converting to the needed type for the specific param."""
@@ -60,6 +63,8 @@ class JsonParam(Param):
 class IntJsonParam(JsonParam):
     """Base JsonParam to manage int parameters."""
 
+    __slots__ = ()
+
     def get_value_type(self):
         """Return the type of the value managed by the Param."""
         return int
@@ -73,6 +78,8 @@ class IntJsonParam(JsonParam):
 class BooleanJsonParam(JsonParam):
     """Base JsonParam to manage boolean parameters."""
 
+    __slots__ = ()
+
     def get_value_type(self):
         """Return the type of the value managed by the Param."""
         return bool
@@ -90,6 +97,8 @@ class BooleanJsonParam(JsonParam):
 class FloatJsonParam(JsonParam):
     """Base JsonParam to manage float parameters."""
 
+    __slots__ = ()
+
     def get_value_type(self):
         """Return the type of the value managed by the Param."""
         return float
@@ -103,18 +112,21 @@ class FloatJsonParam(JsonParam):
 class ScaleDownIdleTimeJsonParam(JsonParam):
     """JsonParam to manage scaledown_idletime for Json configuration."""
 
+    __slots__ = ()
+    lazy = False
+    storage_key = "scaledown_idletime"
+
     def refresh(self):
         """Take the value from the scaledown_idletime cfn parameter."""
         self.value = self.owner_section.get_param("scaledown_idletime").value
 
-    def get_storage_key(self):
-        """Return the key by which the current param must be stored in the JSON."""
-        return "scaledown_idletime"
-
 
 class DefaultComputeQueueJsonParam(JsonParam):
     """JsonParam to manage default_queue parameter in cluster section."""
 
+    __slots__ = ()
+    lazy = False
+
     def refresh(self):
         """Take the label of the first queue as value."""
         queue_settings_param = self.pcluster_config.get_section("cluster").get_param("queue_settings")
@@ -130,6 +142,8 @@ class DefaultComputeQueueJsonParam(JsonParam):
 class SettingsJsonParam(SettingsParam):
     """Settings params with storage in Json."""
 
+    __slots__ = ()
+
     def to_storage(self, storage_params):
         """
         Convert the referred sections into the json storage representation.
@@ -180,7 +194,7 @@ class SettingsJsonParam(SettingsParam):
         then each subsection is loaded from storage as well.
         """
         json_params = storage_params.json_params
-        json_subdict = _get_storage_subdict(self, json_params)
+        json_subdict = _get_storage_subdict(self.owner_section, json_params)
         labels = None
         if json_subdict:
             if self.referred_section_definition.get("max_resources", 1) > 1:
@@ -212,9 +226,24 @@ class SettingsJsonParam(SettingsParam):
 class JsonSection(Section):
     """Class representing configuration sections which are persisted in Json."""
 
+    __slots__ = ()
+
     def from_storage(self, storage_params):
-        """Load the section from storage params."""
-        for param_key, param_definition in self.definition.get("params").items():
+        """
+        Load the section from storage params.
+
+        Params of lazy types not found in the Json are not created, since their value would be the default one.
+        """
+        schema = get_section_schema(self.definition)
+        storage_subdict = _get_storage_subdict(self, storage_params.json_params)
+        stored_param_keys = set(
+            schema.params_by_storage_key[storage_key][0]
+            for storage_key in storage_subdict
+            if storage_key in schema.params_by_storage_key
+        )
+        for param_key, param_definition in schema.params:
+            if param_key not in stored_param_keys and self._is_lazy(param_definition):
+                continue
             param_type = param_definition.get("type", Param)
             param = param_type(
                 self.key, self.label, param_key, param_definition, self.pcluster_config, owner_section=self
@@ -224,7 +253,7 @@ class JsonSection(Section):
 
     def to_storage(self, storage_params):
         """Write the section into storage params."""
-        for param_key, _ in self.definition.get("params").items():
+        for param_key, _ in get_section_schema(self.definition).params:
             param = self.get_param(param_key)
             if param:
                 param.to_storage(storage_params)
@@ -237,10 +266,10 @@ class JsonSection(Section):
         """Get the default Param type managed by the Section type."""
         return JsonParam
 
-    def refresh(self):
+    def refresh(self, incremental=False):
         """Refresh the Json section."""
         self.refresh_section()
-        super(JsonSection, self).refresh()
+        super(JsonSection, self).refresh(incremental)
 
     def refresh_section(self):
         """Perform custom refresh operations."""
@@ -250,6 +279,8 @@ class JsonSection(Section):
 class QueueJsonSection(JsonSection):
     """JSon Section for queues."""
 
+    __slots__ = ()
+
     def refresh_section(self):
         """Take values of disable_hyperthreading and enable_efa from cluster section if not specified."""
         if self.get_param_value("disable_hyperthreading") is None:
@@ -281,7 +312,7 @@ class QueueJsonSection(JsonSection):
         instance_type_param = compute_resource_section.get_param("instance_type")
 
         if instance_type_param.value:
-            instance_type = utils.get_instance_type(instance_type_param.value)
+            instance_type = self.pcluster_config.get_instance_type_info(instance_type_param.value)
 
             # Set vcpus according to queue's disable_hyperthreading and instance features
             ht_disabled = self.get_param_value("disable_hyperthreading")
@@ -320,7 +351,7 @@ class QueueJsonSection(JsonSection):
             ).value = compute_resource_section.get_param(
                 "disable_hyperthreading"
             ).value and utils.disable_ht_via_cpu_options(
-                instance_type_param.value, utils.get_default_threads_per_core(instance_type_param.value, instance_type)
+                instance_type_param.value, default_threads_per_core
             )
 
             # Set initial_count to min_count if not manually set
@@ -330,9 +361,9 @@ class QueueJsonSection(JsonSection):
 
 
 # ---------------------- Common functions ---------------------- #
-def _get_storage_subdict(param, json_storage_params):
-    """Get the JSON configuration subdictionary where the current parameter must be stored."""
-    parent_section = param.owner_section
+def _get_storage_subdict(section, json_storage_params):
+    """Get the JSON configuration subdictionary where the params of the given section must be stored."""
+    parent_section = section
     sections_path = []
     while parent_section:
         sections_path.insert(0, parent_section)
@@ -238,6 +238,7 @@ VPC = {
             "cfn_param_mapping": "MasterSubnetId",
             "allowed_values": ALLOWED_VALUES["subnet_id"],
             "validators": [ec2_subnet_id_validator],
+            "ec2_resource_type": "subnet",
             "update_policy": UpdatePolicy.UNSUPPORTED
         },
         "ssh_from": {
@@ -250,12 +251,14 @@ VPC = {
             "cfn_param_mapping": "AdditionalSG",
             "allowed_values": ALLOWED_VALUES["security_group_id"],
             "validators": [ec2_security_group_validator],
+            "ec2_resource_type": "security_group",
             "update_policy": UpdatePolicy.SUPPORTED
         },
         "compute_subnet_id": {
             "cfn_param_mapping": "ComputeSubnetId",
             "allowed_values": ALLOWED_VALUES["subnet_id"],
             "validators": [ec2_subnet_id_validator],
+            "ec2_resource_type": "subnet",
             "update_policy": UpdatePolicy.COMPUTE_FLEET_STOP
         },
         "compute_subnet_cidr": {
@@ -273,6 +276,7 @@ VPC = {
             "cfn_param_mapping": "VPCSecurityGroupId",
             "allowed_values": ALLOWED_VALUES["security_group_id"],
             "validators": [ec2_security_group_validator],
+            "ec2_resource_type": "security_group",
             "update_policy": UpdatePolicy.SUPPORTED
         },
         "master_availability_zone": {
@@ -307,6 +311,7 @@ EBS = {
         "ebs_snapshot_id": {
             "allowed_values": ALLOWED_VALUES["snapshot_id"],
             "cfn_param_mapping": "EBSSnapshotId",
+            "ec2_resource_type": "snapshot",
             "update_policy": UpdatePolicy.UNSUPPORTED
         },
         "volume_type": {
@@ -348,6 +353,7 @@ EBS = {
             "cfn_param_mapping": "EBSVolumeId",
             "allowed_values": ALLOWED_VALUES["volume_id"],
             "validators": [ec2_volume_validator],
+            "ec2_resource_type": "volume",
             "update_policy": UpdatePolicy.UNSUPPORTED
         },
     },
@@ -592,6 +598,7 @@ COMPUTE_RESOURCE = {
             "type": JsonParam,
             "validators": [ec2_instance_type_validator, instances_architecture_compatibility_validator],
             "required": True,
+            "ec2_instance_type": True,
             "update_policy": UpdatePolicy.COMPUTE_FLEET_STOP
         }),
         ("min_count", {
@@ -699,6 +706,7 @@ CLUSTER_COMMON_PARAMS = [
         "cfn_param_mapping": "KeyName",
         "required": True,
         "validators": [ec2_key_pair_validator],
+        "ec2_resource_type": "key_pair",
         "update_policy": UpdatePolicy.UNSUPPORTED
     }),
     ("base_os", {
@@ -721,6 +729,7 @@ CLUSTER_COMMON_PARAMS = [
         "default": "t2.micro",
         "cfn_param_mapping": "MasterInstanceType",
         "validators": [ec2_instance_type_validator],
+        "ec2_instance_type": True,
         "update_policy": UpdatePolicy.UNSUPPORTED,
     }),
     ("master_root_volume_size", {
@@ -797,6 +806,7 @@ CLUSTER_COMMON_PARAMS = [
         "cfn_param_mapping": "CustomAMI",
         "allowed_values": ALLOWED_VALUES["ami_id"],
         "validators": [ec2_ami_validator],
+        "ec2_resource_type": "image",
         "update_policy": UpdatePolicy.UNSUPPORTED,
     }),
     ("pre_install", {
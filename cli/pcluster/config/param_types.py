@@ -18,6 +18,7 @@ from enum import Enum
 from configparser import NoSectionError
 
 from pcluster.config.update_policy import UpdatePolicy
+from pcluster.config.validation_engine import Validation, run_validations
 from pcluster.config.validators import settings_validator
 from pcluster.utils import get_file_section_name
 
@@ -26,7 +27,7 @@ LOGGER = logging.getLogger(__name__)
 if sys.version_info >= (3, 4):
     ABC = abc.ABC
 else:
-    ABC = abc.ABCMeta("ABC", (), {})
+    ABC = abc.ABCMeta("ABC", (), {"__slots__": ()})
 
 
 # ---------------------- StorageData ---------------------- #
@@ -56,6 +57,22 @@ class Param(ABC):
     data storage.
     """
 
+    __slots__ = (
+        "section_key",
+        "section_label",
+        "key",
+        "definition",
+        "pcluster_config",
+        "owner_section",
+        "value",
+        "_refresh_inputs",
+    )
+    # Params of lazy types are created by the Section only when accessed or set in the file, until then their value
+    # is the default of the definition. Types computing their value from the configuration must not be lazy.
+    lazy = True
+    # Key by which the param is stored in the Json storage, the param key if not set
+    storage_key = None
+
     def __init__(self, section_key, section_label, param_key, param_definition, pcluster_config, owner_section=None):
         self.section_key = section_key
         self.section_label = section_label
@@ -66,6 +83,8 @@ class Param(ABC):
 
         # initialize parameter value by using default specified in the mappings file
         self.value = None
+        # Inputs of the last refresh, see refresh_if_outdated
+        self._refresh_inputs = None
         self._from_definition()
 
     def get_value_from_string(self, string_value):
@@ -148,28 +167,39 @@ class Param(ABC):
 
     def validate(self):
         """Call validation functions for the parameter, if there."""
+        run_validations(self.get_validations(), self.pcluster_config)
+
+    def get_validations(self):
+        """Return the validations of the parameter, in the order their outcome must be reported."""
+        node = (self.section_key, self.section_label)
+        validations = []
         if self.definition.get("required") and self.value is None:
-            sys.exit("Configuration parameter '{0}' must have a value".format(self.key))
+            validations.append(
+                Validation.check(
+                    node, lambda: sys.exit("Configuration parameter '{0}' must have a value".format(self.key))
+                )
+            )
 
-        for validation_func in self.definition.get("validators", []):
-            if self.value is None:
+        if self.value is None:
+            if self.definition.get("validators"):
                 LOGGER.debug("Configuration parameter '%s' has no value", self.key)
-            else:
-                errors, warnings = validation_func(self.key, self.value, self.pcluster_config)
-                if errors:
-                    self.pcluster_config.error(
-                        "The configuration parameter '{0}' generated the following errors:\n{1}".format(
-                            self.key, "\n".join(errors)
-                        )
-                    )
-                elif warnings:
-                    self.pcluster_config.warn(
-                        "The configuration parameter '{0}' generated the following warnings:\n{1}".format(
-                            self.key, "\n".join(warnings)
-                        )
+        else:
+            for validation_func in self.definition.get("validators", []):
+                validations.append(
+                    Validation(
+                        node,
+                        validation_func,
+                        (self.key, self.value, self.pcluster_config),
+                        error_header="The configuration parameter '{0}' generated the following errors:".format(
+                            self.key
+                        ),
+                        warning_header="The configuration parameter '{0}' generated the following warnings:".format(
+                            self.key
+                        ),
+                        valid_message="Configuration parameter '{0}' is valid".format(self.key),
                     )
-                else:
-                    LOGGER.debug("Configuration parameter '%s' is valid", self.key)
+                )
+        return validations
 
     def to_file(self, config_parser, write_defaults=False):
         """Set parameter in the config_parser in the right section."""
@@ -223,6 +253,22 @@ class Param(ABC):
         """
         pass
 
+    def get_refresh_inputs(self):
+        """
+        Return the values the refresh of the parameter depends on, None if they are not known.
+
+        Subclasses with expensive refresh operations can implement this method so that the incremental refresh of the
+        configuration skips them as long as these values do not change. Values must be immutable.
+        """
+        return None
+
+    def refresh_if_outdated(self, force=False):
+        """Refresh the parameter if forced or if the values its refresh depends on changed since the last one."""
+        refresh_inputs = self.get_refresh_inputs()
+        if force or refresh_inputs is None or refresh_inputs != self._refresh_inputs:
+            self.refresh()
+            self._refresh_inputs = self.get_refresh_inputs()
+
     def get_update_policy(self):
         """Get the update policy of the parameter."""
         return self.definition.get("update_policy", UpdatePolicy.UNKNOWN)
@@ -242,7 +288,7 @@ class Param(ABC):
 
         By default the param key is used as storage key.
         """
-        return self.key
+        return self.storage_key or self.key
 
 
 # ---------------------- SettingsParam ---------------------- #
@@ -255,6 +301,9 @@ class SettingsParam(Param):
     section.
     """
 
+    __slots__ = ("referred_section_definition", "referred_section_key", "referred_section_type")
+    lazy = False
+
     def __init__(self, section_key, section_label, param_key, param_definition, pcluster_config, owner_section=None):
         """Extend Param by adding info regarding the section referred by the settings."""
         self.referred_section_definition = param_definition.get("referred_section")
@@ -322,9 +371,9 @@ class SettingsParam(Param):
 
         return self
 
-    def validate(self):
+    def get_validations(self):
         """
-        Validate the Settings Parameter.
+        Return the validations of the Settings Parameter.
 
         Overrides the default params validation mechanism by adding a default validation based on the number of expected
         sections. The implementation takes into account nested settings params so that the number of resources is
@@ -335,14 +384,20 @@ class SettingsParam(Param):
         labels = None if not self.value else self.value.split(",")  # Section labels in the settings param
         max_resources = self.referred_section_definition.get("max_resources", 1)  # Max resources per parent section
 
+        validations = []
         if labels and len(labels) > max_resources:
-            self.pcluster_config.error(
-                "Invalid number of '{0}' sections specified. Max {1} expected.".format(
-                    self.referred_section_key, max_resources
+            validations.append(
+                Validation.check(
+                    (self.section_key, self.section_label),
+                    lambda: self.pcluster_config.error(
+                        "Invalid number of '{0}' sections specified. Max {1} expected.".format(
+                            self.referred_section_key, max_resources
+                        )
+                    ),
                 )
             )
 
-        super(SettingsParam, self).validate()
+        return validations + super(SettingsParam, self).get_validations()
 
     def _value_eq(self, other):
         """Compare settings labels ignoring positions and extra spaces."""
@@ -398,6 +453,10 @@ class SettingsParam(Param):
 
         self.value = ",".join(sorted(sections_labels)) if sections_labels else None
 
+    def get_refresh_inputs(self):
+        """Return the structure revision of the referred sections and the current value."""
+        return self.pcluster_config.get_sections_revision(self.referred_section_key), self.value
+
     def to_file(self, config_parser, write_defaults=False):
         """Convert the param value into a section in the config_parser and initialize it."""
         section = self.pcluster_config.get_section(self.referred_section_key, self.value)
@@ -428,6 +487,17 @@ class SettingsParam(Param):
 class Section(ABC):
     """Base class to manage configuration sections (e.g vpc, scaling, aws, etc)."""
 
+    __slots__ = (
+        "definition",
+        "key",
+        "autocreate",
+        "_label",
+        "max_resources",
+        "pcluster_config",
+        "parent_section",
+        "_params",
+    )
+
     def __init__(self, section_definition, pcluster_config, section_label=None, parent_section=None):
         self.definition = section_definition
         self.key = section_definition.get("key")
@@ -440,8 +510,8 @@ class Section(ABC):
 
         self.parent_section = parent_section
 
-        # initialize section parameters with default values
-        self.params = {}
+        # initialize section parameters with default values, params of lazy types are created on first access
+        self._params = {}
         self._from_definition()
 
     @property
@@ -453,7 +523,7 @@ class Section(ABC):
     def label(self, label):
         """Set the section label. Marks the PclusterConfig parent for refreshing if called."""
         self._label = label
-        self.pcluster_config._config_updated()
+        self.pcluster_config._config_updated(self.key)
 
     def from_file(self, config_parser, fail_on_absence=False):
         """Initialize section configuration parameters by parsing config file."""
@@ -471,8 +541,10 @@ class Section(ABC):
 
         if config_parser.has_section(section_name):
             for param_key, param_definition in params_definitions.items():
-                param_type = param_definition.get("type", self.get_default_param_type())
+                if self._is_lazy(param_definition) and not config_parser.has_option(section_name, param_key):
+                    continue
 
+                param_type = param_definition.get("type", self.get_default_param_type())
                 param = param_type(
                     self.key,
                     self.label,
@@ -499,46 +571,66 @@ class Section(ABC):
         return self
 
     def _from_definition(self):
-        """Initialize parameters with default values."""
+        """Initialize the parameters of non lazy types with default values."""
         for param_key, param_definition in self.definition.get("params").items():
-            param_type = param_definition.get("type", self.get_default_param_type())
-            param = param_type(
-                self.key, self.label, param_key, param_definition, self.pcluster_config, owner_section=self
-            )
-            self.add_param(param)
+            if not self._is_lazy(param_definition):
+                self._create_param(param_key, param_definition)
+
+    def _is_lazy(self, param_definition):
+        """Tell if the param can be created on first access; params with computed defaults are created upfront."""
+        param_type = param_definition.get("type", self.get_default_param_type())
+        return param_type.lazy and not callable(param_definition.get("default"))
+
+    def _create_param(self, param_key, param_definition):
+        """Create the param with its default value and add it to the section."""
+        param_type = param_definition.get("type", self.get_default_param_type())
+        param = param_type(self.key, self.label, param_key, param_definition, self.pcluster_config, owner_section=self)
+        self.add_param(param)
+        return param
+
+    @property
+    def params(self):
+        """Return the dict param key -> Param with all the params of the section, creating the ones not accessed yet."""
+        for param_key, param_definition in self.definition.get("params").items():
+            if param_key not in self._params:
+                self._create_param(param_key, param_definition)
+        return self._params
 
     def validate(self):
         """Call the validator function of the section and of all the parameters."""
+        run_validations(self.get_validations(), self.pcluster_config)
+
+    def get_validations(self):
+        """Return the validations of the section and of all its parameters, in the order they must be reported."""
+        validations = []
         if self.params:
             section_name = get_file_section_name(self.key, self.label)
-            LOGGER.debug("Validating section '[%s]'...", section_name)
+            node = (self.key, self.label)
+            LOGGER.debug("Collecting validators of section '[%s]'...", section_name)
 
             # validate section
             for validation_func in self.definition.get("validators", []):
-                errors, warnings = validation_func(self.key, self.label, self.pcluster_config)
-                if errors:
-                    self.pcluster_config.error(
-                        "The section [{0}] is wrongly configured\n" "{1}".format(section_name, "\n".join(errors))
+                validations.append(
+                    Validation(
+                        node,
+                        validation_func,
+                        (self.key, self.label, self.pcluster_config),
+                        error_header="The section [{0}] is wrongly configured".format(section_name),
+                        warning_header="The section [{0}] is wrongly configured".format(section_name),
+                        valid_message="Section '[{0}]' is valid".format(section_name),
                     )
-                elif warnings:
-                    self.pcluster_config.warn(
-                        "The section [{0}] is wrongly configured\n{1}".format(section_name, "\n".join(warnings))
-                    )
-                else:
-                    LOGGER.debug("Section '[%s]' is valid", section_name)
+                )
 
             # validate items
-            LOGGER.debug("Validating parameters of section '[%s]'...", section_name)
             for param_key, param_definition in self.definition.get("params").items():
                 param_type = param_definition.get("type", self.get_default_param_type())
 
                 param = self.get_param(param_key)
-                if param:
-                    param.validate()
-                else:
+                if not param:
                     # define a default param and validate it
-                    param_type(self.key, self.label, param_key, param_definition, self.pcluster_config).validate()
-            LOGGER.debug("Parameters validation of section '[%s]' completed correctly.", section_name)
+                    param = param_type(self.key, self.label, param_key, param_definition, self.pcluster_config)
+                validations.extend(param.get_validations())
+        return validations
 
     def to_file(self, config_parser, write_defaults=False):
         """Create the section and add all the parameters in the config_parser."""
@@ -571,7 +663,7 @@ class Section(ABC):
         }
         :param param: the Param object to add to the Section
         """
-        self.params[param.key] = param
+        self._params[param.key] = param
 
     def get_param(self, param_key):
         """
@@ -580,7 +672,10 @@ class Section(ABC):
         :param param_key: the key to identify the Param object in the internal dictionary
         :return: a Param object
         """
-        return self.params[param_key]
+        param = self._params.get(param_key)
+        if param is None:
+            param = self._create_param(param_key, self.definition.get("params")[param_key])
+        return param
 
     def set_param(self, param_key, param_obj):
         """
@@ -589,7 +684,7 @@ class Section(ABC):
         :param param_key: the key to identify the Param object in the internal dictionary
         :param param_obj: a Param object
         """
-        self.params[param_key] = param_obj
+        self._params[param_key] = param_obj
 
     def get_param_value(self, param_key):
         """
@@ -598,12 +693,20 @@ class Section(ABC):
         :param param_key: the key to identify the Param object in the internal dictionary
         :return: the value of the Param object or None if the param is not present in the Section
         """
-        return self.get_param(param_key).value if self.get_param(param_key) else None
-
-    def refresh(self):
-        """Refresh all parameters."""
-        for _, param in self.params.items():
-            param.refresh()
+        param = self._params.get(param_key)
+        if param is None:
+            param_definition = self.definition.get("params")[param_key]
+            if self._is_lazy(param_definition):
+                # Not accessed yet, the value is the default one
+                return param_definition.get("default")
+            param = self.get_param(param_key)
+        return param.value
+
+    def refresh(self, incremental=False):
+        """Refresh all parameters, or only the outdated ones if incremental."""
+        # Params not created yet hold the default value, only non lazy types need to be refreshed
+        for _, param in list(self._params.items()):
+            param.refresh_if_outdated(force=not incremental)
 
     @abstractmethod
     def from_storage(self, storage_params):
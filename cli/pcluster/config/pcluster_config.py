@@ -11,32 +11,59 @@
 from future.moves.collections import OrderedDict
 
 import errno
+import hashlib
 import json
 import logging
 import os
 import stat
 import sys
+from collections import defaultdict
+from contextlib import contextmanager
 
-import boto3
 import configparser
-from botocore.exceptions import ClientError
+from botocore.exceptions import BotoCoreError, ClientError
+from concurrent.futures import ThreadPoolExecutor
 
+from pcluster.cache import FileCache
 from pcluster.cluster_model import ClusterModel, get_cluster_model, infer_cluster_model
 from pcluster.config.cfn_param_types import ClusterCfnSection
 from pcluster.config.mappings import ALIASES, AWS, GLOBAL
-from pcluster.config.param_types import StorageData
+from pcluster.config.param_types import SettingsParam, StorageData
+from pcluster.config.validation_engine import (
+    ValidationCache,
+    get_validation_workers,
+    is_validation_cache_enabled,
+    run_validations,
+)
+from pcluster.config.validators import VALIDATION_CACHE_TTLS
 from pcluster.utils import (
+    describe_instance_types,
+    error,
+    get_account_id,
+    get_boto3_client,
     get_cfn_param,
+    get_cfn_params_dict,
     get_file_section_name,
     get_installed_version,
+    get_instance_type,
     get_stack,
     get_stack_name,
     get_stack_version,
     is_hit_enabled_cluster,
+    prefetch_ec2_resources,
 )
 
 LOGGER = logging.getLogger(__name__)
 
+# Key of the cluster configuration in the S3 bucket of the cluster
+CLUSTER_CONFIG_S3_KEY = "configs/cluster-config.json"
+# Time (in seconds) after which a downloaded version of a cluster configuration is retrieved again.
+# Versions of the S3 object never change, so they can be kept for long.
+CLUSTER_CONFIG_CACHE_TTL = 30 * 24 * 60 * 60
+# Whether each cluster is HIT, used to decide if the config version can be read before the stack is described
+HIT_CLUSTERS_CACHE_NAMESPACE = "hit-clusters"
+HIT_CLUSTERS_CACHE_TTL = 7 * 24 * 60 * 60
+
 
 def default_config_file_path():
     """Return the default path for the ParallelCluster configuration file."""
@@ -84,8 +111,16 @@ class PclusterConfig(object):
         self.fail_on_error = fail_on_error
         self.cfn_stack = None
         self.__sections = OrderedDict({})
+        # Structural changes counted by section key, see get_sections_revision
+        self.__sections_revisions = defaultdict(int)
+        self.__sections_revision = 0
+        # Nesting level of deferred_refresh blocks and whether a refresh has been deferred
+        self.__deferred_refresh_level = 0
+        self.__refresh_deferred = False
         self.__enforce_version = enforce_version
         self.__skip_load_json_config = skip_load_json_config
+        # DescribeInstanceTypes info of the instance types referred by the configuration, see get_instance_type_info
+        self.__instance_types_info = {}
 
         # always parse the configuration file if there, to get AWS section
         self._init_config_parser(config_file, fail_on_file_absence)
@@ -219,7 +254,7 @@ class PclusterConfig(object):
 
         section_label = section.label if section.label else section.definition.get("default_label", "default")
         self.__sections[section.key][section_label] = section
-        self._config_updated()
+        self._config_updated(section.key)
 
     def remove_section(self, section_key, section_label=None):
         """
@@ -240,7 +275,7 @@ class PclusterConfig(object):
                     raise Exception("More than one section with key {0}".format(section_key))
                 else:
                     self.__sections.pop(section_key)
-        self._config_updated()
+        self._config_updated(section_key)
 
     def __init_aws_credentials(self):
         """Set credentials in the environment to be available for all the boto3 calls."""
@@ -414,24 +449,63 @@ class PclusterConfig(object):
         """Enable or disable the configuration autorefresh."""
         self.__autorefresh = refresh_enabled
 
-    def _config_updated(self):
+    def _config_updated(self, section_key=None):
         """
         Notify the PclusterConfig instance that the configuration structure has changed.
 
         The purpose of this method is to allow internal configuration objects such as Param, Section etc to notify the
         parent PclusterConfig when something structural has changed. The configuration will be reloaded based on whether
-        or not the autofresh function is enabled.
+        or not the autofresh function is enabled, only refreshing the parameters whose inputs changed. Inside a
+        deferred_refresh block the refresh is postponed to the end of the block.
+
+        :param section_key: the key of the sections whose structure has changed
         """
+        if section_key:
+            self.__sections_revisions[section_key] += 1
+            self.__sections_revision += 1
         if self.__autorefresh:
-            self.refresh()
+            if self.__deferred_refresh_level:
+                self.__refresh_deferred = True
+            else:
+                self.refresh(incremental=True)
+
+    @contextmanager
+    def deferred_refresh(self):
+        """
+        Return a context manager deferring the automatic refresh of the configuration to the end of the block.
 
-    def refresh(self):
+        Use it to apply a batch of structural changes with a single refresh. Blocks can be nested, the refresh is done
+        when the outermost one ends.
+        """
+        self.__deferred_refresh_level += 1
+        try:
+            yield self
+        finally:
+            self.__deferred_refresh_level -= 1
+        if not self.__deferred_refresh_level and self.__refresh_deferred:
+            self.__refresh_deferred = False
+            if self.__autorefresh:
+                self.refresh(incremental=True)
+
+    def get_sections_revision(self, section_key=None):
+        """
+        Return a number that changes every time a section with the given key is added, removed or renamed.
+
+        If no key is provided, the number changes with any structural change of the configuration.
+        """
+        return self.__sections_revisions[section_key] if section_key else self.__sections_revision
+
+    def refresh(self, incremental=False):
         """
         Reload the sections structure and refresh all configuration sections and parameters.
 
         This method must be called if structural configuration changes have been applied, like updating a section
         label, adding or removing a section etc.
+
+        :param incremental: only refresh the parameters whose inputs changed since their last refresh
         """
+        self.__refresh_deferred = False
+
         # Rebuild the new sections structure
         new_sections = OrderedDict({})
         for key, sections in self.__sections.items():
@@ -444,11 +518,62 @@ class PclusterConfig(object):
         # Refresh all sections
         for _, sections in self.__sections.items():
             for _, section in sections.items():
-                section.refresh()
+                section.refresh(incremental)
+
+    def get_instance_type_info(self, instance_type):
+        """
+        Return the DescribeInstanceTypes info of the given instance type, memoized for the life of this object.
+
+        The first time an instance type is requested, all the instance types referred by the configuration and not
+        yet resolved are described at once, so that refreshing the sections costs a single batched request.
+        """
+        if instance_type not in self.__instance_types_info:
+            self.__prefetch_instance_types(instance_type)
+        if instance_type not in self.__instance_types_info:
+            try:
+                self.__instance_types_info[instance_type] = get_instance_type(instance_type)
+            except ClientError as e:
+                error(
+                    "Error when calling DescribeInstanceTypes for instances {0}: {1}".format(
+                        instance_type, e.response.get("Error").get("Message")
+                    )
+                )
+        return self.__instance_types_info[instance_type]
+
+    def __prefetch_instance_types(self, instance_type):
+        """
+        Describe with a single batched request the given instance type and the ones referred by the params.
+
+        Instance types that cannot be described this way, e.g. because one of them is not valid, are left to be
+        described one at a time, so that errors are reported as usual.
+        """
+        instance_types = [instance_type]
+        for _, sections in self.__sections.items():
+            for _, section in sections.items():
+                for _, param in section.params.items():
+                    if param.definition.get("ec2_instance_type") and param.value:
+                        if param.value not in self.__instance_types_info and param.value not in instance_types:
+                            instance_types.append(param.value)
+        if len(instance_types) > 1:
+            try:
+                self.__instance_types_info.update(describe_instance_types(instance_types))
+            except (BotoCoreError, ClientError) as e:
+                LOGGER.debug("Unable to describe instance types %s at once: %s", ", ".join(instance_types), e)
 
     def __init_sections_from_cfn(self, cluster_name):
+        # The version of the Json config is only used by HIT clusters and doesn't depend on the stack. For the clusters
+        # already known to be HIT it is read from DynamoDB while the stack is described, the other clusters never
+        # read it, since their IAM policy may not allow it.
+        hit_clusters_cache = FileCache(HIT_CLUSTERS_CACHE_NAMESPACE, HIT_CLUSTERS_CACHE_TTL)
+        hit_cluster_key = "{0}-{1}".format(self.region, cluster_name)
+        executor = None
+        config_version_future = None
+        if not self.__skip_load_json_config and hit_clusters_cache.get(hit_cluster_key):
+            executor = ThreadPoolExecutor(max_workers=1)
+            config_version_future = executor.submit(self.__retrieve_cluster_config_version)
         try:
             self.cfn_stack = get_stack(get_stack_name(cluster_name))
+            hit_clusters_cache.put(hit_cluster_key, is_hit_enabled_cluster(self.cfn_stack))
             if self.__enforce_version and get_stack_version(self.cfn_stack) != get_installed_version():
                 self.error(
                     "The cluster {0} was created with a different version of ParallelCluster: {1}. "
@@ -458,8 +583,13 @@ class PclusterConfig(object):
                     )
                 )
 
-            cfn_params = self.cfn_stack.get("Parameters")
-            json_params = self.__load_json_config(self.cfn_stack) if not self.__skip_load_json_config else None
+            # Parameters are indexed by key, since each param of the configuration looks up its own ones
+            cfn_params = get_cfn_params_dict(self.cfn_stack.get("Parameters"))
+            json_params = (
+                self.__load_json_config(self.cfn_stack, config_version_future)
+                if not self.__skip_load_json_config
+                else None
+            )
             cfn_tags = self.cfn_stack.get("Tags")
 
             # Infer cluster model and load cluster section accordingly
@@ -478,16 +608,106 @@ class PclusterConfig(object):
                     cluster_name, e.response.get("Error").get("Message")
                 )
             )
+        finally:
+            if executor:
+                # Don't wait for the version if the stack turned out not to need it
+                self.__discard_future(config_version_future)
+                executor.shutdown(wait=False)
+
+    @staticmethod
+    def __discard_future(future):
+        """Cancel the given future if not started yet, logging its failure otherwise, since its result is not read."""
+        if not future.cancel():
+            future.add_done_callback(
+                lambda done_future: done_future.exception()
+                and LOGGER.debug("Ignoring failed prefetch of the config version: %s", done_future.exception())
+            )
 
     def validate(self):
-        """Validate the configuration."""
+        """
+        Validate the configuration.
+
+        Independent validators are executed concurrently, while the validators of the sections referred by a settings
+        param only start after the ones of the referring section. Errors and warnings are reported in the order in
+        which sections and params are defined.
+        EC2 resources referred by the configuration are described in advance with one call per type of resource, so
+        that the number of requests doesn't grow with the number of sections.
+        """
+        prefetch_ec2_resources(self.__get_ec2_resource_ids())
+
+        validations = []
         for _, sections in self.__sections.items():
             for _, section in sections.items():
-                section.validate()
+                validations.extend(section.get_validations())
+
+        run_validations(
+            validations,
+            self,
+            dependencies=self.__get_validation_dependencies(),
+            max_workers=get_validation_workers(),
+            cache=self.__get_validation_cache(),
+        )
 
         # test provided configuration
         self.__test_configuration()
 
+    def __get_validation_cache(self):
+        """
+        Return the cache of the validation results of this configuration, if enabled through the environment.
+
+        Cached results are valid for the current region and account and for the current values of all the sections,
+        since validators can read any param of the configuration.
+        """
+        if not is_validation_cache_enabled():
+            return None
+        try:
+            account_id = get_account_id()
+        except (BotoCoreError, ClientError) as e:
+            LOGGER.debug("Unable to retrieve the account id, not using the validation cache: %s", e)
+            return None
+
+        config_values = []
+        for section_key, sections in self.__sections.items():
+            for section_label, section in sections.items():
+                param_values = [(param_key, param.value) for param_key, param in section.params.items()]
+                config_values.append((section_key, section_label, param_values))
+        config_hash = hashlib.sha256(json.dumps(config_values, default=str).encode("utf-8")).hexdigest()
+        return ValidationCache(VALIDATION_CACHE_TTLS, scope=[self.region, account_id, config_hash])
+
+    def __get_ec2_resource_ids(self):
+        """
+        Collect the ids of the EC2 resources referred by the params of all the sections.
+
+        :return: a dict resource type -> list of ids, see the ec2_resource_type attribute of the params in the mappings
+        """
+        resource_ids = {}
+        for _, sections in self.__sections.items():
+            for _, section in sections.items():
+                for _, param in section.params.items():
+                    resource_type = param.definition.get("ec2_resource_type")
+                    if resource_type and param.value:
+                        resource_ids.setdefault(resource_type, []).append(param.value)
+        return resource_ids
+
+    def __get_validation_dependencies(self):
+        """
+        Build the dependency graph among sections from the settings params defined in the mappings.
+
+        :return: a dict (section_key, section_label) -> list of the (section_key, section_label) it depends on
+        """
+        dependencies = {}
+        for _, sections in self.__sections.items():
+            for _, section in sections.items():
+                for _, param in section.params.items():
+                    if isinstance(param, SettingsParam):
+                        for label in param.referred_section_labels:
+                            referred_section = self.get_section(param.referred_section_key, label)
+                            if referred_section:
+                                dependencies.setdefault((referred_section.key, referred_section.label), []).append(
+                                    (section.key, section.label)
+                                )
+        return dependencies
+
     def get_master_availability_zone(self):
         """Get the Availability zone of the Master Subnet."""
         return self.get_section("vpc").get_param_value("master_availability_zone")
@@ -496,8 +716,13 @@ class PclusterConfig(object):
         """Get the Availability zone of the Compute Subnet."""
         return self.get_section("vpc").get_param_value("compute_availability_zone")
 
-    def __load_json_config(self, cfn_stack):
-        """Retrieve Json configuration params from the S3 bucket linked from the cfn params."""
+    def __load_json_config(self, cfn_stack, config_version_future=None):
+        """
+        Retrieve Json configuration params from the S3 bucket linked from the cfn params.
+
+        :param cfn_stack: the stack of the cluster
+        :param config_version_future: future of the config version retrieval, if already started
+        """
         json_config = None
         if is_hit_enabled_cluster(cfn_stack):
             s3_bucket_name = get_cfn_param(cfn_stack.get("Parameters"), "ResourcesS3Bucket")
@@ -505,27 +730,54 @@ class PclusterConfig(object):
             if not s3_bucket_name or s3_bucket_name == "NONE":
                 self.error("Unable to retrieve configuration: ResourceS3Bucket not available.")
 
-            json_config = self.__retrieve_cluster_config(s3_bucket_name)
+            try:
+                config_version = (
+                    config_version_future.result()
+                    if config_version_future
+                    else self.__retrieve_cluster_config_version()
+                )
+            except Exception as e:
+                self.error("Failed when retrieving cluster config version from DynamoDB with error {0}".format(e))
+
+            json_config = self.__retrieve_cluster_config(s3_bucket_name, config_version)
 
         return json_config
 
-    def __retrieve_cluster_config(self, bucket):
-        table = boto3.resource("dynamodb").Table(get_stack_name(self.cluster_name))
-        config_version = None  # Use latest if not found
-        try:
-            config_version_item = table.get_item(ConsistentRead=True, Key={"Id": "CLUSTER_CONFIG"})
-            if config_version_item or "Item" in config_version_item:
-                config_version = config_version_item["Item"].get("Version")
-        except Exception as e:
-            self.error("Failed when retrieving cluster config version from DynamoDB with error {0}".format(e))
+    def __retrieve_cluster_config_version(self):
+        """Return the S3 version of the cluster config stored in the DynamoDB table of the cluster, if any."""
+        config_version_item = get_boto3_client("dynamodb").get_item(
+            TableName=get_stack_name(self.cluster_name), ConsistentRead=True, Key={"Id": {"S": "CLUSTER_CONFIG"}}
+        )
+        # Use latest if not found
+        return config_version_item.get("Item", {}).get("Version", {}).get("S")
+
+    def __retrieve_cluster_config(self, bucket, config_version=None):
+        """
+        Return the cluster config stored in the given bucket, with the given S3 version or the latest one.
+
+        Downloaded versions are cached on disk, so that they are retrieved only once.
+        """
+        cache = FileCache("cluster-configs", CLUSTER_CONFIG_CACHE_TTL)
+        json_str = cache.get("{0}-{1}".format(bucket, config_version)) if config_version else None
+        if json_str is not None:
+            return json.loads(json_str, object_pairs_hook=OrderedDict)
 
         try:
             config_version_args = {"VersionId": config_version} if config_version else {}
-            s3_object = boto3.resource("s3").Object(bucket, "configs/cluster-config.json")
-            json_str = s3_object.get(**config_version_args)["Body"].read().decode("utf-8")
-            return json.loads(json_str, object_pairs_hook=OrderedDict)
+            s3_object = get_boto3_client("s3").get_object(
+                Bucket=bucket, Key=CLUSTER_CONFIG_S3_KEY, **config_version_args
+            )
+            json_str = s3_object["Body"].read().decode("utf-8")
+            json_config = json.loads(json_str, object_pairs_hook=OrderedDict)
         except Exception as e:
             self.error("Unable to load configuration from bucket '{0}'.\n{1}".format(bucket, e))
+            return None
+
+        # Objects of buckets without versioning have the "null" version, which can be overwritten
+        downloaded_version = s3_object.get("VersionId")
+        if downloaded_version and downloaded_version != "null":
+            cache.put("{0}-{1}".format(bucket, downloaded_version), json_str)
+        return json_config
 
     def __test_configuration(self):  # noqa: C901
         """
@@ -0,0 +1,63 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+from collections import OrderedDict, namedtuple
+
+from pcluster.config.param_types import Param
+
+# Read-only view of a section definition, with the indexes needed to convert the section from and to storage.
+#   params: tuple of (param_key, param_definition), in definition order
+#   cfn_params: tuple of (param_key, param_definition, cfn_param_mapping) of the params with a CFN mapping
+#   params_by_cfn_name: cfn_param_mapping -> (param_key, param_definition)
+#   params_by_storage_key: Json storage key -> (param_key, param_definition)
+SectionSchema = namedtuple("SectionSchema", ["params", "cfn_params", "params_by_cfn_name", "params_by_storage_key"])
+
+
+def get_section_schema(section_definition):
+    """
+    Return the schema of the given section definition.
+
+    The schema is built once per process for each definition and must not be modified.
+    Definitions are not hashable, so the cache is keyed by their identity; the definition is kept in the cache entry
+    to prevent its identity from being reused by another object.
+    """
+    if not hasattr(get_section_schema, "cache"):
+        get_section_schema.cache = {}
+
+    cached_entry = get_section_schema.cache.get(id(section_definition))
+    if not cached_entry or cached_entry[0] is not section_definition:
+        cached_entry = (section_definition, _build_section_schema(section_definition))
+        get_section_schema.cache[id(section_definition)] = cached_entry
+    return cached_entry[1]
+
+
+def _build_section_schema(section_definition):
+    """Build the schema of the given section definition."""
+    params = tuple(section_definition.get("params", {}).items())
+    cfn_params = tuple(
+        (param_key, param_definition, param_definition.get("cfn_param_mapping"))
+        for param_key, param_definition in params
+        if param_definition.get("cfn_param_mapping")
+    )
+
+    params_by_cfn_name = OrderedDict()
+    for param_key, param_definition, cfn_name in cfn_params:
+        params_by_cfn_name.setdefault(cfn_name, (param_key, param_definition))
+
+    params_by_storage_key = OrderedDict()
+    for param_key, param_definition in params:
+        storage_key = param_definition.get("type", Param).storage_key
+        if storage_key:
+            # An explicit storage key wins over a param key, e.g. _scaledown_idletime is stored as scaledown_idletime
+            params_by_storage_key[storage_key] = (param_key, param_definition)
+        else:
+            params_by_storage_key.setdefault(param_key, (param_key, param_definition))
+
+    return SectionSchema(params, cfn_params, params_by_cfn_name, params_by_storage_key)
@@ -0,0 +1,243 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import hashlib
+import json
+import logging
+import os
+import sys
+
+from concurrent.futures import ThreadPoolExecutor
+from future.utils import raise_
+
+from pcluster.cache import FileCache, is_cache_enabled
+from pcluster.utils import get_throttled_requests_count, get_workers_from_env
+
+LOGGER = logging.getLogger(__name__)
+
+# Max number of validators executed at the same time, can be overridden through the environment
+DEFAULT_VALIDATION_WORKERS = 10
+VALIDATION_WORKERS_ENV_VAR = "AWS_PCLUSTER_VALIDATION_WORKERS"
+
+# Set to true to keep the results of the validators on disk and reuse them in the following runs
+VALIDATION_CACHE_ENV_VAR = "AWS_PCLUSTER_VALIDATION_CACHE"
+
+
+def get_validation_workers():
+    """Return the max number of validators to execute concurrently."""
+    return get_workers_from_env(VALIDATION_WORKERS_ENV_VAR, DEFAULT_VALIDATION_WORKERS)
+
+
+def is_validation_cache_enabled():
+    """Return True if the cache of the validation results has been enabled through the environment."""
+    return os.environ.get(VALIDATION_CACHE_ENV_VAR, "").lower() in ["1", "true", "yes"] and is_cache_enabled()
+
+
+class Validation(object):
+    """
+    A validator bound to its arguments and to the messages used to report its outcome.
+
+    Validators return a tuple (errors, warnings) and can be executed concurrently. Errors and warnings are reported
+    one per line after the related header. Checks (inline=True) are instead
+    functions reporting their outcome by themselves: they are called while reporting, in order with the other
+    validations. The node identifies the configuration section (key, label) the validation belongs to and is used
+    to resolve the dependencies among validations.
+    """
+
+    def __init__(self, node, func, args=(), error_header=None, warning_header=None, valid_message=None, inline=False):
+        self.node = node
+        self.func = func
+        self.args = args
+        self.error_header = error_header
+        self.warning_header = warning_header
+        self.valid_message = valid_message
+        self.inline = inline
+
+    @classmethod
+    def check(cls, node, func):
+        """Create a check to be called in order while reporting the outcome of the validations."""
+        return cls(node, func, inline=True)
+
+    def __str__(self):
+        return "{0}{1}".format(getattr(self.func, "__name__", self.func), self.args)
+
+
+class ValidationCache(object):
+    """
+    On-disk cache of the results of the validators, shared across CLI runs.
+
+    Only the validators with a ttl (in seconds) in the given dict are cached. A result is stored under a hash of
+    the validator name, its arguments and the given scope, which identifies the region, the account and the
+    values of the configuration, so that any change to them causes the validators to be executed again.
+    Exceptions and results of validators whose requests have been throttled are never stored.
+    """
+
+    def __init__(self, ttls, scope):
+        self.ttls = ttls
+        self.scope = scope
+        self.__file_caches = {}
+
+    def get(self, validation):
+        """Return the cached (errors, warnings) of the validation or None."""
+        result = self.__get_file_cache(validation).get(self.__get_key(validation))
+        if result is not None:
+            LOGGER.debug("Using cached result of validation %s", validation)
+            return tuple(result)
+        return None
+
+    def put(self, validation, result):
+        """Store the (errors, warnings) of the validation."""
+        self.__get_file_cache(validation).put(self.__get_key(validation), list(result))
+
+    def is_cacheable(self, validation):
+        """Return True if the result of the validation can be cached."""
+        return not validation.inline and validation.func in self.ttls
+
+    def __get_file_cache(self, validation):
+        ttl = self.ttls[validation.func]
+        if ttl not in self.__file_caches:
+            self.__file_caches[ttl] = FileCache("validation", ttl)
+        return self.__file_caches[ttl]
+
+    def __get_key(self, validation):
+        # The last argument of the validators is the PclusterConfig, represented by the scope
+        key = [validation.func.__name__, validation.args[:-1], self.scope]
+        return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class _Outcome(object):
+    """Result or exception produced by a Validation."""
+
+    def __init__(self, result=None, exc_info=None):
+        self.result = result
+        self.exc_info = exc_info
+
+    @classmethod
+    def of(cls, validation, cache=None):
+        if not cache or not cache.is_cacheable(validation):
+            return cls.__execute(validation)
+
+        result = cache.get(validation)
+        if result is not None:
+            return cls(result=result)
+        throttled_requests = get_throttled_requests_count()
+        outcome = cls.__execute(validation)
+        if outcome.exc_info is None and get_throttled_requests_count() == throttled_requests:
+            cache.put(validation, outcome.result)
+        return outcome
+
+    @classmethod
+    def __execute(cls, validation):
+        try:
+            return cls(result=validation.func(*validation.args))
+        except BaseException:
+            # SystemExit raised by validators calling utils.error is deferred as well
+            return cls(exc_info=sys.exc_info())
+
+    @property
+    def failed(self):
+        return self.exc_info is not None or bool(self.result[0])
+
+
+def run_validations(validations, pcluster_config, dependencies=None, max_workers=1, cache=None):
+    """
+    Run the given validations and report their outcome through pcluster_config.
+
+    With a single worker the validations are executed and reported one after the other, in the given order.
+    Otherwise they are executed on a pool of max_workers threads, respecting the dependencies among nodes: the
+    validations of a node are started only when the validations of all the nodes it depends on are completed and,
+    if pcluster_config.fail_on_error is set, they are skipped when any of these nodes failed.
+    Outcomes are always reported in the order of the given validations, so the reported errors do not depend
+    on the execution order.
+
+    :param validations: ordered list of Validation objects
+    :param pcluster_config: PclusterConfig used to report errors and warnings
+    :param dependencies: dict node -> list of nodes it depends on
+    :param max_workers: max number of validators executed concurrently
+    :param cache: ValidationCache used to reuse the results of previous runs, if any
+    """
+    if max_workers <= 1:
+        for validation in validations:
+            if validation.inline:
+                validation.func(*validation.args)
+            else:
+                _report(validation, _Outcome.of(validation, cache), pcluster_config)
+    else:
+        outcomes, skipped = _run_concurrently(
+            validations, dependencies or {}, pcluster_config.fail_on_error, max_workers, cache
+        )
+        for index, validation in enumerate(validations):
+            if index in skipped:
+                continue
+            if validation.inline:
+                validation.func(*validation.args)
+            else:
+                _report(validation, outcomes[index], pcluster_config)
+
+
+def _run_concurrently(validations, dependencies, fail_fast, max_workers, cache):
+    """Execute the validators stage by stage, returning their outcomes by index and the indexes of skipped ones."""
+    outcomes = {}
+    skipped = set()
+    failed_nodes = set()
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for stage in _get_stages(validations, dependencies):
+            futures = []
+            for index in stage:
+                validation = validations[index]
+                if fail_fast and any(node in failed_nodes for node in dependencies.get(validation.node, [])):
+                    LOGGER.debug("Skipping validation %s, a dependency of %s failed", validation, validation.node)
+                    skipped.add(index)
+                    failed_nodes.add(validation.node)
+                elif not validation.inline:
+                    futures.append((index, executor.submit(_Outcome.of, validation, cache)))
+            for index, future in futures:
+                outcomes[index] = future.result()
+                if outcomes[index].failed:
+                    failed_nodes.add(validations[index].node)
+    finally:
+        executor.shutdown(wait=True)
+    return outcomes, skipped
+
+
+def _report(validation, outcome, pcluster_config):
+    if outcome.exc_info:
+        raise_(*outcome.exc_info)
+
+    errors, warnings = outcome.result
+    if errors:
+        pcluster_config.error("{0}\n{1}".format(validation.error_header, "\n".join(errors)))
+    elif warnings:
+        pcluster_config.warn("{0}\n{1}".format(validation.warning_header, "\n".join(warnings)))
+    elif validation.valid_message:
+        LOGGER.debug(validation.valid_message)
+
+
+def _get_stages(validations, dependencies):
+    """
+    Group the indexes of the validations in stages, following the dependencies among nodes.
+
+    The stage of a node is one more than the highest stage of the nodes it depends on, so that all the validations
+    of a stage only depend on validations of previous stages and can be executed concurrently.
+    """
+    levels = {}
+
+    def _get_level(node, visiting=()):
+        if node not in levels:
+            parents = [parent for parent in dependencies.get(node, []) if parent not in visiting]
+            levels[node] = 1 + max([_get_level(parent, visiting + (node,)) for parent in parents] or [-1])
+        return levels[node]
+
+    stages = {}
+    for index, validation in enumerate(validations):
+        stages.setdefault(_get_level(validation.node), []).append(index)
+    return [stages[level] for level in sorted(stages)]
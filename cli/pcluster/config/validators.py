@@ -14,14 +14,17 @@ import urllib.error
 import urllib.request
 from urllib.parse import urlparse
 
-import boto3
 from botocore.exceptions import ClientError
 
 from pcluster.constants import CIDR_ALL_IPS
 from pcluster.dcv.utils import get_supported_dcv_os
 from pcluster.utils import (
+    describe_ec2_resource,
+    describe_ec2_resources,
     ellipsize,
+    get_account_id,
     get_base_additional_iam_policies,
+    get_boto3_client,
     get_ebs_snapshot_info,
     get_efs_mount_target_id,
     get_file_section_name,
@@ -80,12 +83,6 @@ LABELS_MAX_LENGTH = 64
 LABELS_REGEX = r"^[A-Za-z0-9\-_]+$"
 
 
-def _get_sts_endpoint():
-    """Get regionalized STS endpoint."""
-    region = get_region()
-    return "https://sts.{0}.{1}".format(region, "amazonaws.com.cn" if region.startswith("cn-") else "amazonaws.com")
-
-
 def _check_sg_rules_for_port(rule, port_to_check):
     """
     Verify if the security group rule accepts connections on the given port.
@@ -120,7 +117,7 @@ def efs_id_validator(param_key, param_value, pcluster_config):
         if mount_target_id:
             # Get list of security group IDs of the mount target
             sg_ids = (
-                boto3.client("efs")
+                get_boto3_client("efs")
                 .describe_mount_target_security_groups(MountTargetId=mount_target_id)
                 .get("SecurityGroups")
             )
@@ -151,7 +148,7 @@ def _check_in_out_access(security_groups_ids, port):
     in_access = False
     out_access = False
 
-    for sec_group in boto3.client("ec2").describe_security_groups(GroupIds=security_groups_ids).get("SecurityGroups"):
+    for sec_group in describe_ec2_resources("security_group", security_groups_ids):
 
         # Check all inbound rules
         for rule in sec_group.get("IpPermissions"):
@@ -233,13 +230,13 @@ def fsx_id_validator(param_key, param_value, pcluster_config):
     warnings = []
 
     try:
-        ec2 = boto3.client("ec2")
+        ec2 = get_boto3_client("ec2")
 
         # Check to see if there is any existing mt on the fs
-        file_system = boto3.client("fsx").describe_file_systems(FileSystemIds=[param_value]).get("FileSystems")[0]
+        file_system = get_boto3_client("fsx").describe_file_systems(FileSystemIds=[param_value]).get("FileSystems")[0]
 
         subnet_id = pcluster_config.get_section("vpc").get_param_value("master_subnet_id")
-        vpc_id = ec2.describe_subnets(SubnetIds=[subnet_id]).get("Subnets")[0].get("VpcId")
+        vpc_id = describe_ec2_resource("subnet", subnet_id).get("VpcId")
 
         # Check to see if fs is in the same VPC as the stack
         if file_system.get("VpcId") != vpc_id:
@@ -388,7 +385,7 @@ def kms_key_validator(param_key, param_value, pcluster_config):
     warnings = []
 
     try:
-        boto3.client("kms").describe_key(KeyId=param_value)
+        get_boto3_client("kms").describe_key(KeyId=param_value)
     except ClientError as e:
         errors.append(e.response.get("Error").get("Message"))
 
@@ -435,7 +432,7 @@ def _validate_efa_sg(pcluster_config, errors):
     vpc_security_group_id = pcluster_config.get_section("vpc").get_param_value("vpc_security_group_id")
     if vpc_security_group_id:
         try:
-            sg = boto3.client("ec2").describe_security_groups(GroupIds=[vpc_security_group_id]).get("SecurityGroups")[0]
+            sg = describe_ec2_resource("security_group", vpc_security_group_id)
             allowed_in = False
             allowed_out = False
 
@@ -487,11 +484,9 @@ def ec2_iam_role_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
     try:
-        iam = boto3.client("iam")
+        iam = get_boto3_client("iam")
         arn = iam.get_role(RoleName=param_value).get("Role").get("Arn")
-        account_id = boto3.client("sts", endpoint_url=_get_sts_endpoint()).get_caller_identity().get("Account")
-
-        iam_policy = _get_pcluster_user_policy(get_partition(), get_region(), account_id)
+        iam_policy = _get_pcluster_user_policy(get_partition(), get_region(), get_account_id())
 
         for actions, resource_arn in iam_policy:
             response = iam.simulate_principal_policy(
@@ -518,7 +513,7 @@ def ec2_iam_policies_validator(param_key, param_value, pcluster_config):
         if param_value:
             for iam_policy in param_value:
                 if iam_policy not in get_base_additional_iam_policies():
-                    iam = boto3.client("iam")
+                    iam = get_boto3_client("iam")
                     iam.get_policy(PolicyArn=iam_policy.strip())
     except ClientError as e:
         errors.append(e.response.get("Error").get("Message"))
@@ -590,7 +585,7 @@ def ec2_vpc_id_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
     try:
-        ec2 = boto3.client("ec2")
+        ec2 = get_boto3_client("ec2")
         ec2.describe_vpcs(VpcIds=[param_value])
 
         # Check for DNS support in the VPC
@@ -617,7 +612,7 @@ def ec2_subnet_id_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
     try:
-        boto3.client("ec2").describe_subnets(SubnetIds=[param_value])
+        describe_ec2_resource("subnet", param_value)
     except ClientError as e:
         errors.append(e.response.get("Error").get("Message"))
 
@@ -628,7 +623,7 @@ def ec2_security_group_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
     try:
-        boto3.client("ec2").describe_security_groups(GroupIds=[param_value])
+        describe_ec2_resource("security_group", param_value)
     except ClientError as e:
         errors.append(e.response.get("Error").get("Message"))
 
@@ -641,7 +636,7 @@ def ec2_ami_validator(param_key, param_value, pcluster_config):
 
     # Make sure AMI exists
     try:
-        image_info = boto3.client("ec2").describe_images(ImageIds=[param_value]).get("Images")[0]
+        image_info = describe_ec2_resource("image", param_value)
         validate_pcluster_version_based_on_ami_name(image_info.get("Name"))
     except ClientError as e:
         errors.append(
@@ -675,7 +670,7 @@ def ec2_placement_group_validator(param_key, param_value, pcluster_config):
         pass
     else:
         try:
-            boto3.client("ec2").describe_placement_groups(GroupNames=[param_value])
+            get_boto3_client("ec2").describe_placement_groups(GroupNames=[param_value])
         except ClientError as e:
             errors.append(e.response.get("Error").get("Message"))
 
@@ -715,7 +710,7 @@ def s3_uri_validator(param_key, param_value, pcluster_config):
         if not match or len(match.groups()) < 2:
             raise ValueError("S3 url is invalid.")
         bucket, key = match.group(1), match.group(2)
-        boto3.client("s3").head_object(Bucket=bucket, Key=key)
+        get_boto3_client("s3").head_object(Bucket=bucket, Key=key)
 
     except ClientError:
 
@@ -754,7 +749,7 @@ def s3_bucket_validator(param_key, param_value, pcluster_config):
     if urlparse(param_value).scheme == "s3":
         try:
             bucket = get_bucket_name_from_s3_url(param_value)
-            boto3.client("s3").head_bucket(Bucket=bucket)
+            get_boto3_client("s3").head_bucket(Bucket=bucket)
         except ClientError as client_error:
             if client_error.response.get("Error").get("Code") == "NoSuchBucket":
                 errors.append(
@@ -792,7 +787,7 @@ def fsx_lustre_auto_import_validator(param_key, param_value, pcluster_config):
 
     if param_value is not None and param_value != "NONE":
         try:
-            s3_bucket_region = boto3.client("s3").get_bucket_location(Bucket=bucket).get("LocationConstraint")
+            s3_bucket_region = get_boto3_client("s3").get_bucket_location(Bucket=bucket).get("LocationConstraint")
             # Buckets in Region us-east-1 have a LocationConstraint of null
             if s3_bucket_region is None:
                 s3_bucket_region = "us-east-1"
@@ -867,7 +862,7 @@ def ec2_volume_validator(param_key, param_value, pcluster_config):
     errors = []
     warnings = []
     try:
-        test = boto3.client("ec2").describe_volumes(VolumeIds=[param_value]).get("Volumes")[0]
+        test = describe_ec2_resource("volume", param_value)
         if test.get("State") != "available":
             warnings.append("Volume {0} is in state '{1}' not 'available'".format(param_value, test.get("State")))
     except ClientError as e:
@@ -1254,7 +1249,7 @@ def _get_efa_enabled_instance_types(errors):
 
     try:
         for response in paginate_boto3(
-            boto3.client("ec2").describe_instance_types,
+            get_boto3_client("ec2").describe_instance_types,
             Filters=[{"Name": "network-info.efa-supported", "Values": ["true"]}],
         ):
             instance_types.append(response.get("InstanceType"))
@@ -1271,7 +1266,7 @@ def fsx_lustre_backup_validator(param_key, param_value, pcluster_config):
     warnings = []
 
     try:
-        boto3.client("fsx").describe_backups(BackupIds=[param_value]).get("Backups")[0]
+        get_boto3_client("fsx").describe_backups(BackupIds=[param_value]).get("Backups")[0]
     except ClientError as e:
         errors.append(
             "Failed to retrieve backup with Id '{0}': {1}".format(param_value, e.response.get("Error").get("Message"))
@@ -1314,7 +1309,7 @@ def fsx_ignored_parameters_validator(section_key, section_label, pcluster_config
 
 def _describe_ec2_key_pair(key_pair_name):
     """Return information about the provided ec2 key pair."""
-    return boto3.client("ec2").describe_key_pairs(KeyNames=[key_pair_name])
+    return describe_ec2_resource("key_pair", key_pair_name)
 
 
 def ebs_volume_type_size_validator(section_key, section_label, pcluster_config):
@@ -1484,3 +1479,28 @@ def ebs_volume_size_snapshot_validator(section_key, section_label, pcluster_conf
                     )
                 )
     return errors, warnings
+
+
+# Time (in seconds) for which the results of the validators querying AWS services can be reused when the validation
+# cache is enabled, see pcluster.config.validation_engine.ValidationCache.
+# Validators not listed here are always executed.
+VALIDATION_CACHE_TTLS = {
+    ec2_iam_role_validator: 60 * 60,
+    ec2_iam_policies_validator: 60 * 60,
+    kms_key_validator: 60 * 60,
+    ec2_key_pair_validator: 60 * 60,
+    ec2_vpc_id_validator: 60 * 60,
+    ec2_subnet_id_validator: 60 * 60,
+    ec2_security_group_validator: 60 * 60,
+    ec2_ami_validator: 60 * 60,
+    ec2_placement_group_validator: 60 * 60,
+    s3_bucket_validator: 10 * 60,
+    s3_uri_validator: 10 * 60,
+    url_validator: 10 * 60,
+    efs_id_validator: 10 * 60,
+    fsx_id_validator: 10 * 60,
+    fsx_lustre_auto_import_validator: 10 * 60,
+    fsx_lustre_backup_validator: 10 * 60,
+    # The state of the volumes changes frequently
+    ec2_volume_validator: 5 * 60,
+}
@@ -23,8 +23,6 @@ import os
 import sys
 from collections import OrderedDict
 
-import boto3
-
 from pcluster.config.pcluster_config import PclusterConfig
 from pcluster.configure.networking import (
     NetworkConfiguration,
@@ -35,6 +33,7 @@ from pcluster.configure.networking import (
 from pcluster.configure.utils import get_regions, get_resource_tag, handle_client_exception, prompt, prompt_iterable
 from pcluster.utils import (
     error,
+    get_boto3_client,
     get_region,
     get_supported_az_for_multi_instance_types,
     get_supported_az_for_one_instance_type,
@@ -50,7 +49,7 @@ LOGGER = logging.getLogger(__name__)
 @handle_client_exception
 def _get_keys():
     """Return a list of keys."""
-    keypairs = boto3.client("ec2").describe_key_pairs()
+    keypairs = get_boto3_client("ec2").describe_key_pairs()
     key_options = []
     for key in keypairs.get("KeyPairs"):
         key_name = key.get("KeyName")
@@ -80,7 +79,7 @@ def _get_vpcs_and_subnets():
                    {"vpc-id1": list({"id":subnet-id, "name":name, "size":subnet-size, "availability_zone": subnet-az}),
                     "vpc-id2": list({"id":subnet-id, "name":name, "size":subnet-size, "availability_zone": subnet-az})}}
     """
-    ec2_client = boto3.client("ec2")
+    ec2_client = get_boto3_client("ec2")
     vpcs = ec2_client.describe_vpcs()
     vpc_options = []
     vpc_subnets = {}
@@ -354,7 +353,7 @@ class ClusterConfigureHelper:
 
     def prompt_instance_types(self):
         """Ask for master_instance_type and compute_instance_type (if necessary)."""
-        ec2_client = boto3.client("ec2")
+        ec2_client = get_boto3_client("ec2")
         instance_type_offerings = [
             offering["InstanceType"]
             for offering in ec2_client.describe_instance_type_offerings()["InstanceTypeOfferings"]
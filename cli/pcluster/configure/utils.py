@@ -13,10 +13,11 @@ import logging
 import sys
 from builtins import input
 
-import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 from tabulate import tabulate
 
+from pcluster.utils import get_boto3_client
+
 LOGGER = logging.getLogger(__name__)
 unsupported_regions = ["ap-northeast-3"]
 
@@ -196,7 +197,7 @@ def get_rows_and_header(items):
 
 @handle_client_exception
 def get_regions():
-    ec2 = boto3.client("ec2")
+    ec2 = get_boto3_client("ec2")
     regions = ec2.describe_regions().get("Regions")
     regions = [region.get("RegionName") for region in regions if region.get("RegionName") not in unsupported_regions]
     regions.sort()
@@ -14,6 +14,8 @@ import sys
 import boto3
 from botocore.exceptions import BotoCoreError, ClientError
 
+from pcluster.utils import get_boto3_client
+
 
 class VpcFactory:
     """This class handles vpc automation related to pcluster."""
@@ -39,7 +41,7 @@ class VpcFactory:
 
         :param aws_region_name: the region in which you want to use the VpcHandler
         """
-        self.__client = boto3.client("ec2", region_name=aws_region_name)
+        self.__client = get_boto3_client("ec2", region_name=aws_region_name)
         self.ec2 = boto3.resource("ec2", region_name=aws_region_name)
 
     @_ExceptionHandler.handle_client_exception
@@ -0,0 +1,159 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import random
+import threading
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+# Error codes returned by AWS services when a request is throttled
+THROTTLING_ERROR_CODES = frozenset(
+    [
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestThrottled",
+        "RequestThrottledException",
+        "RequestLimitExceeded",
+        "TooManyRequestsException",
+        "ProvisionedThroughputExceededException",
+        "SlowDown",
+    ]
+)
+
+# Requests per second allowed for each API until it throttles a request, and bounds of the adapted rate
+MAX_REQUEST_RATE = 50.0
+MIN_REQUEST_RATE = 0.5
+# The rate is halved when a request is throttled and increased by this amount for each successful request
+REQUEST_RATE_INCREASE = 0.5
+
+
+def exponential_backoff(attempt, base_wait=1, max_wait=60):
+    """
+    Return the seconds to wait before retrying a request that failed attempt + 1 times.
+
+    The wait doubles at every attempt, up to max_wait, and is randomized between half and the whole of that value,
+    so that clients failing at the same time do not retry at the same time.
+    """
+    wait = min(max_wait, base_wait * 2**attempt)
+    return wait / 2.0 + random.uniform(0, wait / 2.0)
+
+
+class AdaptiveRateLimiter(object):
+    """
+    Token bucket limiting the rate of the requests to an AWS API, shared by all the threads of the process.
+
+    One limiter exists for each (service, operation). Its rate is halved every time the API throttles a request and
+    grows back linearly with the successful requests, so that concurrent commands slow down instead of stampeding
+    an API that is already throttling them. Requests exceeding the rate reserve a token and wait for it.
+    """
+
+    _limiters = {}
+    _lock = threading.Lock()
+
+    def __init__(self, service, operation, max_rate=MAX_REQUEST_RATE, min_rate=MIN_REQUEST_RATE):
+        self.service = service
+        self.operation = operation
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.rate = max_rate
+        self.__tokens = max_rate
+        self.__last_refill = time.time()
+        self.__lock = threading.Lock()
+        # Counters, see get_stats
+        self.requests = 0
+        self.throttles = 0
+        self.wait_time = 0.0
+
+    @classmethod
+    def get(cls, service, operation):
+        """Return the limiter of the given API, shared by the whole process."""
+        key = (service, operation)
+        limiter = cls._limiters.get(key)
+        if limiter is None:
+            with cls._lock:
+                limiter = cls._limiters.setdefault(key, cls(service, operation))
+        return limiter
+
+    @classmethod
+    def reset(cls):
+        """Discard all the limiters and their counters."""
+        with cls._lock:
+            cls._limiters.clear()
+
+    @classmethod
+    def get_stats(cls):
+        """Return a dict "service.operation" -> counters of the requests made through the limiters."""
+        return {
+            "{0}.{1}".format(limiter.service, limiter.operation): {
+                "requests": limiter.requests,
+                "throttles": limiter.throttles,
+                "wait_time": round(limiter.wait_time, 3),
+                "rate": limiter.rate,
+            }
+            for limiter in list(cls._limiters.values())
+        }
+
+    def acquire(self):
+        """Take a token from the bucket, waiting for it if the bucket is empty."""
+        with self.__lock:
+            self.__refill()
+            self.__tokens -= 1
+            self.requests += 1
+            wait = -self.__tokens / self.rate if self.__tokens < 0 else 0
+            self.wait_time += wait
+        if wait:
+            LOGGER.debug("Waiting %.2f seconds before calling %s.%s", wait, self.service, self.operation)
+            time.sleep(wait)
+
+    def on_throttled(self):
+        """Halve the rate after a throttled request."""
+        with self.__lock:
+            self.__refill()
+            self.throttles += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.__tokens = min(self.__tokens, self.rate)
+            LOGGER.debug("%s.%s throttled, reducing request rate to %s/s", self.service, self.operation, self.rate)
+
+    def on_success(self):
+        """Increase the rate after a successful request."""
+        with self.__lock:
+            if self.rate < self.max_rate:
+                self.__refill()
+                self.rate = min(self.max_rate, self.rate + REQUEST_RATE_INCREASE)
+
+    def __refill(self):
+        now = time.time()
+        # The bucket holds at most one second worth of requests
+        self.__tokens = min(max(self.rate, 1), self.__tokens + (now - self.__last_refill) * self.rate)
+        self.__last_refill = now
+
+
+def _get_api(event_name):
+    """Return service and operation from the name of a botocore event, e.g. before-send.ec2.DescribeInstances."""
+    _, service, operation = event_name.split(".", 2)
+    return service, operation
+
+
+def before_send_handler(event_name, **kwargs):
+    """Handle the before-send event of a boto3 client, called before every attempt of a request."""
+    AdaptiveRateLimiter.get(*_get_api(event_name)).acquire()
+
+
+def needs_retry_handler(event_name, response=None, **kwargs):
+    """Handle the needs-retry event of a boto3 client, called with the outcome of every attempt of a request."""
+    if response:
+        limiter = AdaptiveRateLimiter.get(*_get_api(event_name))
+        if (response[1] or {}).get("Error", {}).get("Code") in THROTTLING_ERROR_CODES:
+            limiter.on_throttled()
+        else:
+            limiter.on_success()
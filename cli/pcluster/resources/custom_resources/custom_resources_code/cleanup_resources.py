@@ -10,6 +10,7 @@
 # limitations under the License.
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import boto3
 from botocore.config import Config
@@ -19,6 +20,12 @@ helper = CfnResource(json_logging=False, log_level="INFO", boto_level="ERROR", s
 logger = logging.getLogger(__name__)
 boto3_config = Config(retries={"max_attempts": 60})
 
+# Max number of instances described by a DescribeInstances page and terminated by a TerminateInstances request
+DESCRIBE_INSTANCES_PAGE_SIZE = 1000
+TERMINATE_INSTANCES_BATCH_SIZE = 100
+# Max number of TerminateInstances requests sent at the same time
+TERMINATE_INSTANCES_WORKERS = 5
+
 
 def _delete_dns_records(event):
     """Delete all DNS entries from the private Route53 hosted zone created within the cluster."""
@@ -101,22 +108,13 @@ def _terminate_cluster_nodes(event):
 
         completed_successfully = False
         while not completed_successfully:
-            completed_successfully = True
-            for instance_ids in _describe_instance_ids_iterator(stack_name):
-                logger.info("Terminating instances %s", instance_ids)
-                if instance_ids:
-                    try:
-                        ec2.terminate_instances(InstanceIds=instance_ids)
-                    except Exception as e:
-                        logger.error("Failed when terminating instances with error %s", e)
-                        completed_successfully = False
-                        continue
-            logger.info("Sleeping for 10 seconds to allow all instances to initiate shut-down")
-            time.sleep(10)
+            instance_ids = _describe_instance_ids(stack_name)
+            completed_successfully = _terminate_instances(ec2, instance_ids)
+            if instance_ids:
+                logger.info("Sleeping for 10 seconds to allow all instances to initiate shut-down")
+                time.sleep(10)
 
-        while _has_shuttingdown_instances(stack_name):
-            logger.info("Waiting for all nodes to shut-down...")
-            time.sleep(10)
+        _wait_for_shutdown(stack_name)
 
         # Sleep for 30 more seconds to give PlacementGroups the time to update
         time.sleep(30)
@@ -127,32 +125,62 @@ def _terminate_cluster_nodes(event):
         raise
 
 
-def _has_shuttingdown_instances(stack_name):
-    ec2 = boto3.client("ec2", config=boto3_config)
-    filters = [
-        {"Name": "tag:Application", "Values": [stack_name]},
-        {"Name": "instance-state-name", "Values": ["shutting-down"]},
-    ]
-
-    result = ec2.describe_instances(Filters=filters)
-    return len(result.get("Reservations", [])) > 0
-
+def _terminate_instances(ec2, instance_ids):
+    """
+    Terminate the given instances with batches of requests sent concurrently, logging the progress.
 
-def _describe_instance_ids_iterator(stack_name, instance_state=("pending", "running", "stopping", "stopped")):
+    Throttled requests are retried by the client, the number of concurrent requests is limited to keep the throttling
+    low. Return False if some of the batches failed.
+    """
+    batches = []
+    remaining_instance_ids = list(instance_ids)
+    while remaining_instance_ids:
+        batches.append(remaining_instance_ids[:TERMINATE_INSTANCES_BATCH_SIZE])
+        remaining_instance_ids = remaining_instance_ids[TERMINATE_INSTANCES_BATCH_SIZE:]
+    if not batches:
+        logger.info("No instances to terminate")
+        return True
+
+    logger.info("Terminating %s instances", len(instance_ids))
+    completed_successfully = True
+    terminating_count = 0
+    with ThreadPoolExecutor(max_workers=min(TERMINATE_INSTANCES_WORKERS, len(batches))) as executor:
+        futures = {executor.submit(ec2.terminate_instances, InstanceIds=batch): batch for batch in batches}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                terminating_count += len(futures[future])
+                logger.info("Terminating instances: %s/%s", terminating_count, len(instance_ids))
+            except Exception as e:
+                logger.error("Failed when terminating instances %s with error %s", futures[future], e)
+                completed_successfully = False
+    return completed_successfully
+
+
+def _wait_for_shutdown(stack_name):
+    """Wait for all the instances of the cluster to be terminated, with a single paginated describe per cycle."""
+    shutting_down_count = len(_describe_instance_ids(stack_name, instance_state=("shutting-down",)))
+    while shutting_down_count:
+        logger.info("Waiting for %s nodes to shut-down...", shutting_down_count)
+        time.sleep(10)
+        shutting_down_count = len(_describe_instance_ids(stack_name, instance_state=("shutting-down",)))
+
+
+def _describe_instance_ids(stack_name, instance_state=("pending", "running", "stopping", "stopped")):
     ec2 = boto3.client("ec2", config=boto3_config)
     filters = [
         {"Name": "tag:Application", "Values": [stack_name]},
         {"Name": "instance-state-name", "Values": list(instance_state)},
     ]
-    pagination_config = {"PageSize": 100}
+    pagination_config = {"PageSize": DESCRIBE_INSTANCES_PAGE_SIZE}
 
+    instance_ids = []
     paginator = ec2.get_paginator("describe_instances")
     for page in paginator.paginate(Filters=filters, PaginationConfig=pagination_config):
-        instances = []
         for reservation in page.get("Reservations", []):
             for instance in reservation.get("Instances", []):
-                instances.append(instance.get("InstanceId"))
-        yield instances
+                instance_ids.append(instance.get("InstanceId"))
+    return instance_ids
 
 
 @helper.create
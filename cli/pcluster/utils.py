@@ -22,25 +22,85 @@ import random
 import re
 import string
 import sys
+import threading
 import time
+import urllib.error
 import urllib.request
 import zipfile
+from collections import OrderedDict
 from enum import Enum
 from io import BytesIO
 from urllib.parse import urlparse
 
 import boto3
 import pkg_resources
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError, EndpointConnectionError
+from concurrent.futures import ThreadPoolExecutor
 from jinja2 import BaseLoader, Environment
 
+from pcluster.cache import ContentCache, FileCache, is_cache_enabled
 from pcluster.cli_commands.compute_fleet_status_manager import ComputeFleetStatus, ComputeFleetStatusManager
 from pcluster.constants import PCLUSTER_STACK_PREFIX, SUPPORTED_ARCHITECTURES
+from pcluster.rate_limiter import (
+    THROTTLING_ERROR_CODES,
+    before_send_handler,
+    exponential_backoff,
+    needs_retry_handler,
+)
 
 LOGGER = logging.getLogger(__name__)
 
 STACK_TYPE = "AWS::CloudFormation::Stack"
 
+# Bounds (in seconds) of the adaptive wait between two polls of the stack events
+STACK_EVENTS_MIN_WAIT = 2
+STACK_EVENTS_MAX_WAIT = 30
+
+# Botocore configuration of the clients shared through the Boto3ClientRegistry
+BOTO3_CLIENT_CONFIG = Config(max_pool_connections=50, retries={"max_attempts": 10, "mode": "standard"})
+
+# Time (in seconds) after which the on-disk catalog of the instance types of a region is retrieved again
+INSTANCE_TYPES_CATALOG_TTL = 24 * 60 * 60
+# Namespace and time (in seconds) after which the on-disk list of the instance types supported by Batch in a region
+# is refreshed, in background if a previous list is available
+BATCH_INSTANCE_TYPES_CACHE_NAMESPACE = "batch-instance-types"
+BATCH_INSTANCE_TYPES_TTL = 24 * 60 * 60
+# Max number of instance types accepted by a DescribeInstanceTypes request
+MAX_DESCRIBE_INSTANCE_TYPES = 100
+
+# Max number of values of a filter of the EC2 Describe APIs
+MAX_EC2_FILTER_VALUES = 200
+
+# Max number of AWS requests sent at the same time by the commands fanning out over many resources or regions,
+# can be overridden through the environment
+DEFAULT_REQUEST_WORKERS = 10
+REQUEST_WORKERS_ENV_VAR = "AWS_PCLUSTER_REQUEST_WORKERS"
+
+# Namespace of the on-disk cache of the zip archives of the resources dirs uploaded to the cluster bucket
+ARTIFACTS_CACHE_NAMESPACE = "artifacts"
+# Fixed timestamp of the entries of the zip archives, so that their content only depends on the archived files
+ZIP_ENTRIES_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+# Size (in bytes) from which the artifacts are uploaded with multipart uploads
+ARTIFACTS_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+
+# Namespace and time (in seconds) after which the on-disk copies of the remote files, e.g. the HIT template, expire
+REMOTE_FILES_CACHE_NAMESPACE = "remote-files"
+REMOTE_FILES_CACHE_TTL = 30 * 24 * 60 * 60
+
+# EC2 Describe API, argument to filter by ids, key of the results and key of the id of each result, by resource type
+EC2_RESOURCE_DESCRIBE_APIS = {
+    "subnet": ("describe_subnets", "SubnetIds", "Subnets", "SubnetId"),
+    "security_group": ("describe_security_groups", "GroupIds", "SecurityGroups", "GroupId"),
+    "volume": ("describe_volumes", "VolumeIds", "Volumes", "VolumeId"),
+    "snapshot": ("describe_snapshots", "SnapshotIds", "Snapshots", "SnapshotId"),
+    "image": ("describe_images", "ImageIds", "Images", "ImageId"),
+    "key_pair": ("describe_key_pairs", "KeyNames", "KeyPairs", "KeyName"),
+}
+# Serializes the batched calls of prefetch_ec2_resources
+_ec2_resources_lock = threading.Lock()
+
 
 class NodeType(Enum):
     """Enum that identifies the cluster node type."""
@@ -52,6 +112,102 @@ class NodeType(Enum):
         return str(self.value)
 
 
+_throttled_requests = threading.local()
+
+
+def get_throttled_requests_count():
+    """Return the number of requests made by the current thread that failed because of throttling."""
+    return getattr(_throttled_requests, "count", 0)
+
+
+def _count_throttled_request(parsed=None, **kwargs):
+    """Handle the after-call event of the shared clients, counting the throttled requests of the current thread."""
+    if (parsed or {}).get("Error", {}).get("Code") in THROTTLING_ERROR_CODES:
+        _throttled_requests.count = get_throttled_requests_count() + 1
+
+
+class Boto3ClientRegistry(object):
+    """
+    Process-wide registry of the boto3 clients used by the CLI.
+
+    A client is created only once for each (service, region, credentials, proxy, endpoint) combination and then
+    shared, so that endpoint resolution, service model loading and HTTPS connection pools are not repeated for
+    every call. boto3 clients are thread-safe once created, while their creation is serialized by a lock.
+    All the requests of the shared clients go through the AdaptiveRateLimiter of their API.
+    """
+
+    _clients = {}
+    _lock = threading.Lock()
+    # Number of clients actually created, useful to measure the reuse
+    constructions = 0
+
+    @classmethod
+    def get_client(
+        cls,
+        service,
+        region_name=None,
+        aws_access_key_id=None,
+        aws_secret_access_key=None,
+        endpoint_url=None,
+        proxy=None,
+    ):
+        """
+        Return the shared client for the given service.
+
+        :param service: boto3 service name
+        :param region_name: region of the client, AWS_DEFAULT_REGION by default
+        :param aws_access_key_id: access key to use instead of the default credentials chain
+        :param aws_secret_access_key: secret key to use instead of the default credentials chain
+        :param endpoint_url: custom endpoint of the service
+        :param proxy: https proxy to use to connect to the service
+        """
+        region_name = region_name or get_region()
+        key = (
+            service,
+            region_name,
+            aws_access_key_id or os.environ.get("AWS_ACCESS_KEY_ID"),
+            os.environ.get("AWS_PROFILE"),
+            endpoint_url,
+            proxy,
+        )
+        client = cls._clients.get(key)
+        if client is None:
+            with cls._lock:
+                client = cls._clients.get(key)
+                if client is None:
+                    client_kwargs = {
+                        "config": BOTO3_CLIENT_CONFIG.merge(Config(proxies={"https": proxy}))
+                        if proxy
+                        else BOTO3_CLIENT_CONFIG
+                    }
+                    if region_name:
+                        client_kwargs["region_name"] = region_name
+                    if aws_access_key_id:
+                        client_kwargs["aws_access_key_id"] = aws_access_key_id
+                        client_kwargs["aws_secret_access_key"] = aws_secret_access_key
+                    if endpoint_url:
+                        client_kwargs["endpoint_url"] = endpoint_url
+                    client = boto3.client(service, **client_kwargs)
+                    client.meta.events.register("after-call", _count_throttled_request)
+                    client.meta.events.register("before-send", before_send_handler)
+                    client.meta.events.register("needs-retry", needs_retry_handler)
+                    cls._clients[key] = client
+                    cls.constructions += 1
+        return client
+
+    @classmethod
+    def reset(cls):
+        """Discard all the shared clients."""
+        with cls._lock:
+            cls._clients.clear()
+            cls.constructions = 0
+
+
+def get_boto3_client(service, **kwargs):
+    """Return the boto3 client for the given service shared by the whole process, see Boto3ClientRegistry."""
+    return Boto3ClientRegistry.get_client(service, **kwargs)
+
+
 def get_stack_name(cluster_name):
     return PCLUSTER_STACK_PREFIX + cluster_name
 
@@ -67,7 +223,7 @@ def get_cluster_name(stack_name):
 def get_stack_template(stack_name):
     """Get the template used for the given stack."""
     try:
-        template = boto3.client("cloudformation").get_template(StackName=stack_name).get("TemplateBody")
+        template = get_boto3_client("cloudformation").get_template(StackName=stack_name).get("TemplateBody")
     except ClientError as client_err:
         error(
             "Unable to get template for stack {stack_name}.\n{err_msg}".format(
@@ -85,14 +241,13 @@ def get_stack_version(stack):
 
 def _wait_for_update(stack_name):
     """Wait for the given stack to be finished updating."""
-    while get_stack(stack_name).get("StackStatus") == "UPDATE_IN_PROGRESS":
-        time.sleep(5)
+    wait_for_stack(stack_name)
 
 
 def update_stack_template(stack_name, updated_template, cfn_parameters):
     """Update stack_name's template to that represented by updated_template."""
     try:
-        boto3.client("cloudformation").update_stack(
+        get_boto3_client("cloudformation").update_stack(
             StackName=stack_name,
             TemplateBody=json.dumps(updated_template, indent=2),  # Indent so it looks nice in the console
             Parameters=cfn_parameters,
@@ -110,6 +265,38 @@ def get_region():
     return os.environ.get("AWS_DEFAULT_REGION")
 
 
+def get_workers_from_env(env_var, default_workers):
+    """Return the number of workers set in the given environment variable, at least 1, or the default one."""
+    try:
+        return max(1, int(os.environ.get(env_var, default_workers)))
+    except ValueError:
+        LOGGER.warning("Invalid value for %s, using %s", env_var, default_workers)
+        return default_workers
+
+
+def get_request_workers():
+    """Return the max number of AWS requests to send concurrently."""
+    return get_workers_from_env(REQUEST_WORKERS_ENV_VAR, DEFAULT_REQUEST_WORKERS)
+
+
+def get_account_id():
+    """Return the id of the AWS account of the credentials in use."""
+    if not hasattr(get_account_id, "cache"):
+        get_account_id.cache = {}
+    region = get_region()
+    if region not in get_account_id.cache:
+        get_account_id.cache[region] = (
+            get_boto3_client("sts", endpoint_url=get_sts_endpoint()).get_caller_identity().get("Account")
+        )
+    return get_account_id.cache[region]
+
+
+def get_sts_endpoint():
+    """Get regionalized STS endpoint."""
+    region = get_region()
+    return "https://sts.{0}.{1}".format(region, "amazonaws.com.cn" if region.startswith("cn-") else "amazonaws.com")
+
+
 def get_partition():
     """Get partition for the AWS_DEFAULT_REGION set in the environment."""
     region = get_region()
@@ -151,7 +338,7 @@ def create_s3_bucket(bucket_name, region):
     :param region: aws region
     :raise ClientError if bucket creation fails
     """
-    s3_client = boto3.client("s3")
+    s3_client = get_boto3_client("s3")
     """ :type : pyboto3.s3 """
     if region != "us-east-1":
         s3_client.create_bucket(Bucket=bucket_name, CreateBucketConfiguration={"LocationConstraint": region})
@@ -167,7 +354,7 @@ def create_s3_bucket(bucket_name, region):
 
 
 def _configure_s3_bucket(bucket_name):
-    s3_client = boto3.client("s3")
+    s3_client = get_boto3_client("s3")
     s3_client.put_bucket_versioning(Bucket=bucket_name, VersioningConfiguration={"Status": "Enabled"})
     s3_client.put_bucket_encryption(
         Bucket=bucket_name,
@@ -195,7 +382,7 @@ def delete_s3_bucket(bucket_name):
         bucket.objects.all().delete()
         bucket.object_versions.delete()
         bucket.delete()
-    except boto3.client("s3").exceptions.NoSuchBucket:
+    except get_boto3_client("s3").exceptions.NoSuchBucket:
         pass
     except ClientError as client_err:
         LOGGER.warning(
@@ -209,64 +396,120 @@ def _add_file_to_zip(zip_file, path, arcname):
     """
     Add the file at path under the name arcname to the archive represented by zip_file.
 
+    The entry has fixed timestamp and permissions, so that the archive only depends on the content of the files.
     :param zip_file: zipfile.ZipFile object
     :param path: string; path to file being added
     :param arcname: string; filename to put bytes from path under in created archive
     """
     with open(path, "rb") as input_file:
-        zinfo = zipfile.ZipInfo(filename=arcname)
+        zinfo = zipfile.ZipInfo(filename=arcname, date_time=ZIP_ENTRIES_DATE_TIME)
         zinfo.external_attr = 0o644 << 16
+        zinfo.compress_type = zip_file.compression
         zip_file.writestr(zinfo, input_file.read())
 
 
+def _list_dir_files(path):
+    """Return the (file path, path relative to the given dir) of all the files rooted in path, sorted by name."""
+    dir_files = []
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for file in sorted(files):
+            file_path = os.path.join(root, file)
+            dir_files.append((file_path, os.path.relpath(file_path, start=path)))
+    return dir_files
+
+
 def zip_dir(path):
     """
     Create a zip archive containing all files and dirs rooted in path.
 
     The archive is created in memory and a file handler is returned by the function.
+    Files are added in a fixed order and with fixed timestamps, so the same content always gives the same archive.
     :param path: directory containing the resources to archive.
     :return file handler pointing to the compressed archive.
     """
     file_out = BytesIO()
     with zipfile.ZipFile(file_out, "w", zipfile.ZIP_DEFLATED) as ziph:
-        for root, _, files in os.walk(path):
-            for file in files:
-                _add_file_to_zip(
-                    ziph,
-                    os.path.join(root, file),
-                    os.path.relpath(os.path.join(root, file), start=path),
-                )
+        for file_path, arcname in _list_dir_files(path):
+            _add_file_to_zip(ziph, file_path, arcname)
     file_out.seek(0)
     return file_out
 
 
+def _get_dir_digest(path):
+    """Return the sha256 hex digest of the names and contents of all the files rooted in path."""
+    digest = hashlib.sha256()
+    for file_path, relative_path in _list_dir_files(path):
+        with open(file_path, "rb") as input_file:
+            content = input_file.read()
+        digest.update(relative_path.replace(os.sep, "/").encode("utf-8"))
+        digest.update(hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+
+def _get_zipped_dir(path):
+    """
+    Return the content of the zip archive of the given dir.
+
+    Archives are cached by the digest of the dir content, so that they are built once for each version of the
+    resources of the CLI.
+    """
+    cache = ContentCache(ARTIFACTS_CACHE_NAMESPACE)
+    cache_key = "{0}.zip".format(_get_dir_digest(path))
+    content = cache.get(cache_key)
+    if content is None:
+        content = zip_dir(path).getvalue()
+        cache.put(cache_key, content)
+    return content
+
+
+def _upload_artifact(bucket_name, key, content):
+    """Upload the given content, with a multipart upload if it is large."""
+    transfer_config = TransferConfig(multipart_threshold=ARTIFACTS_MULTIPART_THRESHOLD)
+    get_boto3_client("s3").upload_fileobj(BytesIO(content), bucket_name, key, Config=transfer_config)
+
+
 def upload_resources_artifacts(bucket_name, root):
     """
     Upload to the specified S3 bucket the content of the directory rooted in root path.
 
     All dirs contained in root dir will be uploaded as zip files to $bucket_name/$dir_name/artifacts.zip.
     All files contained in root dir will be uploaded to $bucket_name.
+    Artifacts are uploaded concurrently, large ones with multipart uploads.
 
     :param bucket_name: name of the S3 bucket where files are uploaded
     :param root: root directory containing the resources to upload.
     """
-    bucket = boto3.resource("s3").Bucket(bucket_name)
-    for res in os.listdir(root):
+    artifacts = []
+    for res in sorted(os.listdir(root)):
         if os.path.isdir(os.path.join(root, res)):
-            bucket.upload_fileobj(zip_dir(os.path.join(root, res)), "%s/artifacts.zip" % res)
+            artifacts.append(("%s/artifacts.zip" % res, _get_zipped_dir(os.path.join(root, res))))
         elif os.path.isfile(os.path.join(root, res)):
-            bucket.upload_file(os.path.join(root, res), res)
+            with open(os.path.join(root, res), "rb") as input_file:
+                artifacts.append((res, input_file.read()))
+    if not artifacts:
+        return
 
+    executor = ThreadPoolExecutor(max_workers=min(get_request_workers(), len(artifacts)))
+    try:
+        futures = [executor.submit(_upload_artifact, bucket_name, key, content) for key, content in artifacts]
+        for future in futures:
+            # Raise the first failure
+            future.result()
+    finally:
+        executor.shutdown(wait=True)
 
-def get_instance_vcpus(instance_type):
+
+def get_instance_vcpus(instance_type, instance_info=None):
     """
     Get number of vcpus for the given instance type.
 
     :param instance_type: the instance type to search for.
+    :param instance_info: the DescribeInstanceTypes info of the instance type, if already available
     :return: the number of vcpus or -1 if the instance type cannot be found
     """
     try:
-        instance_type_info = get_instance_type(instance_type)
+        instance_type_info = instance_info or get_instance_type(instance_type)
         vcpus_info = instance_type_info.get("VCpuInfo")
         vcpus = vcpus_info.get("DefaultVCpus")
     except (ClientError):
@@ -277,7 +520,7 @@ def get_instance_vcpus(instance_type):
 
 def get_supported_instance_types():
     """Return the list of instance types available in the given region."""
-    ec2_client = boto3.client("ec2")
+    ec2_client = get_boto3_client("ec2")
     try:
         return [
             offering.get("InstanceType") for offering in paginate_boto3(ec2_client.describe_instance_type_offerings)
@@ -303,7 +546,7 @@ def _call_create_compute_environment_with_bad_instance_type():
     For more information on why this would be done, see the docstring for
     _get_supported_instance_types_create_compute_environment_error_message.
     """
-    batch_client = boto3.client("batch")
+    batch_client = get_boto3_client("batch")
     nonexistent_instance_type = "p8.84xlarge"
     batch_client.create_compute_environment(
         computeEnvironmentName="dummy",
@@ -393,10 +636,52 @@ def _batch_instance_types_and_families_are_supported(candidate_types_and_familie
 
 def get_supported_batch_instance_types():
     """
-    Get the instance types supported by Batch in the desired region.
+    Get the instance types and families supported by Batch in the desired region.
+
+    The discovered list is persisted in the on-disk cache for each region. When the cached list is expired it is
+    still returned, and refreshed in a background thread, so that an old list can be used also when offline.
+    The list is discovered synchronously only when nothing has been cached for the region.
+    """
+    region = get_region()
+    file_cache = FileCache(BATCH_INSTANCE_TYPES_CACHE_NAMESPACE, BATCH_INSTANCE_TYPES_TTL)
+    supported_batch_types = file_cache.get(region)
+    if supported_batch_types is None:
+        supported_batch_types = file_cache.get(region, ignore_ttl=True)
+        if supported_batch_types is not None:
+            LOGGER.debug("Refreshing in background the instance types supported by Batch in region %s", region)
+            refresh_thread = threading.Thread(target=_refresh_supported_batch_instance_types, args=(file_cache, region))
+            # The refresh is abandoned if the command completes first, the cached list is refreshed by a later command
+            refresh_thread.daemon = True
+            refresh_thread.start()
+        else:
+            supported_batch_types, discovered = _discover_supported_batch_instance_types()
+            # The fallback list is not cached, so that the discovery is retried by the next command
+            if discovered:
+                file_cache.put(region, supported_batch_types)
+    return supported_batch_types
+
+
+def _refresh_supported_batch_instance_types(file_cache, region):
+    """Discover the instance types supported by Batch and update the cached list, keeping it on failure."""
+    try:
+        supported_batch_types, discovered = _discover_supported_batch_instance_types()
+        if discovered:
+            file_cache.put(region, supported_batch_types)
+        else:
+            LOGGER.debug("Keeping the cached instance types supported by Batch in region %s", region)
+    except (Exception, SystemExit) as e:
+        LOGGER.debug("Unable to refresh the instance types supported by Batch in region %s: %s", region, e)
+
+
+def _discover_supported_batch_instance_types():
+    """
+    Discover the instance types supported by Batch in the desired region.
 
     This is done by calling Batch's CreateComputeEnvironment with a bad
     instance type and parsing the error message.
+
+    :return: a tuple with the list of supported instance types and families, and a boolean that is False when the list
+        could not be parsed from the Batch error message and all the instance types of the region are returned instead
     """
     supported_instance_types = get_supported_instance_types()
     supported_instance_families = _get_instance_families_from_types(supported_instance_types)
@@ -408,9 +693,7 @@ def get_supported_batch_instance_types():
         if _batch_instance_types_and_families_are_supported(
             parsed_instance_types_and_families, supported_instance_types_and_families
         ):
-            supported_batch_types = parsed_instance_types_and_families
-        else:
-            supported_batch_types = supported_instance_types_and_families
+            return parsed_instance_types_and_families, True
     except Exception as exception:
         # When the instance types supported by Batch can't be parsed from an error message,
         # log the reason for the failure and return instead a list of all instance types
@@ -419,8 +702,7 @@ def get_supported_batch_instance_types():
             "Failed to parse supported Batch instance types from a CreateComputeEnvironment "
             "error message: {0}".format(exception)
         )
-        supported_batch_types = supported_instance_types_and_families
-    return supported_batch_types
+    return supported_instance_types_and_families, False
 
 
 def get_supported_compute_instance_types(scheduler):
@@ -474,7 +756,7 @@ def get_supported_az_for_multi_instance_types(instance_types):
         else:
             missing_instance_types.append(instance_type)
     if missing_instance_types:
-        ec2_client = boto3.client("ec2")
+        ec2_client = get_boto3_client("ec2")
         paginator = ec2_client.get_paginator("describe_instance_type_offerings")
         page_iterator = paginator.paginate(
             LocationType="availability-zone", Filters=[{"Name": "instance-type", "Values": missing_instance_types}]
@@ -502,9 +784,7 @@ def get_availability_zone_of_subnet(subnet_id):
     cache = get_availability_zone_of_subnet.cache
     if subnet_id not in cache:
         try:
-            cache[subnet_id] = (
-                boto3.client("ec2").describe_subnets(SubnetIds=[subnet_id]).get("Subnets")[0].get("AvailabilityZone")
-            )
+            cache[subnet_id] = describe_ec2_resource("subnet", subnet_id).get("AvailabilityZone")
         except ClientError as e:
             LOGGER.debug(
                 "Unable to detect availability zone for subnet {0}.\n{1}".format(
@@ -514,6 +794,112 @@ def get_availability_zone_of_subnet(subnet_id):
     return cache.get(subnet_id)
 
 
+def prefetch_ec2_resources(resource_ids):
+    """
+    Register the given EC2 resources to be described together, with a single call per type of resource.
+
+    The resources of a type are described the first time any resource of that type is requested through
+    describe_ec2_resources and are then served without further requests.
+    A batched call fails as a whole if any of the resources doesn't exist. In this case the error is kept for the
+    resource if it was the only one requested, otherwise the resources of that type are described one by one when
+    requested, so that each error is reported for the right resource.
+
+    :param resource_ids: dict resource type (a key of EC2_RESOURCE_DESCRIBE_APIS) -> list of ids
+    """
+    cache = _get_ec2_resources_cache()
+    with _ec2_resources_lock:
+        for resource_type, ids in resource_ids.items():
+            pending_ids = cache["pending"].setdefault(resource_type, [])
+            pending_ids.extend(
+                resource_id
+                for resource_id in _unique(ids)
+                if resource_id not in cache["resources"][resource_type] and resource_id not in pending_ids
+            )
+
+
+def describe_ec2_resources(resource_type, resource_ids):
+    """
+    Return the descriptions of the given EC2 resources, in the same order.
+
+    Resources registered through prefetch_ec2_resources are not described again, the others are described with a
+    single call. Resources not returned by EC2 are omitted.
+
+    :param resource_type: the type of resource, a key of EC2_RESOURCE_DESCRIBE_APIS
+    :param resource_ids: the ids of the resources
+    :raise: ClientError if any of the resources doesn't exist
+    """
+    cache = _get_ec2_resources_cache()
+    _describe_pending_ec2_resources(cache, resource_type)
+    cached_resources = cache["resources"][resource_type]
+    resource_ids = _unique(resource_ids)
+    for resource_id in resource_ids:
+        if isinstance(cached_resources.get(resource_id), ClientError):
+            raise cached_resources[resource_id]
+
+    resources = {
+        resource_id: cached_resources[resource_id] for resource_id in resource_ids if resource_id in cached_resources
+    }
+    missing_ids = [resource_id for resource_id in resource_ids if resource_id not in resources]
+    if len(missing_ids) == 1:
+        resources.update({missing_ids[0]: resource for resource in _describe_ec2_resources(resource_type, missing_ids)})
+    elif missing_ids:
+        for resource in _describe_ec2_resources(resource_type, missing_ids):
+            resources[resource.get(EC2_RESOURCE_DESCRIBE_APIS[resource_type][3])] = resource
+    return [resources[resource_id] for resource_id in resource_ids if resource_id in resources]
+
+
+def describe_ec2_resource(resource_type, resource_id):
+    """
+    Return the description of the given EC2 resource, see describe_ec2_resources.
+
+    :raise: ClientError if the resource doesn't exist, IndexError if EC2 doesn't return it
+    """
+    return describe_ec2_resources(resource_type, [resource_id])[0]
+
+
+def _describe_pending_ec2_resources(cache, resource_type):
+    """Describe with a single call the resources of the given type registered through prefetch_ec2_resources."""
+    # The lock is held during the call, so that concurrent requests wait for the batched call instead of repeating it
+    with _ec2_resources_lock:
+        resource_ids = cache["pending"].pop(resource_type, None)
+        if not resource_ids:
+            return
+        try:
+            for resource in _describe_ec2_resources(resource_type, resource_ids):
+                cache["resources"][resource_type][resource.get(EC2_RESOURCE_DESCRIBE_APIS[resource_type][3])] = resource
+        except ClientError as e:
+            LOGGER.debug("Unable to prefetch {0} resources {1}: {2}".format(resource_type, resource_ids, e))
+            if len(resource_ids) == 1 and e.response.get("Error", {}).get("Code") not in THROTTLING_ERROR_CODES:
+                cache["resources"][resource_type][resource_ids[0]] = e
+
+
+def _describe_ec2_resources(resource_type, resource_ids):
+    api, ids_argument, results_key, _ = EC2_RESOURCE_DESCRIBE_APIS[resource_type]
+    return getattr(get_boto3_client("ec2"), api)(**{ids_argument: resource_ids}).get(results_key)
+
+
+def _get_ec2_resources_cache():
+    """Return the EC2 resources retrieved so far by type and id, and the ones waiting to be described, by region."""
+    if not hasattr(describe_ec2_resources, "cache"):
+        describe_ec2_resources.cache = {}
+    region = os.environ.get("AWS_DEFAULT_REGION")
+    if region not in describe_ec2_resources.cache:
+        describe_ec2_resources.cache[region] = {
+            "resources": {resource_type: {} for resource_type in EC2_RESOURCE_DESCRIBE_APIS},
+            "pending": {},
+        }
+    return describe_ec2_resources.cache[region]
+
+
+def _unique(values):
+    """Return the given values without duplicates, preserving their order."""
+    unique_values = []
+    for value in values:
+        if value not in unique_values:
+            unique_values.append(value)
+    return unique_values
+
+
 def get_supported_os_for_scheduler(scheduler):
     """
     Return an array containing the list of OSes supported by parallelcluster for the specific scheduler.
@@ -565,7 +951,7 @@ def get_stack(stack_name, cfn_client=None, raise_on_error=False):
     """
     try:
         if not cfn_client:
-            cfn_client = boto3.client("cloudformation")
+            cfn_client = get_boto3_client("cloudformation")
         return retry_on_boto3_throttling(cfn_client.describe_stacks, StackName=stack_name).get("Stacks")[0]
     except ClientError as e:
         if raise_on_error:
@@ -590,7 +976,7 @@ def stack_exists(stack_name):
 
 def get_stack_resources(stack_name):
     """Get the given stack's resources."""
-    cfn_client = boto3.client("cloudformation")
+    cfn_client = get_boto3_client("cloudformation")
     try:
         return retry_on_boto3_throttling(cfn_client.describe_stack_resources, StackName=stack_name).get(
             "StackResources"
@@ -604,7 +990,7 @@ def get_stack_resources(stack_name):
 
 
 def get_stack_events(stack_name, raise_on_error=False):
-    cfn_client = boto3.client("cloudformation")
+    cfn_client = get_boto3_client("cloudformation")
     try:
         return retry_on_boto3_throttling(cfn_client.describe_stack_events, StackName=stack_name).get("StackEvents")
     except ClientError as client_err:
@@ -617,6 +1003,149 @@ def get_stack_events(stack_name, raise_on_error=False):
         )
 
 
+def is_stack_status_terminal(stack_status):
+    """Return True if no operation is in progress on a stack with the given status."""
+    return not stack_status.endswith("_IN_PROGRESS")
+
+
+def print_stack_event(event):
+    """Print the status of the resource of the given stack event, overwriting the current line."""
+    resource_status = ("Status: %s - %s" % (event.get("LogicalResourceId"), event.get("ResourceStatus"))).ljust(80)
+    sys.stdout.write("\r%s" % resource_status)
+    sys.stdout.flush()
+
+
+class StackEventsWatcher(object):
+    """
+    Follow the progress of a CloudFormation stack by tailing its events and the ones of its nested stacks.
+
+    Events are retrieved incrementally: each poll only reads the pages of DescribeStackEvents (newest first) up to
+    an event already seen or older than the start of the operation in progress on the stack. Polls are frequent
+    while the stack is changing and slow down exponentially while it's idle. Nested stacks are not polled anymore
+    after their own terminal event, unless the stack starts a new operation on them, e.g. a rollback.
+    """
+
+    def __init__(
+        self,
+        stack_name,
+        cfn_client=None,
+        on_event=None,
+        min_wait=STACK_EVENTS_MIN_WAIT,
+        max_wait=STACK_EVENTS_MAX_WAIT,
+        raise_on_error=False,
+    ):
+        """
+        Initialize the watcher, describing the stack to find the start of the operation in progress.
+
+        :param stack_name: name or id of the stack to watch
+        :param cfn_client: boto3 cloudformation client
+        :param on_event: function called with each new event, from the oldest to the newest
+        :param min_wait: seconds to wait between two polls while new events are being generated
+        :param max_wait: max seconds to wait between two polls while the stack is idle
+        :param raise_on_error: raise ClientError if the stack cannot be described, instead of exiting
+        """
+        self.cfn_client = cfn_client or get_boto3_client("cloudformation")
+        self.on_event = on_event
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.stack = get_stack(stack_name, self.cfn_client, raise_on_error=raise_on_error)
+        self.stack_id = self.stack.get("StackId")
+        # Events generated before the start of the operation in progress are ignored
+        self.__operation_start = max(
+            [self.stack.get(key) for key in ["CreationTime", "LastUpdatedTime", "DeletionTime"] if key in self.stack]
+        )
+        self.__stack_ids = [self.stack_id]
+        # Nested stacks whose own terminal event has been seen
+        self.__finished_stack_ids = set()
+        self.__seen_event_ids = set()
+        self.last_event = None
+        # Number of DescribeStackEvents calls, useful to measure the cost of the watch
+        self.requests = 0
+
+    def wait(self):
+        """
+        Wait for the stack to reach a terminal status, returning as soon as the event of that status is seen.
+
+        :return: the description of the stack at the end of the operation
+        """
+        stack_status = self.stack.get("StackStatus")
+        wait = self.min_wait
+        while not is_stack_status_terminal(stack_status):
+            events = self.poll()
+            for event in events:
+                self.last_event = event
+                if self.on_event:
+                    self.on_event(event)
+                if event.get("PhysicalResourceId") == self.stack_id and is_stack_status_terminal(
+                    event.get("ResourceStatus")
+                ):
+                    stack_status = event.get("ResourceStatus")
+            if is_stack_status_terminal(stack_status):
+                break
+
+            wait = self.min_wait if events else min(wait * 2, self.max_wait)
+            if wait == self.max_wait:
+                # Events should never be missed, but double check the status of an idle stack
+                stack_status = get_stack(self.stack_id, self.cfn_client, raise_on_error=True).get("StackStatus")
+                if is_stack_status_terminal(stack_status):
+                    break
+            time.sleep(wait)
+
+        # Stack ids can be described even after the stack has been deleted
+        self.stack = get_stack(self.stack_id, self.cfn_client, raise_on_error=True)
+        return self.stack
+
+    def poll(self):
+        """Return the events of the stack and of its nested stacks not seen yet, from the oldest to the newest."""
+        events = []
+        for stack_id in list(self.__stack_ids):
+            events.extend(self.__get_new_events(stack_id))
+        return sorted(events, key=lambda event: event.get("Timestamp"))
+
+    def __get_new_events(self, stack_id):
+        new_events = []
+        kwargs = {"StackName": stack_id}
+        while True:
+            self.requests += 1
+            response = retry_on_boto3_throttling(self.cfn_client.describe_stack_events, **kwargs)
+            for event in response.get("StackEvents"):
+                if event.get("EventId") in self.__seen_event_ids or event.get("Timestamp") < self.__operation_start:
+                    return new_events
+                self.__seen_event_ids.add(event.get("EventId"))
+                new_events.append(event)
+                self.__update_watched_stacks(stack_id, event)
+            kwargs["NextToken"] = response.get("NextToken")
+            if not kwargs["NextToken"]:
+                return new_events
+
+    def __update_watched_stacks(self, stack_id, event):
+        """Watch the nested stacks found in the events of the given stack, and stop watching the finished ones."""
+        if event.get("ResourceType") != STACK_TYPE:
+            return
+        physical_id = event.get("PhysicalResourceId")
+        terminal = is_stack_status_terminal(event.get("ResourceStatus"))
+        if physical_id == stack_id:
+            if stack_id != self.stack_id and terminal:
+                LOGGER.debug("Nested stack %s finished, no longer watching its events", stack_id)
+                self.__stack_ids.remove(stack_id)
+                self.__finished_stack_ids.add(stack_id)
+        elif physical_id not in self.__stack_ids + [None, ""] and not (
+            terminal and physical_id in self.__finished_stack_ids
+        ):
+            LOGGER.debug("Watching events of nested stack %s", physical_id)
+            self.__stack_ids.append(physical_id)
+            self.__finished_stack_ids.discard(physical_id)
+
+
+def wait_for_stack(stack_name, cfn_client=None, on_event=None, raise_on_error=False):
+    """
+    Wait for the operation in progress on the given stack to end, see StackEventsWatcher.
+
+    :return: the description of the stack at the end of the operation
+    """
+    return StackEventsWatcher(stack_name, cfn_client, on_event=on_event, raise_on_error=raise_on_error).wait()
+
+
 def get_cluster_substacks(cluster_name):
     """Return stack objects with names that match the given prefix."""
     resources = get_stack_resources(get_stack_name(cluster_name))
@@ -635,20 +1164,13 @@ def verify_stack_creation(stack_name, cfn_client):
     :param cfn_client: the CloudFormation client to use to verify stack status
     :return: True if the creation was successful, false otherwise.
     """
-    status = get_stack(stack_name, cfn_client).get("StackStatus")
-    resource_status = ""
-    while status == "CREATE_IN_PROGRESS":
-        status = get_stack(stack_name, cfn_client).get("StackStatus")
-        events = get_stack_events(stack_name, raise_on_error=True)[0]
-        resource_status = ("Status: %s - %s" % (events.get("LogicalResourceId"), events.get("ResourceStatus"))).ljust(
-            80
-        )
-        sys.stdout.write("\r%s" % resource_status)
-        sys.stdout.flush()
-        time.sleep(5)
+    watcher = StackEventsWatcher(stack_name, cfn_client, on_event=print_stack_event)
+    status = watcher.wait().get("StackStatus")
     # print the last status update in the logs
-    if resource_status != "":
-        LOGGER.debug(resource_status)
+    if watcher.last_event:
+        LOGGER.debug(
+            "Status: %s - %s", watcher.last_event.get("LogicalResourceId"), watcher.last_event.get("ResourceStatus")
+        )
     if status != "CREATE_COMPLETE":
         LOGGER.critical("\nCluster creation failed.  Failed events:")
         _log_stack_failure_recursive(stack_name)
@@ -730,14 +1252,27 @@ def get_cfn_param(params, key_name):
     """
     Get parameter value from Cloudformation Stack Parameters.
 
-    :param params: Cloudformation Stack Parameters
+    :param params: Cloudformation Stack Parameters, or the dict returned by get_cfn_params_dict for faster lookups
     :param key_name: Parameter Key
-    :return: ParameterValue if that parameter exists, otherwise None
+    :return: ParameterValue if that parameter exists, otherwise "NONE"
     """
-    param_value = next((i.get("ParameterValue") for i in params if i.get("ParameterKey") == key_name), "NONE")
+    if isinstance(params, dict):
+        param_value = params.get(key_name, "NONE")
+    else:
+        param_value = next((i.get("ParameterValue") for i in params if i.get("ParameterKey") == key_name), "NONE")
     return param_value.strip()
 
 
+def get_cfn_params_dict(params):
+    """
+    Index the Cloudformation Stack Parameters by key.
+
+    :param params: Cloudformation Stack Parameters
+    :return: dict ParameterKey -> ParameterValue
+    """
+    return {param.get("ParameterKey"): param.get("ParameterValue") for param in params or []}
+
+
 def get_efs_mount_target_id(efs_fs_id, avail_zone):
     """
     Search for a Mount Target Id in given availability zone for the given EFS file system id.
@@ -748,7 +1283,7 @@ def get_efs_mount_target_id(efs_fs_id, avail_zone):
     """
     mount_target_id = None
     if efs_fs_id:
-        mount_targets = boto3.client("efs").describe_mount_targets(FileSystemId=efs_fs_id)
+        mount_targets = get_boto3_client("efs").describe_mount_targets(FileSystemId=efs_fs_id)
 
         for mount_target in mount_targets.get("MountTargets"):
             # Check to see if there is an existing mt in the az of the stack
@@ -773,7 +1308,7 @@ def _describe_cluster_instances_iterator(
     instance_state=("pending", "running", "stopping", "stopped"),
 ):
     try:
-        ec2 = boto3.client("ec2")
+        ec2 = get_boto3_client("ec2")
         filters = [
             {"Name": "tag:Application", "Values": [stack_name]},
             {"Name": "instance-state-name", "Values": list(instance_state)},
@@ -801,6 +1336,63 @@ def describe_cluster_instances(stack_name, node_type):
     return instances
 
 
+def describe_fleet_instances(
+    stack_names=None, tag_filters=None, instance_state=("pending", "running", "stopping", "stopped")
+):
+    """
+    Describe the instances of many clusters at once, grouped by cluster and node type.
+
+    Instead of scanning the instances of each cluster and node type, the instances of all the selected clusters are
+    retrieved with a single paginated query, combining the tag filters, and then grouped in memory.
+    The node type is taken from the aws-parallelcluster-node-type tag, or from the Name tag for older clusters.
+
+    :param stack_names: stack names of the selected clusters, all the clusters if None
+    :param tag_filters: dict tag key -> list of values, to select the clusters by the tags of their instances
+    :param instance_state: states of the instances to describe
+    :return: OrderedDict stack name -> {NodeType: list of instances}; clusters are in the given order, or sorted by
+             name if all the clusters are selected
+    """
+    fleet = OrderedDict((stack_name, _new_fleet_entry()) for stack_name in stack_names or [])
+    # Stack names are matched with a wildcard when all the clusters are selected
+    remaining_stack_names = list(fleet.keys()) if stack_names is not None else [PCLUSTER_STACK_PREFIX + "*"]
+    common_filters = [{"Name": "instance-state-name", "Values": list(instance_state)}]
+    for tag_key, tag_values in (tag_filters or {}).items():
+        common_filters.append({"Name": "tag:{0}".format(tag_key), "Values": list(tag_values)})
+
+    try:
+        ec2 = get_boto3_client("ec2")
+        while remaining_stack_names:
+            chunk = remaining_stack_names[:MAX_EC2_FILTER_VALUES]
+            remaining_stack_names = remaining_stack_names[MAX_EC2_FILTER_VALUES:]
+            filters = [{"Name": "tag:Application", "Values": chunk}] + common_filters
+            for reservation in paginate_boto3(ec2.describe_instances, Filters=filters):
+                for instance in reservation.get("Instances", []):
+                    tags = {tag.get("Key"): tag.get("Value") for tag in instance.get("Tags", [])}
+                    node_type = _get_node_type(tags)
+                    if node_type:
+                        fleet.setdefault(tags.get("Application"), _new_fleet_entry())[node_type].append(instance)
+    except ClientError as e:
+        error(e.response.get("Error").get("Message"))
+
+    if stack_names is None:
+        fleet = OrderedDict(sorted(fleet.items()))
+    return fleet
+
+
+def _new_fleet_entry():
+    return OrderedDict([(NodeType.master, []), (NodeType.compute, [])])
+
+
+def _get_node_type(tags):
+    """Return the NodeType of an instance of a cluster given its tags, None if it is not a cluster node."""
+    for tag_key in ["aws-parallelcluster-node-type", "Name"]:
+        try:
+            return NodeType(tags.get(tag_key))
+        except ValueError:
+            pass
+    return None
+
+
 def _get_master_server_ip(stack_name):
     """
     Get the IP Address of the MasterServer.
@@ -823,7 +1415,7 @@ def _get_master_server_ip(stack_name):
 
 
 def get_master_ip_and_username(cluster_name):
-    cfn = boto3.client("cloudformation")
+    cfn = get_boto3_client("cloudformation")
     try:
         stack_name = get_stack_name(cluster_name)
 
@@ -866,7 +1458,7 @@ def get_master_server_state(stack_name):
 def get_info_for_amis(ami_ids):
     """Get information returned by EC2's describe-images API for the given list of AMIs."""
     try:
-        return boto3.client("ec2").describe_images(ImageIds=ami_ids).get("Images")
+        return get_boto3_client("ec2").describe_images(ImageIds=ami_ids).get("Images")
     except ClientError as e:
         error(e.response.get("Error").get("Message"))
 
@@ -884,11 +1476,56 @@ def validate_pcluster_version_based_on_ami_name(ami_name):
             )
 
 
+def get_instance_types_catalog():
+    """
+    Return a dict with the DescribeInstanceTypes info of all the instance types of the region, by instance type.
+
+    The catalog is retrieved once with a paginated DescribeInstanceTypes call, persisted in the on-disk cache
+    and memoized for the whole process. None is returned when the cache is disabled or the catalog
+    cannot be retrieved, in which case callers are expected to describe the instance types they need.
+    """
+    region = get_region()
+    if not region or not is_cache_enabled():
+        return None
+    if not hasattr(get_instance_types_catalog, "cache"):
+        get_instance_types_catalog.cache = {}
+    cache = get_instance_types_catalog.cache
+    if region not in cache:
+        file_cache = FileCache("instance-types", INSTANCE_TYPES_CATALOG_TTL)
+        catalog = file_cache.get(region)
+        if catalog is None:
+            try:
+                catalog = {
+                    instance_info.get("InstanceType"): instance_info
+                    for instance_info in paginate_boto3(get_boto3_client("ec2").describe_instance_types)
+                }
+                file_cache.put(region, catalog)
+            except ClientError as e:
+                LOGGER.debug(
+                    "Unable to retrieve the instance types catalog for region %s: %s",
+                    region,
+                    e.response.get("Error").get("Message"),
+                )
+        cache[region] = catalog
+    return cache[region]
+
+
 def get_instance_types_info(instance_types, fail_on_error=True):
     """Return InstanceTypes list returned by EC2's DescribeInstanceTypes API."""
     try:
-        ec2_client = boto3.client("ec2")
-        return ec2_client.describe_instance_types(InstanceTypes=instance_types).get("InstanceTypes")
+        catalog = get_instance_types_catalog() or {}
+        missing_instance_types = [instance_type for instance_type in instance_types if instance_type not in catalog]
+        if not missing_instance_types:
+            return [catalog.get(instance_type) for instance_type in instance_types]
+        ec2_client = get_boto3_client("ec2")
+        instance_types_info = ec2_client.describe_instance_types(InstanceTypes=missing_instance_types).get(
+            "InstanceTypes"
+        )
+        if len(missing_instance_types) < len(instance_types):
+            instance_types_info = [
+                catalog.get(instance_type) for instance_type in instance_types if instance_type in catalog
+            ] + instance_types_info
+        return instance_types_info
     except ClientError as e:
         error(
             "Error when calling DescribeInstanceTypes for instances {0}: {1}".format(
@@ -898,7 +1535,30 @@ def get_instance_types_info(instance_types, fail_on_error=True):
         )
 
 
-def get_supported_architectures_for_instance_type(instance_type):
+def describe_instance_types(instance_types):
+    """
+    Return a dict instance type -> DescribeInstanceTypes info of the given instance types.
+
+    Instance types missing from the catalog of the region are described with one request for every
+    MAX_DESCRIBE_INSTANCE_TYPES of them. ClientError is raised if any of them is not valid.
+    """
+    catalog = get_instance_types_catalog() or {}
+    instance_types_info = {
+        instance_type: catalog.get(instance_type) for instance_type in instance_types if instance_type in catalog
+    }
+    missing_instance_types = sorted(
+        set(instance_type for instance_type in instance_types if instance_type not in instance_types_info)
+    )
+    ec2_client = get_boto3_client("ec2")
+    while missing_instance_types:
+        chunk = missing_instance_types[:MAX_DESCRIBE_INSTANCE_TYPES]
+        missing_instance_types = missing_instance_types[MAX_DESCRIBE_INSTANCE_TYPES:]
+        for instance_info in ec2_client.describe_instance_types(InstanceTypes=chunk).get("InstanceTypes"):
+            instance_types_info[instance_info.get("InstanceType")] = instance_info
+    return instance_types_info
+
+
+def get_supported_architectures_for_instance_type(instance_type, instance_info=None):
     """Get a list of architectures supported for the given instance type."""
     # "optimal" compute instance type (when using batch) implies the use of instances from the
     # C, M, and R instance families, and thus an x86_64 architecture.
@@ -906,7 +1566,8 @@ def get_supported_architectures_for_instance_type(instance_type):
     if instance_type == "optimal":
         return ["x86_64"]
 
-    instance_info = get_instance_types_info([instance_type])[0]
+    if instance_info is None:
+        instance_info = get_instance_types_info([instance_type])[0]
     supported_architectures = instance_info.get("ProcessorInfo").get("SupportedArchitectures")
 
     # Some instance types support multiple architectures (x86_64 and i386). Filter unsupported ones.
@@ -925,9 +1586,10 @@ def retry(func, func_args, attempts=1, wait=0):
     :param func: the function to execute.
     :param func_args: the positional arguments of the function.
     :param attempts: the maximum number of attempts. Default: 1.
-    :param wait: delay between attempts. Default: 0.
+    :param wait: base delay between attempts, doubled at every attempt and randomized. Default: 0.
     :returns: the result of the function.
     """
+    attempt = 0
     while attempts:
         try:
             return func(*func_args)
@@ -936,8 +1598,10 @@ def retry(func, func_args, attempts=1, wait=0):
             if not attempts:
                 raise e
 
-            LOGGER.debug("{0}, retrying in {1} seconds..".format(e, wait))
-            time.sleep(wait)
+            delay = exponential_backoff(attempt, wait) if wait else 0
+            attempt += 1
+            LOGGER.debug("{0}, retrying in {1:.2f} seconds..".format(e, delay))
+            time.sleep(delay)
 
 
 def get_asg_name(stack_name):
@@ -956,7 +1620,7 @@ def get_asg_name(stack_name):
 
 
 def set_asg_limits(asg_name, min, max, desired):
-    asg = boto3.client("autoscaling")
+    asg = get_boto3_client("autoscaling")
     asg.update_auto_scaling_group(
         AutoScalingGroupName=asg_name, MinSize=int(min), MaxSize=int(max), DesiredCapacity=int(desired)
     )
@@ -975,7 +1639,7 @@ def get_batch_ce(stack_name):
 
 
 def get_batch_ce_capacity(stack_name):
-    client = boto3.client("batch")
+    client = get_boto3_client("batch")
 
     return (
         client.describe_compute_environments(computeEnvironments=[get_batch_ce(stack_name)])
@@ -986,20 +1650,24 @@ def get_batch_ce_capacity(stack_name):
 
 
 def retry_on_boto3_throttling(func, wait=5, *args, **kwargs):
+    """Call func until it is not throttled, waiting an exponential backoff with jitter based on wait seconds."""
+    attempt = 0
     while True:
         try:
             return func(*args, **kwargs)
         except ClientError as e:
-            if e.response["Error"]["Code"] != "Throttling":
+            if e.response["Error"]["Code"] not in THROTTLING_ERROR_CODES:
                 raise
-            LOGGER.debug("Throttling when calling %s function. Will retry in %d seconds.", func.__name__, wait)
-            time.sleep(wait)
+            delay = exponential_backoff(attempt, wait)
+            attempt += 1
+            LOGGER.debug("Throttling when calling %s function. Will retry in %.2f seconds.", func.__name__, delay)
+            time.sleep(delay)
 
 
 def get_asg_settings(stack_name):
     try:
         asg_name = get_asg_name(stack_name)
-        asg_client = boto3.client("autoscaling")
+        asg_client = get_boto3_client("autoscaling")
         return asg_client.describe_auto_scaling_groups(AutoScalingGroupNames=[asg_name]).get("AutoScalingGroups")[0]
     except Exception as e:
         LOGGER.error("Failed when retrieving data for ASG %s with exception %s", asg_name, e)
@@ -1035,7 +1703,10 @@ def cluster_has_running_capacity(stack_name):
 
 
 def get_instance_type(instance_type):
-    ec2_client = boto3.client("ec2")
+    catalog = get_instance_types_catalog()
+    if catalog and instance_type in catalog:
+        return catalog.get(instance_type)
+    ec2_client = get_boto3_client("ec2")
     try:
         return ec2_client.describe_instance_types(InstanceTypes=[instance_type]).get("InstanceTypes")[0]
     except Exception as e:
@@ -1086,21 +1757,81 @@ def is_hit_enabled_cluster(cfn_stack):
 
 
 def read_remote_file(url):
-    """Read a remote file from an HTTP or S3 url."""
+    """
+    Read a remote file from an HTTP or S3 url.
+
+    The file is cached on disk together with its ETag, so that it is downloaded again only if it has been modified.
+    """
+    cache = FileCache(REMOTE_FILES_CACHE_NAMESPACE, REMOTE_FILES_CACHE_TTL)
+    cache_key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    cached_entry = cache.get(cache_key) or {}
     try:
         if urlparse(url).scheme == "s3":
-            match = re.match(r"s3://(.*?)/(.*)", url)
-            bucket, key = match.group(1), match.group(2)
-            file_contents = boto3.resource("s3").Object(bucket, key).get()["Body"].read().decode("utf-8")
+            file_contents, etag = _read_s3_file(url, cached_entry.get("etag"))
         else:
-            with urllib.request.urlopen(url) as f:
-                file_contents = f.read().decode("utf-8")
+            file_contents, etag = _read_http_file(url, cached_entry.get("etag"))
+        if file_contents is None:
+            LOGGER.debug("Remote file %s not modified, using cached copy", url)
+            return cached_entry.get("contents")
+        if etag:
+            cache.put(cache_key, {"etag": etag, "contents": file_contents})
         return file_contents
     except Exception as e:
         LOGGER.error("Failed when reading remote file from url %s: %s", url, e)
         raise e
 
 
+def _read_s3_file(url, etag=None):
+    """Return the contents and the ETag of the file at the given s3 url, None as contents if the ETag matches."""
+    match = re.match(r"s3://(.*?)/(.*)", url)
+    request_params = {"Bucket": match.group(1), "Key": match.group(2)}
+    if etag:
+        request_params["IfNoneMatch"] = etag
+    try:
+        response = get_boto3_client("s3").get_object(**request_params)
+    except ClientError as e:
+        # GetObject fails with a 304 error when the object has not been modified
+        if etag and (
+            e.response.get("ResponseMetadata", {}).get("HTTPStatusCode") == 304
+            or e.response.get("Error", {}).get("Code") == "304"
+        ):
+            return None, etag
+        raise
+    return response["Body"].read().decode("utf-8"), response.get("ETag")
+
+
+def _read_http_file(url, etag=None):
+    """Return the contents and the ETag of the file at the given HTTP url, None as contents if the ETag matches."""
+    request = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request) as f:
+            return f.read().decode("utf-8"), f.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        if etag and e.code == 304:
+            return None, etag
+        raise
+
+
+def _get_compiled_template(template_str):
+    """
+    Return the Jinja template compiled from the given string.
+
+    Templates are compiled once per process, the cache is keyed by the hash of the template string.
+    """
+    if not hasattr(_get_compiled_template, "cache"):
+        environment = Environment(loader=BaseLoader)
+        environment.filters["sha1"] = lambda value: hashlib.sha1(value.strip().encode()).hexdigest()
+        _get_compiled_template.environment = environment
+        _get_compiled_template.cache = {}
+
+    template_hash = hashlib.sha256(template_str.encode("utf-8")).hexdigest()
+    template = _get_compiled_template.cache.get(template_hash)
+    if not template:
+        template = _get_compiled_template.environment.from_string(template_str)
+        _get_compiled_template.cache[template_hash] = template
+    return template
+
+
 def render_template(template_str, params_dict, config_version, tags):
     """
     Render a Jinjia template and return the rendered output.
@@ -1109,9 +1840,7 @@ def render_template(template_str, params_dict, config_version, tags):
     :param params_dict: Template parameters dict
     """
     try:
-        environment = Environment(loader=BaseLoader)
-        environment.filters["sha1"] = lambda value: hashlib.sha1(value.strip().encode()).hexdigest()
-        template = environment.from_string(template_str)
+        template = _get_compiled_template(template_str)
         output_from_parsed_template = template.render(config=params_dict, config_version=config_version, tags=tags)
         return output_from_parsed_template
     except Exception as e:
@@ -1150,7 +1879,7 @@ def get_ebs_snapshot_info(ebs_snapshot_id, raise_exceptions=False):
     }
     """
     try:
-        return boto3.client("ec2").describe_snapshots(SnapshotIds=[ebs_snapshot_id]).get("Snapshots")[0]
+        return describe_ec2_resource("snapshot", ebs_snapshot_id)
     except ClientError as e:
         if raise_exceptions:
             raise
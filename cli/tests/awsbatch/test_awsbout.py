@@ -0,0 +1,242 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from awsbatch import awsbout
+from tests.common import MockedBoto3Request, read_text
+
+LOG_GROUP_NAME = "/aws/batch/job"
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    # we need to set the region in the environment because the Boto3ClientFactory requires it.
+    os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
+    return "pcluster.utils.boto3"
+
+
+def _log_events(timestamps, message_prefix):
+    return [
+        {"timestamp": timestamp, "message": "{0} {1}".format(message_prefix, index), "ingestionTime": timestamp}
+        for index, timestamp in enumerate(timestamps)
+    ]
+
+
+@pytest.mark.usefixtures("awsbatchcliconfig_mock")
+@pytest.mark.usefixtures("convert_to_date_mock")
+class TestOutput(object):
+    def test_single_job(self, capsys, boto3_stubber, shared_datadir):
+        response = json.loads(read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_job.json"))
+        job_id = response["jobs"][0]["jobId"]
+        boto3_stubber(
+            "batch", MockedBoto3Request(method="describe_jobs", response=response, expected_params={"jobs": [job_id]})
+        )
+        boto3_stubber(
+            "logs",
+            MockedBoto3Request(
+                method="get_log_events",
+                response={"events": _log_events([1543396578000, 1543396579000], "line"), "nextForwardToken": "f/1"},
+                expected_params={
+                    "logGroupName": LOG_GROUP_NAME,
+                    "logStreamName": response["jobs"][0]["container"]["logStreamName"],
+                    "limit": 2,
+                    "startFromHead": True,
+                },
+            ),
+        )
+
+        awsbout.main(["-c", "cluster", "--head", "2", job_id])
+
+        assert capsys.readouterr().out == "2018-11-28T09:16:18+00:00: line 0\n2018-11-28T09:16:19+00:00: line 1\n"
+
+    def test_mnp_job_merged_output(self, capsys, boto3_stubber, shared_datadir):
+        response_parent = json.loads(
+            read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_mnp_job.json")
+        )
+        response_children = json.loads(
+            read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_mnp_job_children.json")
+        )
+        parent_id = response_parent["jobs"][0]["jobId"]
+        boto3_stubber(
+            "batch",
+            [
+                MockedBoto3Request(
+                    method="describe_jobs", response=response_parent, expected_params={"jobs": [parent_id]}
+                ),
+                MockedBoto3Request(
+                    method="describe_jobs",
+                    response=response_children,
+                    expected_params={"jobs": ["{0}#0".format(parent_id), "{0}#1".format(parent_id)]},
+                ),
+            ],
+        )
+        # children are described in reverse order, #1 then #0
+        children_events = [
+            _log_events([1543396578000, 1543396580000], "node1"),
+            _log_events([1543396578000, 1543396579000, 1543396581000], "node0"),
+        ]
+        mocked_requests = []
+        for child, events in zip(response_children["jobs"], children_events):
+            mocked_requests.append(
+                MockedBoto3Request(
+                    method="get_log_events",
+                    response={"events": events, "nextForwardToken": "f/1"},
+                    expected_params={
+                        "logGroupName": LOG_GROUP_NAME,
+                        "logStreamName": child["container"]["logStreamName"],
+                        "limit": 3,
+                        "startFromHead": False,
+                    },
+                )
+            )
+        boto3_stubber("logs", mocked_requests)
+
+        awsbout.main(["-c", "cluster", "--tail", "3", parent_id])
+
+        assert capsys.readouterr().out.splitlines() == [
+            "2018-11-28T09:16:18+00:00: [{0}#1] node1 0".format(parent_id),
+            "2018-11-28T09:16:18+00:00: [{0}#0] node0 0".format(parent_id),
+            "2018-11-28T09:16:19+00:00: [{0}#0] node0 1".format(parent_id),
+            "2018-11-28T09:16:20+00:00: [{0}#1] node1 1".format(parent_id),
+            "2018-11-28T09:16:21+00:00: [{0}#0] node0 2".format(parent_id),
+        ]
+
+    def test_adaptive_stream_period(self, capsys, boto3_stubber, shared_datadir, mocker):
+        response = json.loads(read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_job.json"))
+        job_id = response["jobs"][0]["jobId"]
+        log_stream = response["jobs"][0]["container"]["logStreamName"]
+        boto3_stubber(
+            "batch", MockedBoto3Request(method="describe_jobs", response=response, expected_params={"jobs": [job_id]})
+        )
+        mocked_requests = [
+            MockedBoto3Request(
+                method="get_log_events",
+                response={"events": _log_events([1543396578000], "line"), "nextForwardToken": "f/0"},
+                expected_params={
+                    "logGroupName": LOG_GROUP_NAME,
+                    "logStreamName": log_stream,
+                    "limit": 10000,
+                    "startFromHead": False,
+                },
+            )
+        ]
+        # events are produced at the first two polls, then the job is idle
+        for poll in range(5):
+            events = _log_events([1543396579000 + poll], "line") if poll < 2 else []
+            mocked_requests.append(
+                MockedBoto3Request(
+                    method="get_log_events",
+                    response={"events": events, "nextForwardToken": "f/{0}".format(poll + 1)},
+                    expected_params={
+                        "logGroupName": LOG_GROUP_NAME,
+                        "logStreamName": log_stream,
+                        "nextToken": "f/{0}".format(poll),
+                    },
+                )
+            )
+        boto3_stubber("logs", mocked_requests)
+        sleep_mock = mocker.patch("awsbatch.awsbout.time.sleep", side_effect=[None] * 5 + [KeyboardInterrupt()])
+
+        with pytest.raises(SystemExit):
+            awsbout.main(["-c", "cluster", "--stream", "--stream-period", "6", job_id])
+
+        assert [call[0][0] for call in sleep_mock.call_args_list] == [1, 1, 1, 2, 4, 6]
+        assert len(capsys.readouterr().out.splitlines()) == 3
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_export(self, compress, capsys, boto3_stubber, shared_datadir, tmpdir):
+        response = json.loads(read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_job.json"))
+        job_id = response["jobs"][0]["jobId"]
+        log_stream = response["jobs"][0]["container"]["logStreamName"]
+        boto3_stubber(
+            "batch",
+            [MockedBoto3Request(method="describe_jobs", response=response, expected_params={"jobs": [job_id]})] * 2,
+        )
+        first_page_request = MockedBoto3Request(
+            method="get_log_events",
+            response={"events": _log_events([1543396578000, 1543396579000], "line"), "nextForwardToken": "f/1"},
+            expected_params={
+                "logGroupName": LOG_GROUP_NAME,
+                "logStreamName": log_stream,
+                "limit": 10000,
+                "startFromHead": True,
+            },
+        )
+
+        def _next_page_request(next_token, events, next_forward_token):
+            return MockedBoto3Request(
+                method="get_log_events",
+                response={"events": events, "nextForwardToken": next_forward_token},
+                expected_params={"logGroupName": LOG_GROUP_NAME, "logStreamName": log_stream, "nextToken": next_token},
+            )
+
+        boto3_stubber(
+            "logs",
+            [
+                first_page_request,
+                _next_page_request("f/1", _log_events([1543396580000], "next"), "f/2"),
+                _next_page_request("f/2", [], "f/2"),
+                # the second export resumes from the last token
+                _next_page_request("f/2", _log_events([1543396581000], "new"), "f/3"),
+                _next_page_request("f/3", [], "f/3"),
+            ],
+        )
+        args = ["-c", "cluster", "--output-dir", str(tmpdir)] + (["--gzip"] if compress else [])
+        path = tmpdir.join("{0}.log{1}".format(job_id, ".gz" if compress else ""))
+
+        def _read_export():
+            with (gzip.open(str(path)) if compress else open(str(path), "rb")) as export_file:
+                return export_file.read().decode("utf-8")
+
+        awsbout.main(args + [job_id])
+        assert _read_export() == "line 0\nline 1\nnext 0\n"
+        # events written after the last checkpoint are discarded when the export is resumed
+        with open(str(path), "ab") as export_file:
+            export_file.write(b"partial")
+        awsbout.main(args + [job_id])
+        assert _read_export() == "line 0\nline 1\nnext 0\nnew 0\n"
+        assert capsys.readouterr().out.splitlines() == [
+            "Exported 3 events of job ({0}) to {1}".format(job_id, path),
+            "Exported 1 events of job ({0}) to {1}".format(job_id, path),
+        ]
+
+    @pytest.mark.parametrize("token", ['{"nextForwardToken": "f/', "[]", '{"size": 7}'])
+    def test_export_invalid_token(self, token, capsys, boto3_stubber, shared_datadir, tmpdir):
+        response = json.loads(read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_job.json"))
+        job_id = response["jobs"][0]["jobId"]
+        log_stream = response["jobs"][0]["container"]["logStreamName"]
+        boto3_stubber(
+            "batch", MockedBoto3Request(method="describe_jobs", response=response, expected_params={"jobs": [job_id]})
+        )
+        boto3_stubber(
+            "logs",
+            [
+                MockedBoto3Request(
+                    method="get_log_events",
+                    response={"events": _log_events([1543396578000], "line"), "nextForwardToken": "f/1"},
+                    expected_params={
+                        "logGroupName": LOG_GROUP_NAME,
+                        "logStreamName": log_stream,
+                        "limit": 10000,
+                        "startFromHead": True,
+                    },
+                ),
+                MockedBoto3Request(
+                    method="get_log_events",
+                    response={"events": [], "nextForwardToken": "f/1"},
+                    expected_params={"logGroupName": LOG_GROUP_NAME, "logStreamName": log_stream, "nextToken": "f/1"},
+                ),
+            ],
+        )
+        path = tmpdir.join("{0}.log".format(job_id))
+        path.write("previous export")
+        tmpdir.join("{0}.log.token".format(job_id)).write(token)
+
+        awsbout.main(["-c", "cluster", "--output-dir", str(tmpdir), job_id])
+
+        # the log stream is exported from the start, and its progress is saved again
+        assert path.read() == "line 0\n"
+        assert json.loads(tmpdir.join("{0}.log.token".format(job_id)).read()) == {"nextForwardToken": "f/1", "size": 7}
+        assert capsys.readouterr().out.splitlines() == ["Exported 1 events of job ({0}) to {1}".format(job_id, path)]
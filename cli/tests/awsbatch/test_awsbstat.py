@@ -20,7 +20,7 @@ class TestArgs(object):
 def boto3_stubber_path():
     # we need to set the region in the environment because the Boto3ClientFactory requires it.
     os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
-    return "awsbatch.common.boto3"
+    return "pcluster.utils.boto3"
 
 
 @pytest.mark.usefixtures("awsbatchcliconfig_mock")
@@ -87,6 +87,59 @@ class TestOutput(object):
 
         assert capsys.readouterr().out == read_text(test_datadir / "expected_output.txt")
 
+    @pytest.mark.parametrize("output_format", ["fixed", "csv", "ndjson"])
+    def test_streaming_output(self, output_format, capsys, boto3_stubber, test_datadir, shared_datadir):
+        response = json.loads(read_text(shared_datadir / "aws_api_responses/batch_list-jobs_SUCCEEDED.json"))
+        boto3_stubber(
+            "batch",
+            MockedBoto3Request(
+                method="list_jobs",
+                response=response,
+                expected_params={
+                    "jobQueue": DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG["job_queue"],
+                    "jobStatus": "SUCCEEDED",
+                    "nextToken": "",
+                },
+            ),
+        )
+
+        awsbstat.main(["-c", "cluster", "-s", "SUCCEEDED", "-o", output_format])
+
+        assert capsys.readouterr().out == read_text(test_datadir / "expected_output_{0}.txt".format(output_format))
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 10000])
+    def test_sorted_streaming_output(self, chunk_size, capsys, boto3_stubber, shared_datadir, mocker):
+        mocked_requests = []
+        for status in ALL_JOB_STATUS:
+            response = json.loads(
+                read_text(shared_datadir / "aws_api_responses/batch_list-jobs_{0}.json".format(status))
+            )
+            mocked_requests.append(
+                MockedBoto3Request(
+                    method="list_jobs",
+                    response=response,
+                    expected_params={
+                        "jobQueue": DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG["job_queue"],
+                        "jobStatus": status,
+                        "nextToken": "",
+                    },
+                )
+            )
+        # jobs are listed twice, for the table and for the sorted streaming output
+        boto3_stubber("batch", mocked_requests * 2)
+        external_sort = awsbstat.external_sort
+        mocker.patch(
+            "awsbatch.awsbstat.external_sort",
+            side_effect=lambda *args, **kwargs: external_sort(*args, chunk_size=chunk_size, **kwargs),
+        )
+
+        awsbstat.main(["-c", "cluster", "-s", "ALL"])
+        table_job_ids = [line.split("  ")[0] for line in capsys.readouterr().out.splitlines()[2:]]
+        awsbstat.main(["-c", "cluster", "-s", "ALL", "-o", "ndjson", "--sort"])
+        streamed_job_ids = [json.loads(line)["jobId"] for line in capsys.readouterr().out.splitlines()]
+
+        assert streamed_job_ids == table_job_ids
+
     def test_all_status(self, capsys, boto3_stubber, test_datadir, shared_datadir):
         mocked_requests = []
         for status in ALL_JOB_STATUS:
@@ -110,6 +163,48 @@ class TestOutput(object):
 
         assert capsys.readouterr().out == read_text(test_datadir / "expected_output.txt")
 
+    def test_concurrent_list_jobs(self, capsys, mocker, monkeypatch, test_datadir, shared_datadir):
+        monkeypatch.setenv("AWS_PCLUSTER_REQUEST_WORKERS", "4")
+        pages = {}
+        for status in ALL_JOB_STATUS:
+            jobs = json.loads(read_text(shared_datadir / "aws_api_responses/batch_list-jobs_{0}.json".format(status)))[
+                "jobSummaryList"
+            ]
+            # each job is returned in its own page
+            for index, job in enumerate(jobs):
+                next_token = "{0}-{1}".format(status, index + 1) if index + 1 < len(jobs) else None
+                pages[(status, "{0}-{1}".format(status, index) if index else "")] = dict(
+                    {"jobSummaryList": [job]}, **({"nextToken": next_token} if next_token else {})
+                )
+        batch_client = mocker.MagicMock()
+        batch_client.list_jobs.side_effect = lambda jobStatus, jobQueue, nextToken: pages[(jobStatus, nextToken)]
+        mocker.patch("awsbatch.awsbstat.Boto3ClientFactory.get_client", return_value=batch_client)
+
+        awsbstat.main(["-c", "cluster", "-s", "ALL"])
+
+        # the output is the same of the sequential listing
+        assert capsys.readouterr().out == read_text(test_datadir.parent / "test_all_status" / "expected_output.txt")
+        assert batch_client.list_jobs.call_count == len(pages)
+
+    def test_concurrent_list_jobs_early_stop(self, mocker, monkeypatch):
+        monkeypatch.setenv("AWS_PCLUSTER_REQUEST_WORKERS", "2")
+        batch_client = mocker.MagicMock()
+        # the pagination never ends, so the listing completes only if the status stop when the consumer does
+        batch_client.list_jobs.side_effect = lambda jobStatus, jobQueue, nextToken: {
+            "jobSummaryList": [{"jobId": jobStatus}],
+            "nextToken": "next",
+        }
+        boto3_factory = mocker.MagicMock()
+        boto3_factory.get_client.return_value = batch_client
+        command = awsbstat.AWSBstatCommand(mocker.MagicMock(), boto3_factory)
+
+        pages = command._AWSBstatCommand__list_jobs_pages("queue", ["RUNNING", "SUCCEEDED"])
+        next(pages)
+        pages.close()
+
+        # the status stop listing once the consumed page, the queued ones and the ones waiting for room are retrieved
+        assert batch_client.list_jobs.call_count <= 1 + 2 + 2
+
     def test_single_job_detailed(self, capsys, boto3_stubber, test_datadir, shared_datadir):
         response = json.loads(read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_job.json"))
         boto3_stubber(
@@ -162,6 +257,85 @@ class TestOutput(object):
 
         assert capsys.readouterr().out == read_text(test_datadir / expected)
 
+    def test_single_array_job_summary(self, capsys, boto3_stubber, test_datadir, shared_datadir):
+        response_parent = json.loads(
+            read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_array_job.json")
+        )
+        # children are not described, their status is read from the statusSummary of the parent
+        boto3_stubber(
+            "batch",
+            MockedBoto3Request(
+                method="describe_jobs",
+                response=response_parent,
+                expected_params={"jobs": ["3286a19c-68a9-47c9-8000-427d23ffc7ca"]},
+            ),
+        )
+
+        awsbstat.main(["-c", "cluster", "--summary", "3286a19c-68a9-47c9-8000-427d23ffc7ca"])
+
+        assert capsys.readouterr().out == read_text(test_datadir / "expected_output.txt")
+
+    def test_children_summary(self, capsys, boto3_stubber, test_datadir, shared_datadir):
+        list_jobs_response = json.loads(read_text(shared_datadir / "aws_api_responses/batch_list-jobs_SUCCEEDED.json"))
+        describe_jobs_response = json.loads(
+            read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_array_job.json")
+        )
+        # only the array jobs are described, to read the statusSummary of their children
+        boto3_stubber(
+            "batch",
+            [
+                MockedBoto3Request(
+                    method="list_jobs",
+                    response=list_jobs_response,
+                    expected_params={
+                        "jobQueue": DEFAULT_AWSBATCHCLICONFIG_MOCK_CONFIG["job_queue"],
+                        "jobStatus": "SUCCEEDED",
+                        "nextToken": "",
+                    },
+                ),
+                MockedBoto3Request(
+                    method="describe_jobs",
+                    response=describe_jobs_response,
+                    expected_params={"jobs": ["3286a19c-68a9-47c9-8000-427d23ffc7ca"]},
+                ),
+            ],
+        )
+
+        awsbstat.main(["-c", "cluster", "-s", "SUCCEEDED", "--summary"])
+
+        assert capsys.readouterr().out == read_text(test_datadir / "expected_output.txt")
+
+    def test_large_array_job(self, capsys, boto3_stubber, shared_datadir):
+        response_parent = json.loads(
+            read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_array_job.json")
+        )
+        parent_id = "3286a19c-68a9-47c9-8000-427d23ffc7ca"
+        response_parent["jobs"][0]["arrayProperties"]["size"] = 250
+        child = json.loads(
+            read_text(shared_datadir / "aws_api_responses/batch_describe-jobs_single_array_job_children.json")
+        )["jobs"][0]
+        children_ids = ["{0}:{1}".format(parent_id, index) for index in range(250)]
+        mocked_requests = [
+            MockedBoto3Request(method="describe_jobs", response=response_parent, expected_params={"jobs": [parent_id]})
+        ]
+        # children are described with chunks of 100 jobs
+        for chunk_ids in [children_ids[:100], children_ids[100:200], children_ids[200:]]:
+            mocked_requests.append(
+                MockedBoto3Request(
+                    method="describe_jobs",
+                    response={"jobs": [dict(child, jobId=child_id) for child_id in chunk_ids]},
+                    expected_params={"jobs": chunk_ids},
+                )
+            )
+        boto3_stubber("batch", mocked_requests)
+
+        awsbstat.main(["-c", "cluster", parent_id])
+
+        output_lines = capsys.readouterr().out.splitlines()
+        assert len(output_lines) == 2 + 1 + 250
+        assert output_lines[2].startswith("{0} [250]".format(parent_id))
+        assert sorted(line.split()[0] for line in output_lines[3:]) == sorted(children_ids)
+
     @pytest.mark.parametrize(
         "args, expected",
         [
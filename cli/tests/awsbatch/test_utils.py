@@ -0,0 +1,23 @@
+import json
+
+import pytest
+
+from awsbatch.utils import external_sort
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 100])
+def test_external_sort(chunk_size):
+    items = [{"name": "job{0}".format(index % 7), "index": index} for index in range(20)]
+
+    sorted_items = list(
+        external_sort(
+            iter(items),
+            key=lambda item: item["name"],
+            serialize=json.dumps,
+            deserialize=json.loads,
+            chunk_size=chunk_size,
+        )
+    )
+
+    # the sort is stable, items with the same key keep their order
+    assert sorted_items == sorted(items, key=lambda item: item["name"])
@@ -12,6 +12,44 @@ import pytest
 from botocore.stub import Stubber
 from jinja2 import Environment, FileSystemLoader
 
+from pcluster.rate_limiter import AdaptiveRateLimiter
+from pcluster.utils import Boto3ClientRegistry, describe_ec2_resources, get_account_id
+
+
+@pytest.fixture(autouse=True)
+def disable_cli_cache(monkeypatch):
+    """Prevent tests from reading or writing the CLI on-disk cache, so that all AWS calls hit the stubs."""
+    monkeypatch.setenv("AWS_PCLUSTER_DISABLE_CACHE", "true")
+
+
+@pytest.fixture(autouse=True)
+def sequential_validation(monkeypatch):
+    """Run configuration validators one at a time, so that stubbed AWS calls are received in a deterministic order."""
+    monkeypatch.setenv("AWS_PCLUSTER_VALIDATION_WORKERS", "1")
+
+
+@pytest.fixture(autouse=True)
+def sequential_requests(monkeypatch):
+    """Send concurrent AWS requests one at a time, so that stubbed AWS calls are received in a deterministic order."""
+    monkeypatch.setenv("AWS_PCLUSTER_REQUEST_WORKERS", "1")
+
+
+@pytest.fixture(autouse=True)
+def reset_boto3_clients():
+    """Discard the boto3 clients shared by the registry, so that clients never leak from one test to another."""
+    Boto3ClientRegistry.reset()
+    AdaptiveRateLimiter.reset()
+    yield
+    Boto3ClientRegistry.reset()
+    AdaptiveRateLimiter.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_ec2_resources_cache(monkeypatch):
+    """Forget the EC2 resources and the account described by previous tests."""
+    monkeypatch.setattr(describe_ec2_resources, "cache", {}, raising=False)
+    monkeypatch.setattr(get_account_id, "cache", {}, raising=False)
+
 
 @pytest.fixture
 def failed_with_message(capsys):
@@ -113,6 +151,7 @@ def boto3_stubber(mocker, boto3_stubber_path):
         # Add stubber to the collection of mocked clients. This allows to mock multiple clients.
         # Mocking twice the same client will replace the previous one.
         mocked_clients[service] = client
+        Boto3ClientRegistry.reset()
         return client
 
     # yield allows to return the value and then continue the execution when the test is over.
@@ -0,0 +1,122 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the rendering of the HIT substack template on synthetic configurations.
+
+The rendering is compared with the previous implementation, which compiled the template at each rendering.
+Run it from the cli folder with:
+
+    python -m tests.pcluster.benchmark_render_template [--queues 1 5 10] [--compute-resources 3] [--runs 5]
+"""
+from __future__ import print_function
+
+import argparse
+import hashlib
+import os
+import timeit
+
+from jinja2 import BaseLoader, Environment
+
+from pcluster.utils import render_template
+
+HIT_TEMPLATE_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "cloudformation", "compute-fleet-hit-substack.cfn.yaml"
+)
+TAGS = [{"Key": "TagKey", "Value": "TagValue"}]
+
+
+def _create_config(queues_count, compute_resources_count):
+    """Create a HIT configuration with the given number of queues, each with the given number of compute resources."""
+    queue_settings = {}
+    for queue_index in range(queues_count):
+        queue_name = "queue{0}".format(queue_index)
+        compute_resource_settings = {}
+        for compute_resource_index in range(compute_resources_count):
+            instance_type = "c5.{0}xlarge".format(compute_resource_index + 1)
+            compute_resource_settings["{0}_{1}".format(queue_name, instance_type)] = {
+                "instance_type": instance_type,
+                "min_count": 0,
+                "max_count": 10,
+                "spot_price": None,
+                "vcpus": 4,
+                "gpus": 0,
+                "enable_efa": False,
+                "disable_hyperthreading": False,
+                "disable_hyperthreading_via_cpu_options": False,
+            }
+        queue_settings[queue_name] = {
+            "compute_type": "ondemand",
+            "enable_efa": False,
+            "disable_hyperthreading": False,
+            "placement_group": None,
+            "compute_resource_settings": compute_resource_settings,
+        }
+    return {
+        "cluster": {
+            "label": "default",
+            "default_queue": "queue0",
+            "queue_settings": queue_settings,
+            "scaling": {"scaledown_idletime": 10},
+            "disable_cluster_dns": False,
+        }
+    }
+
+
+def _uncached_render_template(template_str, params_dict, config_version, tags):
+    """Render the template as the previous implementation, compiling it at each rendering."""
+    environment = Environment(loader=BaseLoader)
+    environment.filters["sha1"] = lambda value: hashlib.sha1(value.strip().encode()).hexdigest()
+    template = environment.from_string(template_str)
+    return template.render(config=params_dict, config_version=config_version, tags=tags)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the rendering of the HIT substack template.")
+    parser.add_argument("--queues", type=int, nargs="+", default=[1, 5, 10], help="Queues of the configs")
+    parser.add_argument("--compute-resources", type=int, default=3, help="Compute resources of each queue")
+    parser.add_argument("--runs", type=int, default=5, help="Renderings for each measurement")
+    parser.add_argument("--template", default=HIT_TEMPLATE_PATH, help="Path of the HIT substack template")
+    args = parser.parse_args()
+
+    with open(args.template) as template_file:
+        template_str = template_file.read()
+
+    print(
+        "{0:>10} {1:>10} {2:>14} {3:>14} {4:>8}".format("queues", "resources", "compile (ms)", "cached (ms)", "ratio")
+    )
+    for queues_count in args.queues:
+        config = _create_config(queues_count, args.compute_resources)
+
+        expected_template = _uncached_render_template(template_str, config, "version", TAGS)
+        rendered_template = render_template(template_str, config, "version", TAGS)
+        assert rendered_template == expected_template, "The templates rendered by the two implementations are different"
+
+        uncached_time = min(
+            timeit.repeat(
+                lambda: _uncached_render_template(template_str, config, "version", TAGS), number=args.runs, repeat=3
+            )
+        )
+        cached_time = min(
+            timeit.repeat(lambda: render_template(template_str, config, "version", TAGS), number=args.runs, repeat=3)
+        )
+        print(
+            "{0:>10} {1:>10} {2:>14.2f} {3:>14.2f} {4:>7.1f}x".format(
+                queues_count,
+                queues_count * args.compute_resources,
+                uncached_time * 1000 / args.runs,
+                cached_time * 1000 / args.runs,
+                uncached_time / cached_time,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
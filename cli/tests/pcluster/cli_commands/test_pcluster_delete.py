@@ -1,5 +1,6 @@
 """This module provides unit tests for the functions in the pcluster.delete module."""
 
+import logging
 from collections import namedtuple
 
 import pytest
@@ -11,8 +12,10 @@ from pcluster.cli_commands.delete import (
     _get_unretained_cw_log_group_resource_keys,
     _persist_cloudwatch_log_groups,
     _persist_stack_resources,
+    _terminate_cluster_nodes,
     delete,
 )
+from tests.common import MockedBoto3Request
 
 FakePdeleteArgs = namedtuple("FakePdeleteArgs", "cluster_name config_file nowait keep_logs region")
 FAKE_CLUSTER_NAME = "cluster_name"
@@ -20,6 +23,11 @@ FAKE_STACK_NAME = utils.get_stack_name(FAKE_CLUSTER_NAME)
 LOG_GROUP_TYPE = "AWS::Logs::LogGroup"
 
 
+@pytest.fixture()
+def boto3_stubber_path():
+    return "pcluster.utils.boto3"
+
+
 def get_fake_pdelete_args(cluster_name="cluster_name", config_file=None, nowait=False, keep_logs=False, region=None):
     """Get a FakePdeleteArgs instance, with None used for any parameters not specified."""
     return FakePdeleteArgs(
@@ -181,3 +189,48 @@ def test_get_unretained_cw_log_group_resource_keys(template, expected_return):
     """Verify that commands._get_unretained_cw_log_group_resource_keys behaves as expected."""
     observed_return = _get_unretained_cw_log_group_resource_keys(template)
     assert_that(observed_return).is_equal_to(expected_return)
+
+
+@pytest.mark.parametrize("instances_count, failing_batch", [(0, None), (150, None), (250, 1)])
+def test_terminate_cluster_nodes(boto3_stubber, caplog, instances_count, failing_batch):
+    """Verify that the compute nodes are described at once and terminated with batches of 100 instances."""
+    instance_ids = ["i-{0:017d}".format(index) for index in range(instances_count)]
+    batches = [instance_ids[start:][:100] for start in range(0, instances_count, 100)]
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_instances",
+            expected_params={
+                "Filters": [
+                    {"Name": "tag:Application", "Values": [FAKE_STACK_NAME]},
+                    {"Name": "instance-state-name", "Values": ["pending", "running", "stopping", "stopped"]},
+                    {"Name": "tag:aws-parallelcluster-node-type", "Values": ["Compute"]},
+                ],
+                "MaxResults": 1000,
+            },
+            response={"Reservations": [{"Instances": [{"InstanceId": instance_id} for instance_id in instance_ids]}]},
+        )
+    ]
+    for index, batch in enumerate(batches):
+        mocked_requests.append(
+            MockedBoto3Request(
+                method="terminate_instances",
+                expected_params={"InstanceIds": batch},
+                response={"TerminatingInstances": []},
+                generate_error=index == failing_batch,
+            )
+        )
+    boto3_stubber("ec2", mocked_requests)
+    caplog.set_level(logging.INFO)
+
+    _terminate_cluster_nodes(FAKE_STACK_NAME)
+
+    if instances_count:
+        assert_that(caplog.text).contains("Terminating {0} instances".format(instances_count))
+        terminated_count = instances_count - (len(batches[failing_batch]) if failing_batch is not None else 0)
+        assert_that(caplog.text).contains("Terminating instances: {0}/{1}".format(terminated_count, instances_count))
+    else:
+        assert_that(caplog.text).does_not_contain("Terminating")
+    if failing_batch is not None:
+        assert_that(caplog.text).contains("Failed when terminating instances")
+    else:
+        assert_that(caplog.text).does_not_contain("Failed")
@@ -0,0 +1,156 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the cluster section loading from CloudFormation parameters.
+
+The loading through the section schemas, from the stack parameters indexed by key, is compared with the previous
+implementation, which iterated the params of the section definitions, scanning all the mappings for each EBS section,
+and scanned the list of the stack parameters for every lookup. Run it from the cli folder with:
+
+    python -m tests.pcluster.config.benchmark_config_load [--ebs 0 1 5] [--extra-params 0 200] [--runs 20]
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import timeit
+from contextlib import contextmanager
+
+from pcluster.config import cfn_param_types
+from pcluster.config.cfn_param_types import CfnParam, CfnSection, ClusterCfnSection, EBSSettingsCfnParam
+from pcluster.config.mappings import CLUSTER_SIT
+from pcluster.config.param_types import StorageData
+from pcluster.config.pcluster_config import PclusterConfig
+from pcluster.config.schema import SectionSchema
+from pcluster.utils import get_cfn_param, get_cfn_params_dict
+from tests.pcluster.config.defaults import DefaultCfnParams
+from tests.pcluster.config.utils import dict_to_cfn_params
+
+
+def _create_stack_params(ebs_count, extra_params_count):
+    """Create the Parameters of a SIT cluster stack with the given number of ebs volumes and of unrelated params."""
+    cfn_params = dict(DefaultCfnParams["cluster_sit"].value)
+    if ebs_count:
+        cfn_params["NumberOfEBSVol"] = str(ebs_count)
+        cfn_params["SharedDir"] = ",".join(
+            ["/ebs{0}".format(index) if index < ebs_count else "NONE" for index in range(5)]
+        )
+        cfn_params["VolumeSize"] = ",".join(["20" if index < ebs_count else "NONE" for index in range(5)])
+    for index in range(extra_params_count):
+        cfn_params["ExtraParam{0}".format(index)] = "NONE"
+    return dict_to_cfn_params(cfn_params)
+
+
+def _previous_section_schema(section_definition):
+    """Return a schema iterating the params of the definition, as CfnSection.from_storage did before the schemas."""
+    return SectionSchema(section_definition.get("params").items(), None, None, None)
+
+
+def _previous_ebs_from_storage(self, storage_params):
+    """Load the EBS sections scanning all the mappings for each section, as EBSSettingsCfnParam did before."""
+    labels = []
+    if storage_params.cfn_params:
+        cfn_params = storage_params.cfn_params
+        num_of_ebs = int(get_cfn_param(cfn_params, "NumberOfEBSVol"))
+        if num_of_ebs >= 1 and "," in get_cfn_param(cfn_params, "SharedDir"):
+            labels = self.get_metadata_labels(expected_num_labels=num_of_ebs, include_none_values=False)
+            for index in range(len(labels)):
+                referred_section_type = self.referred_section_definition.get("type", CfnSection)
+                referred_section = referred_section_type(
+                    self.referred_section_definition, self.pcluster_config, labels[index]
+                )
+                for param_key, param_definition in self.referred_section_definition.get("params").items():
+                    cfn_converter = param_definition.get("cfn_param_mapping", None)
+                    if cfn_converter:
+                        param_type = param_definition.get("type", CfnParam)
+                        cfn_value = get_cfn_param(cfn_params, cfn_converter).split(",")[index]
+                        param = param_type(
+                            self.section_key, self.section_label, param_key, param_definition, self.pcluster_config
+                        ).from_cfn_value(cfn_value)
+                        referred_section.add_param(param)
+                self.pcluster_config.add_section(referred_section)
+    self.value = ",".join(labels) if labels else None
+    return self
+
+
+@contextmanager
+def _previous_implementation():
+    """Replace the schema based loading with the previous iteration of the section definitions."""
+    get_section_schema, ebs_from_storage = cfn_param_types.get_section_schema, EBSSettingsCfnParam.from_storage
+    cfn_param_types.get_section_schema, EBSSettingsCfnParam.from_storage = (
+        _previous_section_schema,
+        _previous_ebs_from_storage,
+    )
+    try:
+        yield
+    finally:
+        cfn_param_types.get_section_schema, EBSSettingsCfnParam.from_storage = get_section_schema, ebs_from_storage
+
+
+def _time_loading(pcluster_config, get_cfn_params, runs):
+    """Return the min time of runs loadings of the cluster section from the CFN params returned by get_cfn_params."""
+    return min(timeit.repeat(lambda: _load_cluster_section(pcluster_config, get_cfn_params()), number=runs, repeat=5))
+
+
+def _load_cluster_section(pcluster_config, cfn_params):
+    section = ClusterCfnSection(section_definition=CLUSTER_SIT, pcluster_config=pcluster_config)
+    pcluster_config.add_section(section)
+    return section.from_storage(StorageData(cfn_params, None, []))
+
+
+def _get_param_values(section):
+    return {param_key: param.value for param_key, param in section.params.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the cluster section loading from CFN params.")
+    parser.add_argument("--ebs", type=int, nargs="+", default=[0, 1, 5], help="EBS volumes of the cluster")
+    parser.add_argument("--extra-params", type=int, nargs="+", default=[0, 200], help="Unrelated stack params")
+    parser.add_argument("--runs", type=int, default=20, help="Sections loaded for each measurement")
+    args = parser.parse_args()
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    # The availability zones are retrieved from the subnets, avoid calling EC2
+    cfn_param_types.get_availability_zone_of_subnet = lambda subnet_id: "us-east-1a"
+    pcluster_config = PclusterConfig(config_file="/non/existing/file", auto_refresh=False)
+
+    print(
+        "{0:>6} {1:>8} {2:>14} {3:>12} {4:>12} {5:>8}".format(
+            "ebs", "params", "previous (ms)", "list (ms)", "dict (ms)", "ratio"
+        )
+    )
+    for ebs_count in args.ebs:
+        for extra_params_count in args.extra_params:
+            stack_params = _create_stack_params(ebs_count, extra_params_count)
+
+            with _previous_implementation():
+                expected_values = _get_param_values(_load_cluster_section(pcluster_config, stack_params))
+                previous_time = _time_loading(pcluster_config, lambda: stack_params, args.runs)
+            values = _get_param_values(_load_cluster_section(pcluster_config, get_cfn_params_dict(stack_params)))
+            assert values == expected_values, "The sections loaded by the two implementations are different"
+
+            # The schemas alone, and the schemas with the stack params indexed by key as done by PclusterConfig
+            list_time = _time_loading(pcluster_config, lambda: stack_params, args.runs)
+            dict_time = _time_loading(pcluster_config, lambda: get_cfn_params_dict(stack_params), args.runs)
+            print(
+                "{0:>6} {1:>8} {2:>14.2f} {3:>12.2f} {4:>12.2f} {5:>7.2f}x".format(
+                    ebs_count,
+                    len(stack_params),
+                    previous_time * 1000 / args.runs,
+                    list_time * 1000 / args.runs,
+                    dict_time * 1000 / args.runs,
+                    previous_time / dict_time,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Benchmark of the ConfigPatch creation on synthetic configurations.
+
+The creation of the patch is compared with the previous implementation, which deep copied both the configurations
+before comparing them. Run it from the cli folder with:
+
+    python -m tests.pcluster.config.benchmark_config_patch [--sections 5 50 500] [--runs 5]
+"""
+from __future__ import print_function
+
+import argparse
+import copy
+import os
+import re
+import sys
+import timeit
+
+from pcluster.config.config_patch import ConfigPatch
+from pcluster.config.mappings import EBS
+from pcluster.config.pcluster_config import PclusterConfig
+
+if sys.version_info <= (3, 7):
+    # Patch for deepcopy bug - Issue10076 in Python < 3.7, needed by the previous implementation
+    copy._deepcopy_dispatch[type(re.compile(""))] = lambda r, _: r
+
+
+def _create_config(sections_count, changed=False):
+    """Create a configuration with the given number of ebs sections, if changed the size of one volume every 10."""
+    config = PclusterConfig(config_file="/non/existing/file", auto_refresh=False)
+    for index in range(sections_count):
+        section = EBS.get("type")(section_definition=EBS, pcluster_config=config, section_label="ebs{0}".format(index))
+        section.get_param("shared_dir").value = "/shared{0}".format(index)
+        section.get_param("volume_size").value = 30 if changed and index % 10 == 0 else 20
+        config.add_section(section)
+    return config
+
+
+def _deepcopy_patch(base_config, target_config):
+    """Create the patch as the previous implementation, on deep copies of the configurations."""
+    base_config = copy.deepcopy(base_config)
+    target_config = copy.deepcopy(target_config)
+    base_config.auto_refresh = False
+    target_config.auto_refresh = False
+    return ConfigPatch(base_config, target_config)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ConfigPatch creation.")
+    parser.add_argument("--sections", type=int, nargs="+", default=[5, 50, 500], help="Sections of the configs")
+    parser.add_argument("--runs", type=int, default=5, help="Patches created for each measurement")
+    args = parser.parse_args()
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+    print(
+        "{0:>10} {1:>10} {2:>14} {3:>14} {4:>8}".format(
+            "sections", "changes", "deepcopy (ms)", "snapshot (ms)", "ratio"
+        )
+    )
+    for sections_count in args.sections:
+        base_config = _create_config(sections_count)
+        target_config = _create_config(sections_count, changed=True)
+
+        expected_changes = _deepcopy_patch(base_config, target_config).changes
+        changes = ConfigPatch(base_config, target_config).changes
+        assert changes == expected_changes, "The patches created by the two implementations are different"
+
+        deepcopy_time = min(
+            timeit.repeat(lambda: _deepcopy_patch(base_config, target_config), number=args.runs, repeat=3)
+        )
+        snapshot_time = min(timeit.repeat(lambda: ConfigPatch(base_config, target_config), number=args.runs, repeat=3))
+        print(
+            "{0:>10} {1:>10} {2:>14.2f} {3:>14.2f} {4:>7.1f}x".format(
+                sections_count,
+                len(changes),
+                deepcopy_time * 1000 / args.runs,
+                snapshot_time * 1000 / args.runs,
+                deepcopy_time / snapshot_time,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
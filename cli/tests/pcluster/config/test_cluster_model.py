@@ -9,8 +9,10 @@
 # OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
 # limitations under the License.
 import configparser
+
 import pytest
 from assertpy import assert_that
+from botocore.exceptions import ClientError
 
 from pcluster.cluster_model import ClusterModel, infer_cluster_model
 
@@ -67,3 +69,67 @@ def test_cluster_model(config_parser_cluster_dict, cfn_stack, expected_cluster_m
 
     cluster_model = infer_cluster_model(config_parser, "default", cfn_stack)
     assert_that(cluster_model).is_equal_to(expected_cluster_model)
+
+
+class _FakeSection(object):
+    def __init__(self, **params):
+        self.params = params
+
+    def get_param_value(self, param_key):
+        return self.params.get(param_key)
+
+
+class _FakePclusterConfig(object):
+    def __init__(self, sections):
+        self.sections = sections
+        self.errors = []
+
+    def get_section(self, section_key, section_label=None):
+        sections = self.sections.get(section_key, {})
+        return sections.get(section_label) if section_label else next(iter(sections.values()), None)
+
+    def get_sections(self, section_key):
+        return self.sections.get(section_key, {})
+
+    def error(self, message):
+        self.errors.append(message)
+
+
+def test_hit_test_configuration_dry_runs_all_compute_resources(mocker):
+    mocker.patch("pcluster.models.hit.hit_cluster_model.get_instance_type", return_value={"VCpuInfo": {}})
+    mocker.patch("pcluster.models.hit.hit_cluster_model.get_default_threads_per_core", return_value=2)
+    mocker.patch("pcluster.cluster_model.ClusterModel._get_latest_alinux_ami_id", return_value="ami-12345678")
+
+    def _run_instances(**kwargs):
+        error_code = "InsufficientInstanceCapacity" if kwargs["InstanceType"] == "c5n.18xlarge" else "DryRunOperation"
+        raise ClientError({"Error": {"Code": error_code, "Message": kwargs["InstanceType"]}}, "RunInstances")
+
+    run_instances_mock = mocker.patch("pcluster.cluster_model.get_boto3_client").return_value.run_instances
+    run_instances_mock.side_effect = _run_instances
+
+    compute_resources = {
+        "cr1": _FakeSection(instance_type="c5.xlarge", vcpus=4),
+        "cr2": _FakeSection(instance_type="c5n.18xlarge", vcpus=36),
+        "cr3": _FakeSection(instance_type="c5.xlarge", vcpus=4),
+    }
+    pcluster_config = _FakePclusterConfig(
+        {
+            "cluster": {"default": _FakeSection(scheduler="slurm", master_instance_type="t2.micro")},
+            "vpc": {"default": _FakeSection(master_subnet_id="subnet-12345678")},
+            "queue": {
+                "queue1": _FakeSection(compute_resource_settings="cr1,cr2"),
+                "queue2": _FakeSection(compute_resource_settings="cr3", placement_group="DYNAMIC"),
+            },
+            "compute_resource": compute_resources,
+        }
+    )
+
+    ClusterModel.HIT.test_configuration(pcluster_config)
+
+    # The second compute resource of queue1 is tested as well, while cr3 is the same instance configuration as cr1
+    tested_instance_types = sorted(call[1]["InstanceType"] for call in run_instances_mock.call_args_list)
+    assert_that(tested_instance_types).is_equal_to(["c5.xlarge", "c5n.18xlarge", "t2.micro"])
+    assert_that(all(call[1]["DryRun"] for call in run_instances_mock.call_args_list)).is_true()
+    assert_that(pcluster_config.errors).is_equal_to(
+        ["There is not enough capacity to fulfill your request.\nc5n.18xlarge"]
+    )
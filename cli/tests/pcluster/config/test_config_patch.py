@@ -281,3 +281,39 @@ def test_adaptation(mocker, test_datadir, pcluster_config_reader, test):
     target_conf = PclusterConfig(config_file=target_config_file, fail_on_file_absence=True)
 
     test(base_conf, target_conf)
+
+
+def test_patch_does_not_modify_configs(mocker, test_datadir, pcluster_config_reader):
+    _do_mocking_for_tests(mocker)
+    base_config_file_name = "pcluster.config.base.ini"
+    duplicate_config_file(base_config_file_name, test_datadir)
+    target_config_file_name = "pcluster.config.dst.ini"
+    duplicate_config_file(target_config_file_name, test_datadir)
+
+    base_conf = PclusterConfig(
+        config_file=pcluster_config_reader(base_config_file_name, **default_cluster_params), fail_on_file_absence=True
+    )
+    target_conf = PclusterConfig(
+        config_file=pcluster_config_reader(target_config_file_name, **default_cluster_params), fail_on_file_absence=True
+    )
+    target_conf.remove_section("ebs", "ebs-1")
+
+    def _get_sections(config):
+        return {
+            section_key: list(config.get_sections(section_key).keys())
+            for section_key in config.get_section_keys(include_global_sections=True)
+        }
+
+    base_sections = _get_sections(base_conf)
+    target_sections = _get_sections(target_conf)
+
+    patch = ConfigPatch(base_config=base_conf, target_config=target_conf)
+    assert_that(patch.changes).is_not_empty()
+
+    # The patch must neither copy nor change the provided configurations
+    assert_that(patch.base_config).is_same_as(base_conf)
+    assert_that(patch.target_config).is_same_as(target_conf)
+    assert_that(_get_sections(base_conf)).is_equal_to(base_sections).contains_key("aws", "global", "aliases")
+    assert_that(_get_sections(target_conf)).is_equal_to(target_sections)
+    assert_that(base_conf.auto_refresh).is_true()
+    assert_that(target_conf.auto_refresh).is_true()
@@ -75,6 +75,18 @@ DESCRIBE_INSTANCE_TYPES_RESPONSES = {
     },
     # Disable hyperthreading: not supported
     # EFA: not supported
+    "t2.micro": {
+        "InstanceTypes": [
+            {
+                "InstanceType": "t2.micro",
+                "VCpuInfo": {"DefaultVCpus": 1, "DefaultCores": 1, "DefaultThreadsPerCore": 1},
+                "NetworkInfo": {"EfaSupported": False},
+                "ProcessorInfo": {"SupportedArchitectures": ["x86_64"]},
+            }
+        ]
+    },
+    # Disable hyperthreading: not supported
+    # EFA: not supported
     "m6g.xlarge": {
         "InstanceTypes": [
             {
@@ -212,15 +224,24 @@ def _prepare_json_config(queues, test_datadir):
 def _mock_boto3(boto3_stubber, expected_json_params):
     """Mock the boto3 client based on the expected json configuration."""
     expected_json_queue_settings = expected_json_params["cluster"].get("queue_settings", {})
-    mocked_requests = []
+    instance_types = set()
     for _, queue in expected_json_queue_settings.items():
         for _, compute_resource in queue.get("compute_resource_settings", {}).items():
-            instance_type = compute_resource["instance_type"]
-            mocked_requests.append(
-                MockedBoto3Request(
-                    method="describe_instance_types",
-                    response=DESCRIBE_INSTANCE_TYPES_RESPONSES[instance_type],
-                    expected_params={"InstanceTypes": [instance_type]},
-                )
+            instance_types.add(compute_resource["instance_type"])
+    mocked_requests = []
+    if instance_types:
+        # All the instance types of the configuration, including the default master one, are described at once
+        instance_types = sorted(instance_types | {"t2.micro"})
+        mocked_requests.append(
+            MockedBoto3Request(
+                method="describe_instance_types",
+                response={
+                    "InstanceTypes": [
+                        DESCRIBE_INSTANCE_TYPES_RESPONSES[instance_type]["InstanceTypes"][0]
+                        for instance_type in instance_types
+                    ]
+                },
+                expected_params={"InstanceTypes": instance_types},
             )
+        )
     boto3_stubber("ec2", mocked_requests)
@@ -14,7 +14,7 @@ from assertpy import assert_that
 
 import tests.pcluster.config.utils as utils
 from pcluster.config.cfn_param_types import CfnParam, CfnSection, VolumeSizeParam
-from pcluster.config.mappings import EBS
+from pcluster.config.mappings import CLUSTER_HIT, CLUSTER_SIT, EBS, QUEUE
 from pcluster.config.param_types import Param
 
 
@@ -61,7 +61,11 @@ def test_volume_size_refresh(mocker, section_dict, expected_value):
     mocked_pcluster_config = utils.get_mocked_pcluster_config(mocker)
     ebs_section = CfnSection(EBS, mocked_pcluster_config, "default")
     for param_key, param_value in section_dict.items():
-        param = EBS.get("params").get(param_key).get("type", CfnParam)
+        param_definition = EBS.get("params").get(param_key)
+        param_type = param_definition.get("type", CfnParam)
+        param = param_type(
+            "ebs", "default", param_key, param_definition, mocked_pcluster_config, owner_section=ebs_section
+        )
         param.value = param_value
         ebs_section.set_param(param_key, param)
     mocked_pcluster_config.add_section(ebs_section)
@@ -94,3 +98,45 @@ def test_volume_size_refresh(mocker, section_dict, expected_value):
 
     volume_size.refresh()
     assert_that(volume_size.value).is_equal_to(expected_value)
+
+
+def _get_subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        for nested_subclass in _get_subclasses(subclass):
+            yield nested_subclass
+
+
+def test_lazy_param_types():
+    # Lazy params hold the default value of the definition until created, so their type cannot compute it
+    for param_type in _get_subclasses(Param):
+        if param_type.lazy:
+            for method in ["_from_definition", "get_default_value", "refresh"]:
+                assert_that(getattr(param_type, method)).described_as(
+                    "{0}.{1}".format(param_type.__name__, method)
+                ).is_equal_to(getattr(Param, method))
+
+
+@pytest.mark.parametrize("section_definition", [CLUSTER_SIT, CLUSTER_HIT, EBS, QUEUE])
+def test_section_params_created_lazily(mocker, section_definition):
+    mocked_pcluster_config = utils.get_mocked_pcluster_config(mocker)
+    section_type = section_definition.get("type")
+    section = section_type(section_definition, mocked_pcluster_config, "default")
+    params_definitions = section_definition.get("params")
+    lazy_param_keys = [key for key, definition in params_definitions.items() if section._is_lazy(definition)]
+    assert_that(lazy_param_keys).is_not_empty()
+
+    # Lazy params are answered from the definition until accessed
+    assert_that(section._params).does_not_contain_key(*lazy_param_keys)
+    for param_key in lazy_param_keys:
+        assert_that(section.get_param_value(param_key)).is_equal_to(params_definitions[param_key].get("default"))
+    assert_that(section._params).does_not_contain_key(*lazy_param_keys)
+
+    param = section.get_param(lazy_param_keys[0])
+    assert_that(section.get_param(lazy_param_keys[0])).is_same_as(param)
+    assert_that(section.params).is_length(len(params_definitions))
+
+    # Params are slotted, without a per instance dict
+    for param in section.params.values():
+        assert_that(hasattr(param, "__dict__")).is_false()
+    assert_that(hasattr(section, "__dict__")).is_false()
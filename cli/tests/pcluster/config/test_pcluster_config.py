@@ -8,18 +8,23 @@
 # or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
 # OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
 # limitations under the License.
+import io
+import json
+
 import configparser
 import pytest
 from assertpy import assert_that
+from botocore.response import StreamingBody
 from pytest import fail
 
+from pcluster.config.mappings import EBS
 from tests.common import MockedBoto3Request
 from tests.pcluster.config.utils import get_mocked_pcluster_config, init_pcluster_config_from_configparser
 
 
 @pytest.fixture()
 def boto3_stubber_path():
-    return "pcluster.cluster_model.boto3"
+    return "pcluster.utils.boto3"
 
 
 @pytest.mark.parametrize(
@@ -99,10 +104,88 @@ def test_load_json_config(mocker, cfn_params_dict, version, expected_json):
         pcluster_config, "_PclusterConfig__retrieve_cluster_config", auto_spec=True
     )
     patched_read_remote_file.return_value = expected_json
+    mocker.patch.object(pcluster_config, "_PclusterConfig__retrieve_cluster_config_version", return_value="version1")
 
     assert_that(pcluster_config._PclusterConfig__load_json_config(cfn_stack)).is_equal_to(expected_json)
 
 
+@pytest.mark.parametrize("version_in_dynamodb", [True, False])
+def test_retrieve_cluster_config_cached(mocker, boto3_stubber, monkeypatch, tmpdir, version_in_dynamodb):
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.setenv("AWS_PCLUSTER_CACHE_DIR", str(tmpdir))
+    cfn_stack = {
+        "Parameters": [
+            {"ParameterKey": "Scheduler", "ParameterValue": "slurm"},
+            {"ParameterKey": "ResourcesS3Bucket", "ParameterValue": "valid_bucket"},
+        ],
+        "Tags": [{"Key": "Version", "Value": "2.9.0"}],
+    }
+    json_config = {"cluster": {"label": "default", "queue_settings": {"queue1": {}}}}
+    pcluster_config = get_mocked_pcluster_config(mocker)
+    pcluster_config.cluster_name = "test"
+
+    get_item_request = MockedBoto3Request(
+        method="get_item",
+        response={"Item": {"Id": {"S": "CLUSTER_CONFIG"}, "Version": {"S": "version1"}}} if version_in_dynamodb else {},
+        expected_params={
+            "TableName": "parallelcluster-test",
+            "ConsistentRead": True,
+            "Key": {"Id": {"S": "CLUSTER_CONFIG"}},
+        },
+    )
+    body = json.dumps(json_config).encode("utf-8")
+    get_object_requests = [
+        MockedBoto3Request(
+            method="get_object",
+            response={"Body": StreamingBody(io.BytesIO(body), len(body)), "VersionId": "version1"},
+            expected_params={
+                "Bucket": "valid_bucket",
+                "Key": "configs/cluster-config.json",
+                "VersionId": "version1",
+            }
+            if version_in_dynamodb
+            else {"Bucket": "valid_bucket", "Key": "configs/cluster-config.json"},
+        )
+        # The config of the latest version is downloaded again, a known version is taken from the cache
+        for _ in range(1 if version_in_dynamodb else 2)
+    ]
+    boto3_stubber("dynamodb", [get_item_request] * 2)
+    boto3_stubber("s3", get_object_requests)
+
+    for _ in range(2):
+        loaded_config = pcluster_config._PclusterConfig__load_json_config(cfn_stack)
+        assert_that(loaded_config).is_equal_to(json_config)
+        assert_that(list(loaded_config.get("cluster").keys())).is_equal_to(["label", "queue_settings"])
+
+
+@pytest.mark.parametrize("scheduler, expected_prefetches", [("slurm", 1), ("sge", 0)])
+def test_init_sections_from_cfn_prefetches_config_version(mocker, monkeypatch, tmpdir, scheduler, expected_prefetches):
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.setenv("AWS_PCLUSTER_CACHE_DIR", str(tmpdir))
+    cfn_stack = {
+        "Parameters": [{"ParameterKey": "Scheduler", "ParameterValue": scheduler}],
+        "Tags": [{"Key": "Version", "Value": "2.9.0"}],
+    }
+    mocker.patch("pcluster.config.pcluster_config.get_stack", return_value=cfn_stack)
+    mocker.patch("pcluster.config.pcluster_config.get_installed_version", return_value="2.9.0")
+    mocker.patch("pcluster.config.pcluster_config.infer_cluster_model")
+    mocker.patch("pcluster.config.pcluster_config.ClusterCfnSection")
+    pcluster_config = get_mocked_pcluster_config(mocker)
+    mocker.patch.object(pcluster_config, "add_section")
+    retrieve_version_mock = mocker.patch.object(
+        pcluster_config, "_PclusterConfig__retrieve_cluster_config_version", return_value="version1"
+    )
+    load_json_config_mock = mocker.patch.object(pcluster_config, "_PclusterConfig__load_json_config")
+
+    # The first load doesn't know the cluster yet, the second one only prefetches the version of HIT clusters
+    for _ in range(2):
+        pcluster_config._PclusterConfig__init_sections_from_cfn("test")
+
+    assert_that(retrieve_version_mock.call_count).is_equal_to(expected_prefetches)
+    assert_that(load_json_config_mock.call_args_list[0][0][1]).is_none()
+    assert_that(load_json_config_mock.call_args_list[1][0][1] is not None).is_equal_to(expected_prefetches == 1)
+
+
 @pytest.mark.parametrize(
     "config_parser_dict, expected_message",
     [
@@ -139,3 +222,134 @@ def test_load_from_file_errors(capsys, config_parser_dict, expected_message):
             assert_that(e.args[0]).matches(expected_message)
         else:
             fail("Unexpected failure when loading file")
+
+
+def test_validate_prefetches_ec2_resources(mocker):
+    config_parser = configparser.ConfigParser()
+    config_parser.read_dict(
+        {
+            "cluster default": {
+                "scheduler": "slurm",
+                "key_name": "key1",
+                "custom_ami": "ami-12345678",
+                "vpc_settings": "default",
+                "ebs_settings": "ebs1,ebs2,ebs3",
+            },
+            "vpc default": {
+                "vpc_id": "vpc-12345678",
+                "master_subnet_id": "subnet-12345678",
+                "compute_subnet_id": "subnet-23456789",
+                "vpc_security_group_id": "sg-12345678",
+            },
+            "ebs ebs1": {"shared_dir": "/ebs1", "ebs_volume_id": "vol-12345678"},
+            "ebs ebs2": {"shared_dir": "/ebs2", "ebs_snapshot_id": "snap-12345678"},
+            "ebs ebs3": {"shared_dir": "/ebs3", "ebs_volume_id": "vol-23456789"},
+        }
+    )
+    mocker.patch("pcluster.config.cfn_param_types.get_availability_zone_of_subnet", return_value="mocked_avail_zone")
+    mocker.patch("pcluster.config.pcluster_config.run_validations")
+    mocker.patch("pcluster.config.pcluster_config.PclusterConfig._PclusterConfig__test_configuration")
+    prefetch_mock = mocker.patch("pcluster.config.pcluster_config.prefetch_ec2_resources")
+
+    init_pcluster_config_from_configparser(config_parser, validate=True, auto_refresh=False)
+
+    resource_ids = prefetch_mock.call_args[0][0]
+    assert_that(resource_ids).is_equal_to(
+        {
+            "key_pair": ["key1"],
+            "image": ["ami-12345678"],
+            "subnet": ["subnet-12345678", "subnet-23456789"],
+            "security_group": ["sg-12345678"],
+            "volume": ["vol-12345678", "vol-23456789"],
+            "snapshot": ["snap-12345678"],
+        }
+    )
+
+
+def test_instance_types_resolved_at_once(mocker):
+    config_parser_dict = {"cluster default": {"scheduler": "slurm", "master_instance_type": "c5.xlarge"}}
+    queues = []
+    for queue_index in range(10):
+        queue_label = "queue{0}".format(queue_index)
+        compute_resource_labels = ["{0}cr{1}".format(queue_label, index) for index in range(5)]
+        queues.append(queue_label)
+        config_parser_dict["queue " + queue_label] = {"compute_resource_settings": ",".join(compute_resource_labels)}
+        for index, compute_resource_label in enumerate(compute_resource_labels):
+            config_parser_dict["compute_resource " + compute_resource_label] = {
+                "instance_type": "c5.{0}xlarge".format(queue_index * 5 + index)
+            }
+    config_parser_dict["cluster default"]["queue_settings"] = ",".join(queues)
+    config_parser = configparser.ConfigParser()
+    config_parser.read_dict(config_parser_dict)
+
+    def _describe_instance_types(instance_types):
+        return {
+            instance_type: {
+                "InstanceType": instance_type,
+                "VCpuInfo": {"DefaultVCpus": 4, "DefaultThreadsPerCore": 2},
+                "NetworkInfo": {"EfaSupported": False},
+            }
+            for instance_type in instance_types
+        }
+
+    mocker.patch("pcluster.config.cfn_param_types.get_availability_zone_of_subnet", return_value="mocked_avail_zone")
+    mocker.patch(
+        "pcluster.config.cfn_param_types.get_supported_architectures_for_instance_type", return_value=["x86_64"]
+    )
+    describe_mock = mocker.patch(
+        "pcluster.config.pcluster_config.describe_instance_types", side_effect=_describe_instance_types
+    )
+    get_instance_type_mock = mocker.patch("pcluster.config.pcluster_config.get_instance_type")
+
+    pcluster_config = init_pcluster_config_from_configparser(config_parser, validate=False)
+    pcluster_config.refresh()
+
+    # The 50 compute resources and the master are resolved with a single call, then memoized
+    describe_mock.assert_called_once()
+    assert_that(describe_mock.call_args[0][0]).is_length(51)
+    get_instance_type_mock.assert_not_called()
+    assert_that(pcluster_config.get_section("compute_resource", "queue9cr4").get_param_value("vcpus")).is_equal_to(4)
+
+
+def test_deferred_incremental_refresh(mocker):
+    config_parser = configparser.ConfigParser()
+    config_parser.read_dict(
+        {
+            "cluster default": {
+                "scheduler": "sge",
+                "base_os": "alinux2",
+                "master_instance_type": "c5.xlarge",
+                "ebs_settings": "ebs1",
+            },
+            "ebs ebs1": {"shared_dir": "/ebs1"},
+        }
+    )
+    mocker.patch("pcluster.config.cfn_param_types.get_availability_zone_of_subnet", return_value="mocked_avail_zone")
+    architectures_mock = mocker.patch(
+        "pcluster.config.cfn_param_types.get_supported_architectures_for_instance_type", return_value=["x86_64"]
+    )
+    mocker.patch("pcluster.config.pcluster_config.describe_instance_types", return_value={})
+    mocker.patch("pcluster.config.pcluster_config.get_instance_type")
+
+    pcluster_config = init_pcluster_config_from_configparser(config_parser, validate=False)
+    cluster_section = pcluster_config.get_section("cluster")
+    architectures_mock.reset_mock()
+    refresh_spy = mocker.spy(pcluster_config, "refresh")
+
+    # Changes made in nested blocks are refreshed once, when the outermost block ends
+    with pcluster_config.deferred_refresh():
+        with pcluster_config.deferred_refresh():
+            for label in ["ebs2", "ebs3"]:
+                pcluster_config.add_section(EBS.get("type")(EBS, pcluster_config, section_label=label))
+        pcluster_config.remove_section("ebs", "ebs1")
+        refresh_spy.assert_not_called()
+    refresh_spy.assert_called_once_with(incremental=True)
+    assert_that(cluster_section.get_param_value("ebs_settings")).is_equal_to("ebs2,ebs3")
+
+    # The architecture is recomputed only when the master instance type changes
+    architectures_mock.assert_not_called()
+    cluster_section.get_param("master_instance_type").value = "m6g.xlarge"
+    pcluster_config.get_section("ebs", "ebs3").label = "ebs4"
+    architectures_mock.assert_called_once()
+    assert_that(architectures_mock.call_args[0][0]).is_equal_to("m6g.xlarge")
+    assert_that(cluster_section.get_param_value("ebs_settings")).is_equal_to("ebs2,ebs4")
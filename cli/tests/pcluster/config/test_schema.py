@@ -0,0 +1,51 @@
+# Copyright 2020 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You may not use this file except in compliance
+# with the License. A copy of the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "LICENSE.txt" file accompanying this file. This file is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES
+# OR CONDITIONS OF ANY KIND, express or implied. See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+from assertpy import assert_that
+
+from pcluster.config.mappings import CLUSTER_HIT, CLUSTER_SIT, EBS, EFS, QUEUE, SCALING
+from pcluster.config.schema import get_section_schema
+
+
+@pytest.mark.parametrize("section_definition", [CLUSTER_SIT, CLUSTER_HIT, EBS, EFS, QUEUE])
+def test_section_schema(section_definition):
+    schema = get_section_schema(section_definition)
+
+    # The schema is built once per definition
+    assert_that(get_section_schema(section_definition)).is_same_as(schema)
+
+    params = section_definition.get("params")
+    assert_that([param_key for param_key, _ in schema.params]).is_equal_to(list(params.keys()))
+    for param_key, param_definition, cfn_name in schema.cfn_params:
+        assert_that(param_definition).is_same_as(params.get(param_key))
+        assert_that(cfn_name).is_equal_to(param_definition.get("cfn_param_mapping"))
+        assert_that(schema.params_by_cfn_name).contains_key(cfn_name)
+    for param_key, param_definition in params.items():
+        if "cfn_param_mapping" not in param_definition:
+            assert_that([cfn_param[0] for cfn_param in schema.cfn_params]).does_not_contain(param_key)
+
+
+def test_section_schema_storage_keys():
+    # Sections with the same key have different schemas
+    assert_that(get_section_schema(CLUSTER_HIT)).is_not_same_as(get_section_schema(CLUSTER_SIT))
+
+    # _scaledown_idletime is stored in the Json as scaledown_idletime
+    params_by_storage_key = get_section_schema(SCALING).params_by_storage_key
+    assert_that(params_by_storage_key.get("scaledown_idletime")[0]).is_equal_to("_scaledown_idletime")
+    assert_that(params_by_storage_key).does_not_contain_key("_scaledown_idletime")
+    assert_that(get_section_schema(CLUSTER_HIT).params_by_storage_key.get("queue_settings")[0]).is_equal_to(
+        "queue_settings"
+    )
+
+    # Definitions with the same content do not share the schema
+    ebs_copy = dict(EBS)
+    assert_that(get_section_schema(ebs_copy)).is_not_same_as(get_section_schema(EBS))
+    assert_that(get_section_schema(ebs_copy)).is_equal_to(get_section_schema(EBS))
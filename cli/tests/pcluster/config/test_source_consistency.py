@@ -60,6 +60,8 @@ def test_mapping_consistency():
                     "update_policy",
                     "required",
                     "visibility",
+                    "ec2_resource_type",
+                    "ec2_instance_type",
                 )
                 # Update policy must be always specified
                 assert_that(
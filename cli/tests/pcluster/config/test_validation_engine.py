@@ -0,0 +1,230 @@
+"""This module provides unit tests for the pcluster.config.validation_engine module."""
+import os
+import threading
+import time
+
+import pytest
+from assertpy import assert_that
+
+from pcluster.config.validation_engine import (
+    Validation,
+    ValidationCache,
+    get_validation_workers,
+    is_validation_cache_enabled,
+    run_validations,
+)
+
+
+class FakePclusterConfig(object):
+    def __init__(self, fail_on_error):
+        self.fail_on_error = fail_on_error
+        self.messages = []
+
+    def error(self, message):
+        self.messages.append("ERROR: " + message)
+        if self.fail_on_error:
+            raise SystemExit(message)
+
+    def warn(self, message):
+        self.messages.append("WARNING: " + message)
+
+
+def _validator(result, delay=0, calls=None):
+    def _validate(key, value, pcluster_config):
+        time.sleep(delay)
+        if calls is not None:
+            calls.append(key)
+        return result
+
+    return _validate
+
+
+def _validation(node, key, result, delay=0, calls=None):
+    return Validation(
+        node,
+        _validator(result, delay, calls),
+        (key, "value", None),
+        error_header="{0} errors:".format(key),
+        warning_header="{0} warnings:".format(key),
+    )
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_outcomes_reported_in_order(max_workers):
+    pcluster_config = FakePclusterConfig(fail_on_error=False)
+    validations = [
+        _validation(("cluster", "default"), "slow_warning", ([], ["warning 1"]), delay=0.2),
+        _validation(("cluster", "default"), "error", (["error 1", "error 2"], []), delay=0.1),
+        Validation.check(("cluster", "default"), lambda: pcluster_config.warn("check")),
+        _validation(("cluster", "default"), "valid", ([], [])),
+        _validation(("cluster", "default"), "fast_warning", ([], ["warning 2"])),
+    ]
+    run_validations(validations, pcluster_config, max_workers=max_workers)
+    assert_that(pcluster_config.messages).is_equal_to(
+        [
+            "WARNING: slow_warning warnings:\nwarning 1",
+            "ERROR: error errors:\nerror 1\nerror 2",
+            "WARNING: check",
+            "WARNING: fast_warning warnings:\nwarning 2",
+        ]
+    )
+
+
+def test_validators_run_concurrently():
+    barrier = threading.Barrier(3) if hasattr(threading, "Barrier") else None
+    if not barrier:
+        pytest.skip("threading.Barrier not available")
+
+    def _wait_for_others(key, value, pcluster_config):
+        # Fails with BrokenBarrierError if the three validators are not executed at the same time
+        barrier.wait(timeout=5)
+        return [], []
+
+    pcluster_config = FakePclusterConfig(fail_on_error=True)
+    validations = [Validation(("vpc", "default"), _wait_for_others, (key, None, None)) for key in ["a", "b", "c"]]
+    run_validations(validations, pcluster_config, max_workers=3)
+    assert_that(pcluster_config.messages).is_empty()
+
+
+def test_first_error_in_order_is_reported():
+    pcluster_config = FakePclusterConfig(fail_on_error=True)
+    validations = [
+        _validation(("cluster", "default"), "first", (["first error"], []), delay=0.2),
+        _validation(("cluster", "default"), "second", (["second error"], [])),
+    ]
+    with pytest.raises(SystemExit, match="first errors:\nfirst error"):
+        run_validations(validations, pcluster_config, max_workers=2)
+    assert_that(pcluster_config.messages).is_length(1)
+
+
+def test_exceptions_are_raised_in_order():
+    def _raise(key, value, pcluster_config):
+        raise SystemExit("failure of {0}".format(key))
+
+    pcluster_config = FakePclusterConfig(fail_on_error=False)
+    validations = [
+        _validation(("cluster", "default"), "warning", ([], ["warning"]), delay=0.1),
+        Validation(("cluster", "default"), _raise, ("exit", None, None)),
+        _validation(("cluster", "default"), "error", (["error"], [])),
+    ]
+    with pytest.raises(SystemExit, match="failure of exit"):
+        run_validations(validations, pcluster_config, max_workers=3)
+    assert_that(pcluster_config.messages).is_equal_to(["WARNING: warning warnings:\nwarning"])
+
+
+@pytest.mark.parametrize("fail_on_error", [True, False])
+def test_dependencies(fail_on_error):
+    calls = []
+    pcluster_config = FakePclusterConfig(fail_on_error=fail_on_error)
+    cluster_node = ("cluster", "default")
+    queue_node = ("queue", "queue1")
+    compute_resource_node = ("compute_resource", "cr1")
+    validations = [
+        # The dependent sections are listed first, but they are executed after the ones they depend on
+        _validation(compute_resource_node, "compute_resource", ([], []), calls=calls),
+        _validation(queue_node, "queue", ([], []), calls=calls),
+        _validation(cluster_node, "cluster", (["cluster error"], []), delay=0.1, calls=calls),
+        _validation(("vpc", "default"), "vpc", ([], []), calls=calls),
+    ]
+    dependencies = {queue_node: [cluster_node], compute_resource_node: [queue_node]}
+
+    if fail_on_error:
+        with pytest.raises(SystemExit, match="cluster error"):
+            run_validations(validations, pcluster_config, dependencies=dependencies, max_workers=4)
+        # Validations depending on the failed section are skipped
+        assert_that(sorted(calls)).is_equal_to(["cluster", "vpc"])
+    else:
+        run_validations(validations, pcluster_config, dependencies=dependencies, max_workers=4)
+        assert_that(calls[-2:]).is_equal_to(["queue", "compute_resource"])
+        assert_that(pcluster_config.messages).is_equal_to(["ERROR: cluster errors:\ncluster error"])
+
+
+@pytest.mark.parametrize("env_value, expected_workers", [(None, 10), ("1", 1), ("0", 1), ("25", 25), ("many", 10)])
+def test_get_validation_workers(monkeypatch, env_value, expected_workers):
+    if env_value is None:
+        monkeypatch.delenv("AWS_PCLUSTER_VALIDATION_WORKERS", raising=False)
+    else:
+        monkeypatch.setenv("AWS_PCLUSTER_VALIDATION_WORKERS", env_value)
+    assert_that(get_validation_workers()).is_equal_to(expected_workers)
+
+
+@pytest.fixture()
+def validation_cache_dir(monkeypatch, tmpdir):
+    """Enable the validation cache and point it to a temporary directory."""
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.setenv("AWS_PCLUSTER_CACHE_DIR", str(tmpdir))
+    monkeypatch.setenv("AWS_PCLUSTER_VALIDATION_CACHE", "true")
+    return str(tmpdir)
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_validation_cache(validation_cache_dir, max_workers):
+    calls = []
+    cached_validator = _validator(([], ["warning"]), calls=calls)
+    not_cached_validator = _validator(([], []), calls=calls)
+
+    def _run(scope):
+        pcluster_config = FakePclusterConfig(fail_on_error=False)
+        validations = [
+            Validation(("vpc", "default"), cached_validator, ("cached", "value", None), warning_header="header"),
+            Validation(("vpc", "default"), not_cached_validator, ("not_cached", "value", None)),
+        ]
+        cache = ValidationCache({cached_validator: 60}, scope=scope)
+        run_validations(validations, pcluster_config, max_workers=max_workers, cache=cache)
+        return pcluster_config.messages
+
+    assert_that(is_validation_cache_enabled()).is_true()
+    assert_that(_run(["us-east-1", "123456789012", "hash"])).is_equal_to(["WARNING: header\nwarning"])
+    assert_that(sorted(calls)).is_equal_to(["cached", "not_cached"])
+    # The cached result is reported without executing the validator again
+    assert_that(_run(["us-east-1", "123456789012", "hash"])).is_equal_to(["WARNING: header\nwarning"])
+    assert_that(sorted(calls)).is_equal_to(["cached", "not_cached", "not_cached"])
+    # A different scope doesn't reuse the results
+    _run(["us-east-1", "123456789012", "other hash"])
+    assert_that(sorted(calls)).is_equal_to(["cached", "cached", "not_cached", "not_cached", "not_cached"])
+
+
+def test_validation_cache_skips_throttled_and_failed_validators(validation_cache_dir, mocker):
+    calls = []
+    mocker.patch("pcluster.config.validation_engine.get_throttled_requests_count", side_effect=lambda: len(calls))
+
+    def _throttled_validator(key, value, pcluster_config):
+        # Every execution counts as a throttled request
+        calls.append(key)
+        return ["Rate exceeded"], []
+
+    def _failing_validator(key, value, pcluster_config):
+        raise SystemExit("failure")
+
+    def _run():
+        pcluster_config = FakePclusterConfig(fail_on_error=False)
+        validations = [
+            Validation(("vpc", "default"), _throttled_validator, ("throttled", "value", None), error_header="header"),
+            Validation(("vpc", "default"), _failing_validator, ("failing", "value", None)),
+        ]
+        cache = ValidationCache({_throttled_validator: 60, _failing_validator: 60}, scope=["us-east-1"])
+        with pytest.raises(SystemExit, match="failure"):
+            run_validations(validations, pcluster_config, cache=cache)
+        assert_that(pcluster_config.messages).is_equal_to(["ERROR: header\nRate exceeded"])
+
+    _run()
+    _run()
+    assert_that(calls).is_equal_to(["throttled", "throttled"])
+    assert_that(os.listdir(validation_cache_dir)).is_empty()
+
+
+@pytest.mark.parametrize(
+    "env_values, expected_enabled",
+    [
+        ({}, False),
+        ({"AWS_PCLUSTER_VALIDATION_CACHE": "true"}, True),
+        ({"AWS_PCLUSTER_VALIDATION_CACHE": "false"}, False),
+        ({"AWS_PCLUSTER_VALIDATION_CACHE": "1", "AWS_PCLUSTER_DISABLE_CACHE": "true"}, False),
+    ],
+)
+def test_is_validation_cache_enabled(monkeypatch, env_values, expected_enabled):
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.delenv("AWS_PCLUSTER_VALIDATION_CACHE", raising=False)
+    for env_var, value in env_values.items():
+        monkeypatch.setenv(env_var, value)
+    assert_that(is_validation_cache_enabled()).is_equal_to(expected_enabled)
@@ -40,7 +40,7 @@ from tests.pcluster.config.defaults import DefaultDict
 
 @pytest.fixture()
 def boto3_stubber_path():
-    return "pcluster.config.validators.boto3"
+    return "pcluster.utils.boto3"
 
 
 @pytest.mark.parametrize(
@@ -2178,7 +2178,11 @@ def test_fsx_ignored_parameters_validator(mocker, section_dict, expected_error):
     mocked_pcluster_config = utils.get_mocked_pcluster_config(mocker)
     fsx_section = CfnSection(FSX, mocked_pcluster_config, "default")
     for param_key, param_value in section_dict.items():
-        param = FSX.get("params").get(param_key).get("type", CfnParam)
+        param_definition = FSX.get("params").get(param_key)
+        param_type = param_definition.get("type", CfnParam)
+        param = param_type(
+            "fsx", "default", param_key, param_definition, mocked_pcluster_config, owner_section=fsx_section
+        )
         param.value = param_value
         fsx_section.set_param(param_key, param)
     mocked_pcluster_config.add_section(fsx_section)
@@ -111,6 +111,13 @@ def get_mock_pcluster_config_patches(scheduler, extra_patches=None):
         "pcluster.config.cfn_param_types.get_availability_zone_of_subnet": "mocked_avail_zone",
         "pcluster.config.cfn_param_types.get_supported_architectures_for_instance_type": architectures,
         "pcluster.config.validators.get_instance_vcpus": 1,
+        "pcluster.config.pcluster_config.prefetch_ec2_resources": None,
+        "pcluster.config.pcluster_config.describe_instance_types": {},
+        "pcluster.config.pcluster_config.get_instance_type": {
+            "InstanceType": "t2.micro",
+            "VCpuInfo": {"DefaultVCpus": 4, "DefaultCores": 2},
+            "NetworkInfo": {"EfaSupported": False},
+        },
     }
     if extra_patches:
         patches = merge_dicts(patches, extra_patches)
@@ -127,7 +134,7 @@ def mock_pcluster_config(mocker, scheduler=None, extra_patches=None, patch_funcs
 
 def mock_get_instance_type(mocker, instance_type="t2.micro"):
     mocker.patch(
-        "pcluster.utils.get_instance_type",
+        "pcluster.config.pcluster_config.get_instance_type",
         return_value={
             "InstanceType": instance_type,
             "VCpuInfo": {"DefaultVCpus": 4, "DefaultCores": 2},
@@ -143,12 +150,8 @@ def mock_ec2_key_pair(mocker, cluster_section_dict):
         mocker.patch(
             "pcluster.config.validators._describe_ec2_key_pair",
             return_value={
-                "KeyPairs": [
-                    {
-                        "KeyFingerprint": "12:bf:7c:56:6c:dd:4f:8c:24:45:75:f1:1b:16:54:89:82:09:a4:26",
-                        "KeyName": "test_key",
-                    }
-                ]
+                "KeyFingerprint": "12:bf:7c:56:6c:dd:4f:8c:24:45:75:f1:1b:16:54:89:82:09:a4:26",
+                "KeyName": "test_key",
             },
         )
 
@@ -351,7 +354,7 @@ def assert_section_params(mocker, pcluster_config_reader, settings_label, expect
         "pcluster.config.cfn_param_types.get_supported_architectures_for_instance_type", return_value=["x86_64"]
     )
     mocker.patch(
-        "pcluster.utils.get_instance_type",
+        "pcluster.config.pcluster_config.get_instance_type",
         return_value={
             "InstanceType": "t2.micro",
             "VCpuInfo": {"DefaultVCpus": 1, "DefaultCores": 1, "DefaultThreadsPerCore": 1},
@@ -23,8 +23,8 @@ PUBLIC_CONFIGURATION = NetworkConfiguration.PUBLIC.value.config_type
 
 @pytest.fixture()
 def boto3_stubber_path():
-    """Specify that boto3_mocker should stub calls to boto3 for the pcluster.configure.eesyconfig module."""
-    return "pcluster.configure.easyconfig.boto3"
+    """Specify that boto3_mocker should stub the boto3 clients shared through pcluster.utils."""
+    return "pcluster.utils.boto3"
 
 
 @pytest.fixture()
@@ -306,7 +306,7 @@ def _mock_parallel_cluster_config(mocker):
     mocker.patch("pcluster.config.cfn_param_types.get_availability_zone_of_subnet", return_value="mocked_avail_zone")
     mocker.patch(
         "pcluster.config.cfn_param_types.get_supported_architectures_for_instance_type",
-        side_effect=lambda instance: ["arm64"] if instance == "m6g.xlarge" else ["x86_64"],
+        side_effect=lambda instance, instance_info=None: ["arm64"] if instance == "m6g.xlarge" else ["x86_64"],
     )
     # NOTE: the following shouldn't be needed given that easyconfig doesn't validate the config file,
     #       but it's being included in case that changes in the future.
@@ -315,6 +315,7 @@ def _mock_parallel_cluster_config(mocker):
         side_effect=lambda instance: ["arm64"] if instance == "m6g.xlarge" else ["x86_64"],
     )
 
+    mocker.patch("pcluster.config.pcluster_config.describe_instance_types", return_value={})
     for instance_type in supported_instance_types:
         mock_get_instance_type(mocker, instance_type)
 
@@ -0,0 +1,84 @@
+"""This module provides unit tests for the pcluster.cache module."""
+import os
+
+import pytest
+from assertpy import assert_that
+
+from pcluster.cache import ContentCache, FileCache
+
+
+@pytest.fixture()
+def cache_dir(monkeypatch, tmpdir):
+    """Enable the on-disk cache and point it to a temporary directory."""
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.setenv("AWS_PCLUSTER_CACHE_DIR", str(tmpdir))
+    monkeypatch.setattr(FileCache, "_refresh_time", None)
+    return str(tmpdir)
+
+
+def test_put_and_get(cache_dir):
+    cache = FileCache("namespace", ttl=60)
+    assert_that(cache.get("us-east-1")).is_none()
+
+    cache.put("us-east-1", {"t2.micro": {"VCpuInfo": {"DefaultVCpus": 1}}})
+    assert_that(cache.get("us-east-1")).is_equal_to({"t2.micro": {"VCpuInfo": {"DefaultVCpus": 1}}})
+    # No temporary file is left behind after the atomic write
+    assert_that(os.listdir(os.path.join(cache_dir, "namespace"))).is_equal_to(["us-east-1.json"])
+
+    cache.invalidate("us-east-1")
+    assert_that(cache.get("us-east-1")).is_none()
+
+
+def test_expired_entry(cache_dir, mocker):
+    time_mock = mocker.patch("pcluster.cache.time.time", return_value=1000)
+    cache = FileCache("namespace", ttl=60)
+    cache.put("key", "data")
+
+    time_mock.return_value = 1060
+    assert_that(cache.get("key")).is_equal_to("data")
+    time_mock.return_value = 1061
+    assert_that(cache.get("key")).is_none()
+    assert_that(cache.get("key", ignore_ttl=True)).is_equal_to("data")
+
+
+def test_request_refresh(cache_dir, mocker):
+    time_mock = mocker.patch("pcluster.cache.time.time", return_value=1000)
+    cache = FileCache("namespace", ttl=60)
+    cache.put("key", "data")
+
+    time_mock.return_value = 1001
+    FileCache.request_refresh()
+    assert_that(cache.get("key")).is_none()
+    assert_that(cache.get("key", ignore_ttl=True)).is_none()
+
+    # Entries written after the refresh request are valid
+    cache.put("key", "new data")
+    assert_that(cache.get("key")).is_equal_to("new data")
+
+
+def test_corrupted_entry(cache_dir):
+    cache = FileCache("namespace", ttl=60)
+    cache.put("key", "data")
+    with open(os.path.join(cache_dir, "namespace", "key.json"), "w") as cache_file:
+        cache_file.write("{not json")
+    assert_that(cache.get("key")).is_none()
+
+
+def test_disabled_cache(cache_dir, monkeypatch):
+    monkeypatch.setenv("AWS_PCLUSTER_DISABLE_CACHE", "true")
+    cache = FileCache("namespace", ttl=60)
+    cache.put("key", "data")
+    assert_that(os.path.exists(os.path.join(cache_dir, "namespace"))).is_false()
+    assert_that(cache.get("key")).is_none()
+
+
+def test_content_cache(cache_dir, monkeypatch):
+    cache = ContentCache("artifacts")
+    assert_that(cache.get("0123abcd.zip")).is_none()
+
+    cache.put("0123abcd.zip", b"PK\x05\x06")
+    assert_that(cache.get("0123abcd.zip")).is_equal_to(b"PK\x05\x06")
+    assert_that(os.listdir(os.path.join(cache_dir, "artifacts"))).is_equal_to(["0123abcd.zip"])
+
+    monkeypatch.setenv("AWS_PCLUSTER_DISABLE_CACHE", "true")
+    assert_that(cache.get("0123abcd.zip")).is_none()
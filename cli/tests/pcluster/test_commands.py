@@ -10,16 +10,34 @@
 # limitations under the License.
 
 """This module provides unit tests for the functions in the pcluster.commands module."""
+import json
+import logging
+import threading
+from argparse import Namespace
+from datetime import datetime
+
 import pkg_resources
 import pytest
 from assertpy import assert_that
-from botocore.exceptions import ClientError
+from botocore.exceptions import ClientError, EndpointConnectionError
 
 import pcluster.utils as utils
 from pcluster.cli_commands import update
 from pcluster.cluster_model import ClusterModel
-from pcluster.commands import _create_bucket_with_resources, _validate_cluster_name
+from pcluster.commands import (
+    LISTED_STACK_STATUSES,
+    _create_bucket_with_resources,
+    _validate_cluster_name,
+    instances,
+    list_stacks,
+)
 from pcluster.constants import PCLUSTER_NAME_MAX_LENGTH
+from tests.common import MockedBoto3Request
+
+
+@pytest.fixture()
+def boto3_stubber_path():
+    return "pcluster.utils.boto3"
 
 
 def _mock_pcluster_config(mocker, scheduler, region):
@@ -184,3 +202,239 @@ def test_validate_cluster_name(cluster_name, should_trigger_error, caplog):
         _validate_cluster_name(cluster_name)
         for record in caplog.records:
             assert record.levelname != "CRITICAL"
+
+
+def _stack_summary(stack_name, stack_status="CREATE_COMPLETE", parent_id=None):
+    summary = {"StackName": stack_name, "StackStatus": stack_status, "CreationTime": datetime(2020, 1, 1)}
+    if parent_id:
+        summary["ParentId"] = parent_id
+    return summary
+
+
+def _describe_stack_request(stack_name, stack_status="CREATE_COMPLETE", version="2.9.1"):
+    return MockedBoto3Request(
+        method="describe_stacks",
+        response={
+            "Stacks": [
+                {
+                    "StackName": stack_name,
+                    "StackStatus": stack_status,
+                    "CreationTime": datetime(2020, 1, 1),
+                    "Tags": [{"Key": "Version", "Value": version}],
+                }
+            ]
+        },
+        expected_params={"StackName": stack_name},
+    )
+
+
+def _list_stacks_request(summaries):
+    return MockedBoto3Request(
+        method="list_stacks",
+        response={"StackSummaries": summaries},
+        expected_params={"StackStatusFilter": LISTED_STACK_STATUSES},
+    )
+
+
+def test_list_stacks(mocker, boto3_stubber, caplog):
+    mocker.patch("pcluster.commands.PclusterConfig.init_aws")
+    caplog.set_level(logging.INFO, logger="pcluster")
+    boto3_stubber(
+        "cloudformation",
+        [
+            _list_stacks_request(
+                [
+                    _stack_summary("parallelcluster-cluster1"),
+                    _stack_summary("parallelcluster-cluster1-EBSCfnStack", parent_id="parent-id"),
+                    _stack_summary("other-stack"),
+                    _stack_summary("parallelcluster-long-cluster-name", stack_status="UPDATE_IN_PROGRESS"),
+                    _stack_summary("parallelcluster-deleted"),
+                ]
+            ),
+            # Only the top level cluster stacks are described
+            _describe_stack_request("parallelcluster-cluster1"),
+            _describe_stack_request("parallelcluster-long-cluster-name", "UPDATE_IN_PROGRESS", "2.8.1"),
+            MockedBoto3Request(
+                method="describe_stacks",
+                response="Stack with id parallelcluster-deleted does not exist",
+                expected_params={"StackName": "parallelcluster-deleted"},
+                generate_error=True,
+            ),
+        ],
+    )
+
+    list_stacks(Namespace(config_file=None, color=False, regions=None, json=False))
+
+    assert_that([record.getMessage() for record in caplog.records]).is_equal_to(
+        [
+            "cluster1           CREATE_COMPLETE     2.9.1",
+            "long-cluster-name  UPDATE_IN_PROGRESS  2.8.1",
+        ]
+    )
+
+
+def test_list_stacks_multiple_regions(mocker, boto3_stubber, caplog):
+    mocker.patch("pcluster.commands.PclusterConfig.init_aws")
+    caplog.set_level(logging.INFO, logger="pcluster")
+    # The stubbed client is shared by the regions: regions are listed first, then the clusters are described
+    boto3_stubber(
+        "cloudformation",
+        [
+            _list_stacks_request([_stack_summary("parallelcluster-cluster1")]),
+            _list_stacks_request([_stack_summary("parallelcluster-cluster2")]),
+            _describe_stack_request("parallelcluster-cluster1"),
+            _describe_stack_request("parallelcluster-cluster2"),
+        ],
+    )
+
+    list_stacks(Namespace(config_file=None, color=False, regions="us-east-1, eu-west-1,us-east-1", json=True))
+
+    assert_that([json.loads(record.getMessage()) for record in caplog.records]).is_equal_to(
+        [
+            {"name": "cluster1", "region": "us-east-1", "status": "CREATE_COMPLETE", "version": "2.9.1"},
+            {"name": "cluster2", "region": "eu-west-1", "status": "CREATE_COMPLETE", "version": "2.9.1"},
+        ]
+    )
+
+
+@pytest.mark.parametrize(
+    "regions, expected_messages",
+    [
+        (
+            "us-east-1,bad-region",
+            [
+                "Unable to list clusters in region bad-region: "
+                'Could not connect to the endpoint URL: "https://cloudformation.bad-region.amazonaws.com/"',
+                '{"name": "cluster1", "region": "us-east-1", "status": "CREATE_COMPLETE", "version": "2.9.1"}',
+            ],
+        ),
+        ("bad-region", ['Could not connect to the endpoint URL: "https://cloudformation.bad-region.amazonaws.com/"']),
+    ],
+)
+def test_list_stacks_unreachable_region(mocker, boto3_stubber, caplog, regions, expected_messages):
+    mocker.patch("pcluster.commands.PclusterConfig.init_aws")
+    caplog.set_level(logging.INFO, logger="pcluster")
+
+    def _list_cluster_stack_summaries(region):
+        if region == "bad-region":
+            raise EndpointConnectionError(endpoint_url="https://cloudformation.bad-region.amazonaws.com/")
+        return [_stack_summary("parallelcluster-cluster1")]
+
+    mocker.patch("pcluster.commands._list_cluster_stack_summaries", side_effect=_list_cluster_stack_summaries)
+    boto3_stubber(
+        "cloudformation", [_describe_stack_request("parallelcluster-cluster1")] if "us-east-1" in regions else []
+    )
+
+    with pytest.raises(SystemExit) as sys_exit:
+        list_stacks(Namespace(config_file=None, color=False, regions=regions, json=True))
+
+    assert_that(sys_exit.value.code).is_equal_to(1)
+    assert_that([record.getMessage() for record in caplog.records]).is_equal_to(expected_messages)
+
+
+def test_list_stacks_describe_failure(mocker, boto3_stubber, caplog):
+    mocker.patch("pcluster.commands.PclusterConfig.init_aws")
+    caplog.set_level(logging.INFO, logger="pcluster")
+    boto3_stubber(
+        "cloudformation",
+        [
+            _list_stacks_request([_stack_summary("parallelcluster-cluster1"), _stack_summary("parallelcluster-other")]),
+            MockedBoto3Request(
+                method="describe_stacks",
+                response="User is not authorized to perform: cloudformation:DescribeStacks",
+                expected_params={"StackName": "parallelcluster-cluster1"},
+                generate_error=True,
+                error_code="AccessDenied",
+            ),
+            _describe_stack_request("parallelcluster-other"),
+        ],
+    )
+
+    with pytest.raises(SystemExit) as sys_exit:
+        list_stacks(Namespace(config_file=None, color=False, regions="us-east-1", json=False))
+
+    # The other clusters are still listed, and the failure is reported through the exit code
+    assert_that(sys_exit.value.code).is_equal_to(1)
+    assert_that([record.getMessage() for record in caplog.records]).is_equal_to(
+        [
+            "Unable to describe cluster cluster1 in region us-east-1: "
+            "User is not authorized to perform: cloudformation:DescribeStacks",
+            "other  CREATE_COMPLETE  2.9.1",
+        ]
+    )
+
+
+def test_list_stacks_streams_regions(mocker, monkeypatch, caplog):
+    monkeypatch.setenv("AWS_PCLUSTER_REQUEST_WORKERS", "2")
+    mocker.patch("pcluster.commands.PclusterConfig.init_aws")
+    caplog.set_level(logging.INFO, logger="pcluster")
+    rows_printed = threading.Event()
+    rows_handler = logging.Handler()
+    rows_handler.emit = lambda record: rows_printed.set()
+    logging.getLogger("pcluster").addHandler(rows_handler)
+
+    def _list_cluster_stack_summaries(region):
+        if region == "slow-region":
+            # The listing of the slow region completes only after the rows of the other region are printed
+            assert_that(rows_printed.wait(10)).is_true()
+            return []
+        return [_stack_summary("parallelcluster-cluster1")]
+
+    mocker.patch("pcluster.commands._list_cluster_stack_summaries", side_effect=_list_cluster_stack_summaries)
+    mocker.patch(
+        "pcluster.commands._describe_cluster_stack",
+        side_effect=lambda region, stack_name: {
+            "StackName": stack_name,
+            "StackStatus": "CREATE_COMPLETE",
+            "Tags": [{"Key": "Version", "Value": "2.9.1"}],
+        },
+    )
+
+    try:
+        list_stacks(Namespace(config_file=None, color=False, regions="slow-region,us-east-1", json=True))
+    finally:
+        logging.getLogger("pcluster").removeHandler(rows_handler)
+
+    assert_that([json.loads(record.getMessage()) for record in caplog.records]).is_equal_to(
+        [{"name": "cluster1", "region": "us-east-1", "status": "CREATE_COMPLETE", "version": "2.9.1"}]
+    )
+
+
+@pytest.mark.parametrize(
+    "args, expected_stack_names, expected_tag_filters",
+    [
+        ({"all": True}, None, {}),
+        ({"clusters": "cluster1, cluster2"}, ["parallelcluster-cluster1", "parallelcluster-cluster2"], {}),
+        ({"tags": "team=hpc,team=ml,env=prod"}, None, {"team": ["hpc", "ml"], "env": ["prod"]}),
+    ],
+)
+def test_fleet_instances(mocker, caplog, args, expected_stack_names, expected_tag_filters):
+    mocker.patch("pcluster.commands.PclusterConfig.init_aws")
+    caplog.set_level(logging.INFO, logger="pcluster")
+    describe_fleet_instances_mock = mocker.patch(
+        "pcluster.commands.utils.describe_fleet_instances",
+        return_value={
+            "parallelcluster-cluster1": {
+                utils.NodeType.master: [{"InstanceId": "i-master", "State": {"Name": "running"}}],
+                utils.NodeType.compute: [{"InstanceId": "i-compute", "LaunchTime": datetime(2020, 1, 1)}],
+            }
+        },
+    )
+    instances_args = {"config_file": None, "cluster_name": None, "all": False, "clusters": None, "tags": None}
+    instances_args.update(args)
+
+    instances(Namespace(json=True, **instances_args))
+
+    describe_fleet_instances_mock.assert_called_with(expected_stack_names, tag_filters=expected_tag_filters)
+    fleet = json.loads(caplog.records[0].getMessage())
+    assert_that(list(fleet.keys())).is_equal_to(["cluster1"])
+    assert_that(fleet["cluster1"]["Master"][0]).contains_entry({"InstanceId": "i-master"}, {"State": "running"})
+    assert_that(fleet["cluster1"]["Compute"][0]).contains_entry(
+        {"InstanceId": "i-compute"}, {"LaunchTime": "2020-01-01T00:00:00"}
+    )
+
+    caplog.clear()
+    instances(Namespace(json=False, **instances_args))
+    assert_that(caplog.records[0].getMessage()).is_equal_to(
+        "cluster1  MasterServer  i-master\ncluster1  ComputeFleet  i-compute"
+    )
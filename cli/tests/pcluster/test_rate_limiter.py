@@ -0,0 +1,74 @@
+"""This module provides unit tests for the pcluster.rate_limiter module."""
+import pytest
+from assertpy import assert_that
+
+from pcluster.rate_limiter import (
+    AdaptiveRateLimiter,
+    before_send_handler,
+    exponential_backoff,
+    needs_retry_handler,
+)
+
+
+@pytest.fixture()
+def clock(mocker):
+    """Replace the time of the limiters with a fake clock advanced by sleep."""
+    now = [1000.0]
+    mocker.patch("pcluster.rate_limiter.time.time", side_effect=lambda: now[0])
+    sleep_mock = mocker.patch(
+        "pcluster.rate_limiter.time.sleep", side_effect=lambda seconds: now.__setitem__(0, now[0] + seconds)
+    )
+    return sleep_mock
+
+
+@pytest.mark.parametrize(
+    "attempt, base_wait, max_wait, expected_range",
+    [(0, 5, 60, (2.5, 5)), (1, 5, 60, (5, 10)), (3, 5, 60, (20, 40)), (10, 5, 60, (30, 60)), (2, 1, 3, (1.5, 3))],
+)
+def test_exponential_backoff(attempt, base_wait, max_wait, expected_range):
+    for _ in range(20):
+        assert_that(exponential_backoff(attempt, base_wait, max_wait)).is_between(*expected_range)
+
+
+def test_acquire_waits_when_rate_exceeded(clock):
+    limiter = AdaptiveRateLimiter("ec2", "DescribeInstances", max_rate=2)
+    for _ in range(2):
+        limiter.acquire()
+    clock.assert_not_called()
+
+    # The bucket is empty, the following requests wait for the tokens to be refilled
+    limiter.acquire()
+    limiter.acquire()
+    assert_that([call[0][0] for call in clock.call_args_list]).is_equal_to([0.5, 0.5])
+    assert_that(limiter.requests).is_equal_to(4)
+    assert_that(limiter.wait_time).is_equal_to(1.0)
+
+
+def test_rate_adapts_to_throttling(clock):
+    limiter = AdaptiveRateLimiter("cloudformation", "DescribeStacks", max_rate=8, min_rate=1)
+    for _ in range(5):
+        limiter.on_throttled()
+    assert_that(limiter.rate).is_equal_to(1)
+    assert_that(limiter.throttles).is_equal_to(5)
+
+    for _ in range(20):
+        limiter.on_success()
+    assert_that(limiter.rate).is_equal_to(8)
+
+
+def test_event_handlers():
+    before_send_handler(event_name="before-send.ec2.DescribeSubnets")
+    needs_retry_handler(
+        event_name="needs-retry.ec2.DescribeSubnets", response=(None, {"Error": {"Code": "RequestLimitExceeded"}})
+    )
+    before_send_handler(event_name="before-send.ec2.DescribeSubnets")
+    needs_retry_handler(event_name="needs-retry.ec2.DescribeSubnets", response=(None, {"Subnets": []}))
+    # The needs-retry event is emitted without response when the request fails before reaching the service
+    needs_retry_handler(event_name="needs-retry.batch.ListJobs", response=None)
+
+    stats = AdaptiveRateLimiter.get_stats()
+    assert_that(stats).is_length(1)
+    assert_that(stats["ec2.DescribeSubnets"]).contains_entry({"requests": 2}, {"throttles": 1}, {"wait_time": 0})
+    assert_that(AdaptiveRateLimiter.get("ec2", "DescribeSubnets")).is_same_as(
+        AdaptiveRateLimiter.get("ec2", "DescribeSubnets")
+    )
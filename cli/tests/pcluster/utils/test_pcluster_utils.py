@@ -1,13 +1,18 @@
 """This module provides unit tests for the functions in the pcluster.utils module."""
 
+import datetime
+import hashlib
 import json
 import logging
+import urllib.error
+from io import BytesIO
 from itertools import product
 from re import escape
 
 import pytest
 from assertpy import assert_that
 from botocore.exceptions import ClientError, EndpointConnectionError
+from botocore.response import StreamingBody
 
 import pcluster.utils as utils
 from pcluster.utils import get_bucket_url
@@ -30,6 +35,33 @@ def test_get_stack_name():
     assert_that(utils.get_stack_name(FAKE_CLUSTER_NAME)).is_equal_to(expected_stack_name)
 
 
+def test_boto3_client_registry(mocker):
+    """Verify that boto3 clients are created once per service, region, credentials, endpoint and proxy."""
+    mocker.patch.dict("os.environ", {"AWS_DEFAULT_REGION": "us-east-1"})
+    boto3_mock = mocker.patch("pcluster.utils.boto3", autospec=True)
+    boto3_mock.client.side_effect = lambda service, **kwargs: mocker.MagicMock()
+
+    ec2_client = utils.get_boto3_client("ec2")
+    assert_that(utils.get_boto3_client("ec2")).is_same_as(ec2_client)
+    assert_that(utils.get_boto3_client("ec2", region_name="us-east-1")).is_same_as(ec2_client)
+    assert_that(utils.Boto3ClientRegistry.constructions).is_equal_to(1)
+    boto3_mock.client.assert_called_with("ec2", region_name="us-east-1", config=utils.BOTO3_CLIENT_CONFIG)
+
+    assert_that(utils.get_boto3_client("ec2", region_name="eu-west-1")).is_not_same_as(ec2_client)
+    assert_that(utils.get_boto3_client("cloudformation")).is_not_same_as(ec2_client)
+    proxy_client = utils.get_boto3_client("ec2", proxy="https://proxy:8080")
+    assert_that(proxy_client).is_not_same_as(ec2_client)
+    assert_that(boto3_mock.client.call_args[1]["config"].proxies).is_equal_to({"https": "https://proxy:8080"})
+    assert_that(utils.get_boto3_client("ec2", aws_access_key_id="key", aws_secret_access_key="secret")).is_not_same_as(
+        ec2_client
+    )
+    assert_that(utils.Boto3ClientRegistry.constructions).is_equal_to(5)
+
+    utils.Boto3ClientRegistry.reset()
+    assert_that(utils.get_boto3_client("ec2")).is_not_same_as(ec2_client)
+    assert_that(utils.Boto3ClientRegistry.constructions).is_equal_to(1)
+
+
 @pytest.mark.parametrize(
     "template_body,error_message",
     [
@@ -58,31 +90,157 @@ def test_get_stack_template(boto3_stubber, template_body, error_message):
         assert_that(utils.get_stack_template(stack_name=FAKE_STACK_NAME)).is_equal_to(response.get("TemplateBody"))
 
 
-@pytest.mark.parametrize(
-    "stack_statuses",
-    [
-        ["UPDATE_IN_PROGRESS", "UPDATE_IN_PROGRESS", "UPDATE_IN_PROGRESS", "UPDATE_COMPLETE"],
-        ["UPDATE_IN_PROGRESS", "UPDATE_IN_PROGRESS", "UPDATE_IN_PROGRESS", "anything other than UPDATE_IN_PROGRESS"],
-        ["UPDATE_COMPLETE"],
-    ],
-)
-def test_wait_for_stack_update(mocker, stack_statuses):
-    """Verify that utils._wait_for_update behaves as expected."""
-    get_stack_returns = [{"StackStatus": s} for s in stack_statuses]
-
-    # _wait_for_update should call utils.get_stack until the StackStatus is anything besides UPDATE_IN_PROGRESS,
-    # use that to get expected call count for utils.get_stack
-    expected_call_count = 0
-    for status_idx, status in enumerate(stack_statuses):
-        if status != "UPDATE_IN_PROGRESS":
-            expected_call_count = status_idx + 1
-            break
-
-    mocker.patch("pcluster.utils.get_stack").side_effect = get_stack_returns
-    mocker.patch("pcluster.utils.time.sleep")  # so we don't actually have to wait
+def test_wait_for_stack_update(mocker):
+    """Verify that utils._wait_for_update waits for the update through the stack events."""
+    wait_for_stack_mock = mocker.patch("pcluster.utils.wait_for_stack")
     utils._wait_for_update(FAKE_STACK_NAME)
-    utils.get_stack.assert_called_with(FAKE_STACK_NAME)
-    assert_that(utils.get_stack.call_count).is_equal_to(expected_call_count)
+    wait_for_stack_mock.assert_called_with(FAKE_STACK_NAME)
+
+
+def _stack_event(event_id, minute, status, logical_id, physical_id, resource_type=STACK_TYPE):
+    return {
+        "EventId": event_id,
+        "StackId": "stack-id",
+        "StackName": FAKE_STACK_NAME,
+        "LogicalResourceId": logical_id,
+        "PhysicalResourceId": physical_id,
+        "ResourceType": resource_type,
+        "ResourceStatus": status,
+        "Timestamp": datetime.datetime(2020, 1, 1, 0, minute),
+    }
+
+
+def test_stack_events_watcher(boto3_stubber, mocker):
+    """Verify that the watcher tails the events of the stack and of its nested stacks until a terminal status."""
+    sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    stack = {
+        "StackId": "stack-id",
+        "StackName": FAKE_STACK_NAME,
+        "CreationTime": datetime.datetime(2020, 1, 1, 0, 10),
+        "StackStatus": "CREATE_IN_PROGRESS",
+    }
+    old_event = _stack_event("old", 5, "DELETE_COMPLETE", FAKE_STACK_NAME, "old-stack-id")
+    stack_started = _stack_event("e1", 10, "CREATE_IN_PROGRESS", FAKE_STACK_NAME, "stack-id")
+    nested_started = _stack_event("e2", 11, "CREATE_IN_PROGRESS", "Substack", "nested-id")
+    nested_progress = _stack_event("n1", 12, "CREATE_IN_PROGRESS", "Substack", "nested-id")
+    nested_resource = _stack_event("n2", 13, "CREATE_COMPLETE", "Volume", "vol-id", "AWS::EC2::Volume")
+    nested_completed = _stack_event("e3", 14, "CREATE_COMPLETE", "Substack", "nested-id")
+    stack_completed = _stack_event("e4", 15, "CREATE_COMPLETE", FAKE_STACK_NAME, "stack-id")
+
+    def _events_request(stack_id, events, next_token=None, response_token=None):
+        expected_params = {"StackName": stack_id}
+        if next_token:
+            expected_params["NextToken"] = next_token
+        response = {"StackEvents": events}
+        if response_token:
+            response["NextToken"] = response_token
+        return MockedBoto3Request(method="describe_stack_events", response=response, expected_params=expected_params)
+
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_stacks", response={"Stacks": [stack]}, expected_params={"StackName": FAKE_STACK_NAME}
+        ),
+        # first poll, reading pages up to the start of the creation
+        _events_request("stack-id", [nested_started, stack_started], response_token="token"),
+        _events_request("stack-id", [old_event], next_token="token", response_token="other token"),
+        # second poll, with new events from the nested stack only
+        _events_request("stack-id", [nested_started, stack_started]),
+        _events_request("nested-id", [nested_progress]),
+        # idle poll
+        _events_request("stack-id", [nested_started, stack_started]),
+        _events_request("nested-id", [nested_progress]),
+        # last poll, with the terminal event of the stack
+        _events_request("stack-id", [stack_completed, nested_completed, nested_started]),
+        _events_request("nested-id", [nested_resource, nested_progress]),
+        MockedBoto3Request(
+            method="describe_stacks",
+            response={"Stacks": [dict(stack, StackStatus="CREATE_COMPLETE")]},
+            expected_params={"StackName": "stack-id"},
+        ),
+    ]
+    boto3_stubber("cloudformation", mocked_requests)
+
+    events = []
+    watcher = utils.StackEventsWatcher(FAKE_STACK_NAME, on_event=events.append)
+    assert_that(watcher.wait().get("StackStatus")).is_equal_to("CREATE_COMPLETE")
+    assert_that(events).is_equal_to(
+        [stack_started, nested_started, nested_progress, nested_resource, nested_completed, stack_completed]
+    )
+    # No wait after the terminal event, longer waits while the stack is idle
+    assert_that([call[0][0] for call in sleep_mock.call_args_list]).is_equal_to([2, 2, 4])
+    assert_that(watcher.requests).is_equal_to(8)
+
+
+def test_stack_events_watcher_finished_nested_stacks(boto3_stubber, mocker):
+    """Verify that the nested stacks are not polled anymore after their own terminal event."""
+    mocker.patch("pcluster.utils.time.sleep")
+    stack = {
+        "StackId": "stack-id",
+        "StackName": FAKE_STACK_NAME,
+        "CreationTime": datetime.datetime(2020, 1, 1, 0, 10),
+        "StackStatus": "CREATE_IN_PROGRESS",
+    }
+    stack_started = _stack_event("e1", 10, "CREATE_IN_PROGRESS", FAKE_STACK_NAME, "stack-id")
+    first_started = _stack_event("e2", 11, "CREATE_IN_PROGRESS", "First", "first-id")
+    second_started = _stack_event("e3", 11, "CREATE_IN_PROGRESS", "Second", "second-id")
+    first_progress = _stack_event("f1", 12, "CREATE_IN_PROGRESS", "First", "first-id")
+    first_finished = _stack_event("f2", 13, "CREATE_COMPLETE", "First", "first-id")
+    second_progress = _stack_event("s1", 12, "CREATE_IN_PROGRESS", "Second", "second-id")
+    second_finished = _stack_event("s2", 15, "CREATE_COMPLETE", "Second", "second-id")
+    first_completed = _stack_event("e4", 14, "CREATE_COMPLETE", "First", "first-id")
+    second_completed = _stack_event("e5", 16, "CREATE_COMPLETE", "Second", "second-id")
+    stack_completed = _stack_event("e6", 17, "CREATE_COMPLETE", FAKE_STACK_NAME, "stack-id")
+    parent_events = [second_started, first_started, stack_started]
+
+    def _events_request(stack_id, events):
+        return MockedBoto3Request(
+            method="describe_stack_events", response={"StackEvents": events}, expected_params={"StackName": stack_id}
+        )
+
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_stacks", response={"Stacks": [stack]}, expected_params={"StackName": FAKE_STACK_NAME}
+        ),
+        _events_request("stack-id", parent_events),
+        _events_request("stack-id", parent_events),
+        _events_request("second-id", [second_progress]),
+        _events_request("first-id", [first_finished, first_progress]),
+        # the first nested stack has finished and is not polled anymore
+        _events_request("stack-id", [first_completed] + parent_events),
+        _events_request("second-id", [second_progress]),
+        _events_request("stack-id", [stack_completed, second_completed, first_completed] + parent_events),
+        _events_request("second-id", [second_finished, second_progress]),
+        MockedBoto3Request(
+            method="describe_stacks",
+            response={"Stacks": [dict(stack, StackStatus="CREATE_COMPLETE")]},
+            expected_params={"StackName": "stack-id"},
+        ),
+    ]
+    boto3_stubber("cloudformation", mocked_requests)
+
+    watcher = utils.StackEventsWatcher(FAKE_STACK_NAME)
+    assert_that(watcher.wait().get("StackStatus")).is_equal_to("CREATE_COMPLETE")
+    assert_that(watcher.requests).is_equal_to(8)
+
+
+def test_stack_events_watcher_terminal_stack(boto3_stubber):
+    """Verify that no event is retrieved for a stack without operations in progress."""
+    stack = {
+        "StackId": "stack-id",
+        "StackName": FAKE_STACK_NAME,
+        "CreationTime": datetime.datetime(2020, 1, 1),
+        "StackStatus": "UPDATE_ROLLBACK_COMPLETE",
+    }
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_stacks", response={"Stacks": [stack]}, expected_params={"StackName": FAKE_STACK_NAME}
+        ),
+        MockedBoto3Request(
+            method="describe_stacks", response={"Stacks": [stack]}, expected_params={"StackName": "stack-id"}
+        ),
+    ]
+    boto3_stubber("cloudformation", mocked_requests)
+    assert_that(utils.wait_for_stack(FAKE_STACK_NAME)).is_equal_to(stack)
 
 
 @pytest.mark.parametrize(
@@ -226,6 +384,8 @@ def test_get_stack_resources(boto3_stubber, resources, error_message):
 
 def test_retry_on_boto3_throttling(boto3_stubber, mocker):
     sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    # The jitter of the backoff always takes its highest value
+    mocker.patch("pcluster.rate_limiter.random.uniform", side_effect=lambda low, high: high)
     mocked_requests = [
         MockedBoto3Request(
             method="describe_stack_resources",
@@ -247,11 +407,14 @@ def test_retry_on_boto3_throttling(boto3_stubber, mocker):
     ]
     client = boto3_stubber("cloudformation", mocked_requests)
     utils.retry_on_boto3_throttling(client.describe_stack_resources, StackName=FAKE_STACK_NAME)
-    sleep_mock.assert_called_with(5)
+    # The wait doubles at every throttled attempt
+    assert_that([call[0][0] for call in sleep_mock.call_args_list]).is_equal_to([5, 10])
 
 
 def test_get_stack_resources_retry(boto3_stubber, mocker):
     sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    # The jitter of the backoff always takes its highest value
+    mocker.patch("pcluster.rate_limiter.random.uniform", side_effect=lambda low, high: high)
     mocked_requests = [
         MockedBoto3Request(
             method="describe_stack_resources",
@@ -271,6 +434,8 @@ def test_get_stack_resources_retry(boto3_stubber, mocker):
 
 def test_get_stack_retry(boto3_stubber, mocker):
     sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    # The jitter of the backoff always takes its highest value
+    mocker.patch("pcluster.rate_limiter.random.uniform", side_effect=lambda low, high: high)
     expected_stack = {"StackName": FAKE_STACK_NAME, "CreationTime": 0, "StackStatus": "CREATED"}
     mocked_requests = [
         MockedBoto3Request(
@@ -294,9 +459,21 @@ def test_get_stack_retry(boto3_stubber, mocker):
 
 def test_verify_stack_creation_retry(boto3_stubber, mocker):
     sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    # The jitter of the backoff always takes its highest value
+    mocker.patch("pcluster.rate_limiter.random.uniform", side_effect=lambda low, high: high)
     mocker.patch(
         "pcluster.utils.get_stack",
-        side_effect=[{"StackStatus": "CREATE_IN_PROGRESS"}, {"StackStatus": "CREATE_FAILED"}],
+        side_effect=[
+            {"StackId": FAKE_STACK_NAME, "CreationTime": 0, "StackStatus": "CREATE_IN_PROGRESS"},
+            {"StackId": FAKE_STACK_NAME, "CreationTime": 0, "StackStatus": "CREATE_FAILED"},
+        ],
+    )
+    stack_event = dict(
+        _generate_stack_event(),
+        PhysicalResourceId=FAKE_STACK_NAME,
+        ResourceType=STACK_TYPE,
+        ResourceStatus="CREATE_FAILED",
+        ResourceStatusReason="The following resource(s) failed to create: [MasterServer].",
     )
     mocked_requests = [
         MockedBoto3Request(
@@ -308,7 +485,7 @@ def test_verify_stack_creation_retry(boto3_stubber, mocker):
         ),
         MockedBoto3Request(
             method="describe_stack_events",
-            response={"StackEvents": [_generate_stack_event()]},
+            response={"StackEvents": [stack_event]},
             expected_params={"StackName": FAKE_STACK_NAME},
         ),
     ]
@@ -319,6 +496,8 @@ def test_verify_stack_creation_retry(boto3_stubber, mocker):
 
 def test_get_stack_events_retry(boto3_stubber, mocker):
     sleep_mock = mocker.patch("pcluster.utils.time.sleep")
+    # The jitter of the backoff always takes its highest value
+    mocker.patch("pcluster.rate_limiter.random.uniform", side_effect=lambda low, high: high)
     expected_events = [_generate_stack_event()]
     mocked_requests = [
         MockedBoto3Request(
@@ -440,6 +619,51 @@ def test_create_s3_bucket(region, create_error_message, configure_error_message,
         delete_s3_bucket_mock.assert_not_called()
 
 
+def _create_resources_dir(root):
+    """Create a resources dir with a dir to be zipped and a plain file."""
+    resources_dir = root.mkdir("resources")
+    custom_resources_dir = resources_dir.mkdir("custom_resources")
+    custom_resources_dir.join("handler.py").write("print('handler')")
+    custom_resources_dir.mkdir("lib").join("module.py").write("print('module')")
+    resources_dir.join("template.json").write("{}")
+    return resources_dir
+
+
+def test_zip_dir_is_deterministic(tmpdir):
+    resources_dir = _create_resources_dir(tmpdir)
+    zip_content = utils.zip_dir(str(resources_dir.join("custom_resources"))).getvalue()
+
+    # Same content with different timestamps
+    resources_dir.join("custom_resources", "handler.py").setmtime(1000000)
+    assert_that(utils.zip_dir(str(resources_dir.join("custom_resources"))).getvalue()).is_equal_to(zip_content)
+    assert_that(utils._get_dir_digest(str(resources_dir.join("custom_resources")))).is_equal_to(
+        utils._get_dir_digest(str(resources_dir.join("custom_resources")))
+    )
+
+    resources_dir.join("custom_resources", "handler.py").write("print('changed')")
+    assert_that(utils.zip_dir(str(resources_dir.join("custom_resources"))).getvalue()).is_not_equal_to(zip_content)
+
+
+def test_upload_resources_artifacts(boto3_stubber, mocker, monkeypatch, tmpdir):
+    """Verify that the zipped dirs are cached and that all the artifacts are uploaded."""
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.setenv("AWS_PCLUSTER_CACHE_DIR", str(tmpdir.join("cache")))
+    resources_dir = _create_resources_dir(tmpdir)
+    zip_content = utils.zip_dir(str(resources_dir.join("custom_resources"))).getvalue()
+    boto3_stubber("s3", [])
+    upload_fileobj_mock = mocker.patch.object(utils.get_boto3_client("s3"), "upload_fileobj")
+
+    utils.upload_resources_artifacts("bucket", root=str(resources_dir))
+
+    uploaded_artifacts = {call[0][2]: call[0][0].read() for call in upload_fileobj_mock.call_args_list}
+    assert_that(uploaded_artifacts).is_equal_to({"template.json": b"{}", "custom_resources/artifacts.zip": zip_content})
+    assert_that({call[0][1] for call in upload_fileobj_mock.call_args_list}).is_equal_to({"bucket"})
+    cached_zip_path = tmpdir.join(
+        "cache", "artifacts", "{0}.zip".format(utils._get_dir_digest(str(resources_dir.join("custom_resources"))))
+    )
+    assert_that(cached_zip_path.read_binary()).is_equal_to(zip_content)
+
+
 @pytest.mark.parametrize(
     "architecture, supported_oses",
     [
@@ -538,6 +762,155 @@ def test_get_instance_types_info(boto3_stubber, capsys, instance_types, error_me
         assert_that(instance_types_info).is_equal_to(response_dict.get("InstanceTypes"))
 
 
+def test_get_instance_types_catalog(boto3_stubber, monkeypatch, tmpdir):
+    """Verify that the instance types catalog is retrieved once and then served from memory and disk."""
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.setenv("AWS_PCLUSTER_CACHE_DIR", str(tmpdir))
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setattr(utils.get_instance_types_catalog, "cache", {}, raising=False)
+    instance_types = [
+        {"InstanceType": "t2.micro", "VCpuInfo": {"DefaultVCpus": 1}},
+        {"InstanceType": "c5.xlarge", "VCpuInfo": {"DefaultVCpus": 4}},
+    ]
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_instance_types", response={"InstanceTypes": instance_types}, expected_params={}
+        ),
+        # Instance types missing from the catalog are described individually
+        MockedBoto3Request(
+            method="describe_instance_types",
+            response={"InstanceTypes": [{"InstanceType": "new.type"}]},
+            expected_params={"InstanceTypes": ["new.type"]},
+        ),
+    ]
+    boto3_stubber("ec2", mocked_requests)
+
+    assert_that(utils.get_instance_vcpus("t2.micro")).is_equal_to(1)
+    assert_that(utils.get_instance_type("c5.xlarge")).is_equal_to(instance_types[1])
+    assert_that(utils.get_instance_types_info(["c5.xlarge", "t2.micro"])).is_equal_to(
+        [instance_types[1], instance_types[0]]
+    )
+    assert_that(utils.get_instance_types_info(["t2.micro", "new.type"])).is_equal_to(
+        [instance_types[0], {"InstanceType": "new.type"}]
+    )
+
+    # A new process reads the catalog from disk without calling DescribeInstanceTypes
+    utils.get_instance_types_catalog.cache = {}
+    assert_that(utils.get_instance_type("t2.micro")).is_equal_to(instance_types[0])
+
+
+def test_get_throttled_requests_count(boto3_stubber):
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_key_pairs",
+            response="Rate exceeded",
+            expected_params={"KeyNames": ["key1"]},
+            generate_error=True,
+            error_code="Throttling",
+        ),
+        MockedBoto3Request(
+            method="describe_key_pairs",
+            response="The key pair 'key1' does not exist",
+            expected_params={"KeyNames": ["key1"]},
+            generate_error=True,
+            error_code="InvalidKeyPair.NotFound",
+        ),
+    ]
+    boto3_stubber("ec2", mocked_requests)
+
+    throttled_requests = utils.get_throttled_requests_count()
+    for _ in range(2):
+        with pytest.raises(ClientError):
+            utils.get_boto3_client("ec2").describe_key_pairs(KeyNames=["key1"])
+        assert_that(utils.get_throttled_requests_count()).is_equal_to(throttled_requests + 1)
+
+
+def test_prefetch_ec2_resources(boto3_stubber, monkeypatch):
+    """Verify that prefetched resources are described with one call per type when first requested."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setattr(utils.get_availability_zone_of_subnet, "cache", {}, raising=False)
+    subnets = [
+        {"SubnetId": "subnet-1", "VpcId": "vpc-1", "AvailabilityZone": "us-east-1a"},
+        {"SubnetId": "subnet-2", "VpcId": "vpc-1", "AvailabilityZone": "us-east-1b"},
+    ]
+    volumes = [{"VolumeId": "vol-{0}".format(index), "State": "available"} for index in range(5)]
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_subnets",
+            response={"Subnets": subnets},
+            expected_params={"SubnetIds": ["subnet-1", "subnet-2"]},
+        ),
+        MockedBoto3Request(
+            method="describe_volumes",
+            response={"Volumes": volumes},
+            expected_params={"VolumeIds": [volume.get("VolumeId") for volume in volumes]},
+        ),
+        # Resources not prefetched are described when requested
+        MockedBoto3Request(
+            method="describe_subnets",
+            response={"Subnets": [{"SubnetId": "subnet-3", "VpcId": "vpc-1"}]},
+            expected_params={"SubnetIds": ["subnet-3"]},
+        ),
+    ]
+    boto3_stubber("ec2", mocked_requests)
+
+    utils.prefetch_ec2_resources(
+        {
+            "subnet": ["subnet-1", "subnet-2", "subnet-1"],
+            "volume": [volume.get("VolumeId") for volume in volumes],
+        }
+    )
+    assert_that(utils.get_availability_zone_of_subnet("subnet-1")).is_equal_to("us-east-1a")
+    for volume in volumes:
+        assert_that(utils.describe_ec2_resource("volume", volume.get("VolumeId"))).is_equal_to(volume)
+    assert_that(utils.describe_ec2_resources("subnet", ["subnet-2", "subnet-3", "subnet-1"])).is_equal_to(
+        [subnets[1], {"SubnetId": "subnet-3", "VpcId": "vpc-1"}, subnets[0]]
+    )
+    # Resources already described are not prefetched again
+    utils.prefetch_ec2_resources({"subnet": ["subnet-1"], "volume": ["vol-0"]})
+
+
+def test_prefetch_ec2_resources_with_errors(boto3_stubber, monkeypatch):
+    """Verify that errors of the prefetch are reported for the right resources."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    error_message = "The security group 'sg-2' does not exist"
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_images",
+            response="Invalid id: ami-1",
+            expected_params={"ImageIds": ["ami-1"]},
+            generate_error=True,
+        ),
+        MockedBoto3Request(
+            method="describe_security_groups",
+            response=error_message,
+            expected_params={"GroupIds": ["sg-1", "sg-2"]},
+            generate_error=True,
+        ),
+        # Security groups are described one by one after the failure of the batched call
+        MockedBoto3Request(
+            method="describe_security_groups",
+            response={"SecurityGroups": [{"GroupId": "sg-1"}]},
+            expected_params={"GroupIds": ["sg-1"]},
+        ),
+        MockedBoto3Request(
+            method="describe_security_groups",
+            response=error_message,
+            expected_params={"GroupIds": ["sg-2"]},
+            generate_error=True,
+        ),
+    ]
+    boto3_stubber("ec2", mocked_requests)
+
+    utils.prefetch_ec2_resources({"security_group": ["sg-1", "sg-2"], "image": ["ami-1"]})
+    # The error of a single resource is kept and raised without describing it again
+    with pytest.raises(ClientError, match="Invalid id: ami-1"):
+        utils.describe_ec2_resource("image", "ami-1")
+    assert_that(utils.describe_ec2_resource("security_group", "sg-1")).is_equal_to({"GroupId": "sg-1"})
+    with pytest.raises(ClientError, match=error_message):
+        utils.describe_ec2_resource("security_group", "sg-2")
+
+
 @pytest.mark.parametrize(
     "instance_type, supported_architectures, error_message",
     [
@@ -662,6 +1035,110 @@ def test_is_hit_enabled_cluster(scheduler, expected_is_hit_enabled):
     assert_that(utils.is_hit_enabled_scheduler(scheduler)).is_equal_to(expected_is_hit_enabled)
 
 
+@pytest.mark.parametrize(
+    "key_name, expected_value",
+    [("Scheduler", "slurm"), ("SharedDir", "/shared"), ("NotExisting", "NONE")],
+)
+def test_get_cfn_param(key_name, expected_value):
+    """Verify that the params are found both in the stack params list and in the dict created from it."""
+    cfn_params = [
+        {"ParameterKey": "Scheduler", "ParameterValue": "slurm"},
+        {"ParameterKey": "SharedDir", "ParameterValue": " /shared "},
+    ]
+    cfn_params_dict = utils.get_cfn_params_dict(cfn_params)
+    assert_that(cfn_params_dict).is_equal_to({"Scheduler": "slurm", "SharedDir": " /shared "})
+    assert_that(utils.get_cfn_param(cfn_params, key_name)).is_equal_to(expected_value)
+    assert_that(utils.get_cfn_param(cfn_params_dict, key_name)).is_equal_to(expected_value)
+    assert_that(utils.get_cfn_params_dict(None)).is_empty()
+
+
+def _fleet_instance(instance_id, stack_name, node_type_tag=None, name_tag=None):
+    tags = [{"Key": "Application", "Value": stack_name}]
+    if node_type_tag:
+        tags.append({"Key": "aws-parallelcluster-node-type", "Value": node_type_tag})
+    if name_tag:
+        tags.append({"Key": "Name", "Value": name_tag})
+    return {"InstanceId": instance_id, "Tags": tags}
+
+
+@pytest.mark.parametrize(
+    "stack_names, tag_filters, expected_filters, expected_stack_names",
+    [
+        (
+            ["parallelcluster-c", "parallelcluster-a", "parallelcluster-empty"],
+            None,
+            [
+                {
+                    "Name": "tag:Application",
+                    "Values": ["parallelcluster-c", "parallelcluster-a", "parallelcluster-empty"],
+                }
+            ],
+            ["parallelcluster-c", "parallelcluster-a", "parallelcluster-empty"],
+        ),
+        (
+            None,
+            {"team": ["hpc", "ml"]},
+            [
+                {"Name": "tag:Application", "Values": ["parallelcluster-*"]},
+                {"Name": "tag:team", "Values": ["hpc", "ml"]},
+            ],
+            ["parallelcluster-a", "parallelcluster-c"],
+        ),
+    ],
+)
+def test_describe_fleet_instances(boto3_stubber, stack_names, tag_filters, expected_filters, expected_stack_names):
+    """Verify that the instances of all the clusters are described at once and grouped by cluster and node type."""
+    instance_state_filter = {"Name": "instance-state-name", "Values": ["pending", "running", "stopping", "stopped"]}
+    expected_filters.insert(1, instance_state_filter)
+    boto3_stubber(
+        "ec2",
+        MockedBoto3Request(
+            method="describe_instances",
+            expected_params={"Filters": expected_filters},
+            response={
+                "Reservations": [
+                    {
+                        "Instances": [
+                            _fleet_instance("i-c-master", "parallelcluster-c", node_type_tag="Master"),
+                            _fleet_instance("i-c-compute1", "parallelcluster-c", node_type_tag="Compute"),
+                        ]
+                    },
+                    {
+                        "Instances": [
+                            # Older clusters have the node type in the Name tag only
+                            _fleet_instance("i-a-compute", "parallelcluster-a", name_tag="Compute"),
+                            _fleet_instance("i-a-master", "parallelcluster-a", name_tag="Master"),
+                            _fleet_instance("i-c-compute2", "parallelcluster-c", "Compute", name_tag="Compute"),
+                            _fleet_instance("i-unknown", "parallelcluster-a", name_tag="other"),
+                        ]
+                    },
+                ]
+            },
+        ),
+    )
+
+    fleet = utils.describe_fleet_instances(stack_names, tag_filters)
+
+    assert_that(list(fleet.keys())).is_equal_to(expected_stack_names)
+    fleet_ids = {
+        stack_name: {
+            node_type: [instance.get("InstanceId") for instance in node_instances]
+            for node_type, node_instances in cluster_instances.items()
+        }
+        for stack_name, cluster_instances in fleet.items()
+    }
+    assert_that(fleet_ids.get("parallelcluster-a")).is_equal_to(
+        {utils.NodeType.master: ["i-a-master"], utils.NodeType.compute: ["i-a-compute"]}
+    )
+    assert_that(fleet_ids.get("parallelcluster-c")).is_equal_to(
+        {utils.NodeType.master: ["i-c-master"], utils.NodeType.compute: ["i-c-compute1", "i-c-compute2"]}
+    )
+    if "parallelcluster-empty" in expected_stack_names:
+        assert_that(fleet_ids.get("parallelcluster-empty")).is_equal_to(
+            {utils.NodeType.master: [], utils.NodeType.compute: []}
+        )
+
+
 @pytest.mark.parametrize(
     "region, expected_url",
     [
@@ -673,6 +1150,69 @@ def test_get_bucket_url(region, expected_url):
     assert_that(get_bucket_url(region)).is_equal_to(expected_url)
 
 
+def test_read_remote_file_from_s3(boto3_stubber, monkeypatch, tmpdir):
+    """Verify that the file is downloaded again only when its ETag changes."""
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.setenv("AWS_PCLUSTER_CACHE_DIR", str(tmpdir))
+    template = b"Resources: {}"
+    boto3_stubber(
+        "s3",
+        [
+            MockedBoto3Request(
+                method="get_object",
+                response={"Body": StreamingBody(BytesIO(template), len(template)), "ETag": '"etag1"'},
+                expected_params={"Bucket": "bucket", "Key": "templates/template.cfn.yaml"},
+            ),
+            MockedBoto3Request(
+                method="get_object",
+                response="Not Modified",
+                expected_params={"Bucket": "bucket", "Key": "templates/template.cfn.yaml", "IfNoneMatch": '"etag1"'},
+                generate_error=True,
+                error_code="304",
+            ),
+        ],
+    )
+
+    for _ in range(2):
+        assert_that(utils.read_remote_file("s3://bucket/templates/template.cfn.yaml")).is_equal_to("Resources: {}")
+
+
+def test_read_remote_file_from_http(mocker, monkeypatch, tmpdir):
+    """Verify that the file is requested with the ETag of the cached copy, if any."""
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.setenv("AWS_PCLUSTER_CACHE_DIR", str(tmpdir))
+    url = "https://bucket.s3.amazonaws.com/templates/template.cfn.yaml"
+    response = mocker.MagicMock()
+    response.__enter__.return_value.read.return_value = b"Resources: {}"
+    response.__enter__.return_value.headers = {"ETag": '"etag1"'}
+    urlopen_mock = mocker.patch(
+        "pcluster.utils.urllib.request.urlopen",
+        side_effect=[response, urllib.error.HTTPError(url, 304, "Not Modified", {}, None)],
+    )
+
+    for _ in range(2):
+        assert_that(utils.read_remote_file(url)).is_equal_to("Resources: {}")
+
+    requests = [call[0][0] for call in urlopen_mock.call_args_list]
+    assert_that(requests[0].get_header("If-none-match")).is_none()
+    assert_that(requests[1].get_header("If-none-match")).is_equal_to('"etag1"')
+
+
+def test_render_template(monkeypatch):
+    """Verify that each template is compiled once."""
+    monkeypatch.delattr(utils._get_compiled_template, "cache", raising=False)
+    template = "{{ config.cluster.label }}-{{ config_version }}-{{ tags[0].Value }}-{{ 'value' | sha1 }}"
+
+    for label in ["first", "second"]:
+        rendered_template = utils.render_template(
+            template, {"cluster": {"label": label}}, "version", [{"Key": "key", "Value": "tag"}]
+        )
+        assert_that(rendered_template).is_equal_to(
+            "{0}-version-tag-{1}".format(label, hashlib.sha1(b"value").hexdigest())
+        )
+    assert_that(utils._get_compiled_template.cache).is_length(1)
+
+
 @pytest.mark.parametrize(
     "ami_name, error_expected, expected_message",
     [
@@ -781,6 +1321,93 @@ def test_get_supported_batch_instance_types(
     )
 
 
+def test_get_supported_batch_instance_types_cached(mocker, monkeypatch, tmpdir):
+    """Verify that the cached list is used, and refreshed in background when expired."""
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.setenv("AWS_PCLUSTER_CACHE_DIR", str(tmpdir))
+    time_mock = mocker.patch("pcluster.cache.time.time", return_value=1000)
+    discover_patch = mocker.patch(
+        "pcluster.utils._discover_supported_batch_instance_types", return_value=(["c5", "optimal"], True)
+    )
+    thread_patch = mocker.patch("pcluster.utils.threading.Thread")
+
+    # Discovered when nothing is cached, then read from the cache
+    for _ in range(2):
+        assert_that(utils.get_supported_batch_instance_types()).is_equal_to(["c5", "optimal"])
+    assert_that(discover_patch.call_count).is_equal_to(1)
+    thread_patch.assert_not_called()
+
+    # The expired list is returned while it is refreshed in background
+    time_mock.return_value = 1000 + utils.BATCH_INSTANCE_TYPES_TTL + 1
+    discover_patch.return_value = (["c5", "m5", "optimal"], True)
+    assert_that(utils.get_supported_batch_instance_types()).is_equal_to(["c5", "optimal"])
+    assert_that(discover_patch.call_count).is_equal_to(1)
+    refresh_thread_kwargs = thread_patch.call_args[1]
+    thread_patch.return_value.start.assert_called_once()
+
+    # A failed refresh keeps the expired list, that can still be used offline
+    discover_patch.side_effect = SystemExit(1)
+    refresh_thread_kwargs["target"](*refresh_thread_kwargs["args"])
+    assert_that(utils.get_supported_batch_instance_types()).is_equal_to(["c5", "optimal"])
+
+    discover_patch.side_effect = None
+    refresh_thread_kwargs["target"](*refresh_thread_kwargs["args"])
+    assert_that(utils.get_supported_batch_instance_types()).is_equal_to(["c5", "m5", "optimal"])
+
+
+def test_get_supported_batch_instance_types_refresh_requested(mocker, monkeypatch, tmpdir):
+    """Verify that the list is discovered again, not in background, when a cache refresh is requested."""
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.setenv("AWS_PCLUSTER_CACHE_DIR", str(tmpdir))
+    monkeypatch.setattr(utils.FileCache, "_refresh_time", None)
+    time_mock = mocker.patch("pcluster.cache.time.time", return_value=1000)
+    discover_patch = mocker.patch(
+        "pcluster.utils._discover_supported_batch_instance_types", return_value=(["c5", "optimal"], True)
+    )
+    thread_patch = mocker.patch("pcluster.utils.threading.Thread")
+    assert_that(utils.get_supported_batch_instance_types()).is_equal_to(["c5", "optimal"])
+
+    # --refresh-cache
+    time_mock.return_value = 1001
+    utils.FileCache.request_refresh()
+    discover_patch.return_value = (["c5", "m5", "optimal"], True)
+    assert_that(utils.get_supported_batch_instance_types()).is_equal_to(["c5", "m5", "optimal"])
+    assert_that(discover_patch.call_count).is_equal_to(2)
+    thread_patch.assert_not_called()
+
+
+def test_get_supported_batch_instance_types_failed_probe(mocker, monkeypatch, tmpdir):
+    """Verify that the fallback list used when the Batch probe fails never replaces the cached list."""
+    monkeypatch.delenv("AWS_PCLUSTER_DISABLE_CACHE", raising=False)
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_PCLUSTER_CACHE_DIR", str(tmpdir))
+    time_mock = mocker.patch("pcluster.cache.time.time", return_value=1000)
+    mocker.patch("pcluster.utils.get_supported_instance_types", return_value=["c5.xlarge", "m5.xlarge"])
+    probe_patch = mocker.patch(
+        "pcluster.utils._get_cce_emsg_containing_supported_instance_types",
+        return_value="Instance type can only be one of [c5, optimal]",
+    )
+    thread_patch = mocker.patch("pcluster.utils.threading.Thread")
+    batch_types = ["c5", "optimal"]
+    assert_that(utils.get_supported_batch_instance_types()).is_equal_to(batch_types)
+
+    # The background refresh of the expired list fails, e.g. because the call is throttled
+    time_mock.return_value = 1000 + utils.BATCH_INSTANCE_TYPES_TTL + 1
+    probe_patch.side_effect = Exception("Rate exceeded")
+    assert_that(utils.get_supported_batch_instance_types()).is_equal_to(batch_types)
+    refresh_thread_kwargs = thread_patch.call_args[1]
+    refresh_thread_kwargs["target"](*refresh_thread_kwargs["args"])
+    assert_that(utils.get_supported_batch_instance_types()).is_equal_to(batch_types)
+    assert_that(thread_patch.return_value.start.call_count).is_equal_to(2)
+
+    # The fallback list is used when nothing is cached, but it is not cached
+    utils.FileCache(utils.BATCH_INSTANCE_TYPES_CACHE_NAMESPACE, utils.BATCH_INSTANCE_TYPES_TTL).invalidate("us-east-1")
+    fallback_types = ["c5.xlarge", "m5.xlarge", "c5", "m5", "optimal"]
+    assert_that(sorted(utils.get_supported_batch_instance_types())).is_equal_to(sorted(fallback_types))
+    probe_patch.side_effect = None
+    assert_that(utils.get_supported_batch_instance_types()).is_equal_to(batch_types)
+
+
 @pytest.mark.parametrize(
     "api_emsg, match_expected, expected_return_value",
     [
@@ -1006,3 +1633,31 @@ def test_get_ebs_snapshot_info(boto3_stubber, snapshot_id, raise_exceptions, err
         with pytest.raises(SystemExit, match=error_message) as sysexit:
             utils.get_ebs_snapshot_info(snapshot_id, raise_exceptions=raise_exceptions)
             assert_that(sysexit.value.code).is_not_equal_to(0)
+
+
+def test_describe_instance_types(boto3_stubber):
+    """Verify that instance types are described in batches of 100, in a deterministic order."""
+    instance_types = ["c5.{0}xlarge".format(index) for index in range(150)]
+    expected_instance_types = sorted(instance_types)
+    mocked_requests = [
+        MockedBoto3Request(
+            method="describe_instance_types",
+            response={"InstanceTypes": [{"InstanceType": instance_type} for instance_type in chunk]},
+            expected_params={"InstanceTypes": chunk},
+        )
+        for chunk in [expected_instance_types[:100], expected_instance_types[100:]]
+    ]
+    boto3_stubber("ec2", mocked_requests)
+
+    instance_types_info = utils.describe_instance_types(instance_types + instance_types[:10])
+    assert_that(instance_types_info).is_length(150)
+    assert_that(instance_types_info["c5.42xlarge"]).is_equal_to({"InstanceType": "c5.42xlarge"})
+
+
+@pytest.mark.parametrize("env_value, expected_workers", [(None, 10), ("1", 1), ("0", 1), ("25", 25), ("many", 10)])
+def test_get_request_workers(monkeypatch, env_value, expected_workers):
+    if env_value is None:
+        monkeypatch.delenv("AWS_PCLUSTER_REQUEST_WORKERS", raising=False)
+    else:
+        monkeypatch.setenv("AWS_PCLUSTER_REQUEST_WORKERS", env_value)
+    assert_that(utils.get_request_workers()).is_equal_to(expected_workers)